@@ -0,0 +1,79 @@
+# adaptive_concurrency.py
+#
+# 동시 수집 수 자동 조절 (AIMD: 정상이면 1씩 늘리고, 느려지거나 오류가 늘면 절반으로 줄임).
+# 한 묶음(검색 결과 한 페이지)을 수집할 때마다 상세 페이지 지연과 오류/시간 초과 비율을 기록하고 adjust() 를 호출하면,
+# 밤처럼 한가할 때는 동시 수가 올라가고 낮에 사이트가 느려지거나 차단이 시작되면 바로 내려간다.
+# 모든 브라우저가 하나의 컨트롤러를 공유한다 (사이트 입장에서는 전체 요청량이 중요하므로).
+
+import collections
+import logging
+import statistics
+import threading
+import time
+
+# 지연 기준값: 최근 이만큼의 묶음(페이지) 지연 중앙값 중 최솟값 (사이트가 전반적으로 느려지면 기준도 따라 올라간다)
+BASELINE_WINDOW = 10
+
+
+class AimdController:
+    def __init__(self, initial=4, minimum=1, maximum=16, latency_tolerance=2.0, max_error_rate=0.1,
+                 decrease_factor=0.5):
+        # latency_tolerance: 최근 BASELINE_WINDOW 개 묶음 중 가장 빠른 묶음의 지연(중앙값) 대비 이 배수를 넘으면 줄인다
+        # max_error_rate: 묶음의 오류/시간 초과 비율이 이 값을 넘으면 줄인다
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.decrease_factor = decrease_factor
+        self.current = min(self.maximum, max(self.minimum, initial))
+        self.baseline = None
+        self._recent = collections.deque(maxlen=BASELINE_WINDOW)  # 최근 묶음의 지연 중앙값
+        self.history = [(time.time(), self.current, "시작")]
+        self._latencies = []
+        self._samples = 0
+        self._errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency=None, error=False):
+        # 방 하나의 결과: latency = 상세 페이지 로드 시간(초), error = 실패/시간 초과 여부
+        with self._lock:
+            self._samples += 1
+            if error:
+                self._errors += 1
+            elif latency is not None:
+                self._latencies.append(latency)
+
+    def adjust(self):
+        # 지금까지 기록한 결과로 동시 수를 조정하고 새 값을 반환 (기록은 비운다)
+        with self._lock:
+            if not self._samples:
+                return self.current
+            error_rate = self._errors / self._samples
+            latency = statistics.median(self._latencies) if self._latencies else None
+            self._latencies, self._samples, self._errors = [], 0, 0
+
+            if latency is not None:
+                self._recent.append(latency)
+                self.baseline = min(self._recent)
+            if error_rate > self.max_error_rate:
+                target = int(self.current * self.decrease_factor)
+                reason = f"오류율 {error_rate:.0%}"
+            elif latency is not None and latency > self.baseline * self.latency_tolerance:
+                target = int(self.current * self.decrease_factor)
+                reason = f"지연 {latency:.2f}초 (기준 {self.baseline:.2f}초)"
+            else:
+                target = self.current + 1
+                reason = f"정상 (지연 {latency:.2f}초)" if latency is not None else "정상"
+            target = min(self.maximum, max(self.minimum, target))
+
+            if target != self.current:
+                logging.info(f"동시 수집 수 조정: {self.current} → {target} ({reason}, 오류율 {error_rate:.0%})",
+                             extra={"stage": "concurrency", "concurrency": target})
+                self.current = target
+                self.history.append((time.time(), target, reason))
+            return self.current
+
+    def summary(self):
+        # 조정 이력 (시각, 동시 수, 사유) 한 줄씩
+        return "\n".join(f"{time.strftime('%H:%M:%S', time.localtime(at))}  {value:>3}  {reason}"
+                         for at, value, reason in self.history)
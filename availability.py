@@ -0,0 +1,92 @@
+# availability.py
+#
+# 날짜별 예약 가능 여부를 월 단위 비트맵으로 다룬다.
+# 한 방의 한 달 = (booked_bits, known_bits) 두 정수. i번째 비트가 (i+1)일을 뜻하고
+# booked 는 예약 불가(disable), known 은 달력에 표시된 날(enable + disable)이다.
+# 여러 방의 비트맵을 numpy 배열로 펼쳐 요일별·기간별 예약률을 벡터 연산으로 계산한다.
+
+import calendar
+import datetime
+import re
+
+import numpy as np
+
+_DAY = re.compile(r"\d{1,2}")
+
+
+def add_months(year, month, offset):
+    # (2026, 11) + 3 → (2027, 2): 연도 넘김 처리
+    index = year * 12 + (month - 1) + offset
+    return index // 12, index % 12 + 1
+
+
+def month_key(year, month):
+    return f"{year:04d}-{month:02d}"
+
+
+def month_label(year, month, horizon):
+    # 엑셀 열 이름. 12개월을 넘으면 같은 월이 겹치므로 연도를 붙인다
+    if horizon > 12:
+        return f"{year % 100:02d}년 {month}월 예약"
+    return f"{month}월 예약"
+
+
+def parse_calendar_cells(cells):
+    # 달력 셀 (글자, 예약 불가 여부) 목록 → (booked_bits, known_bits)
+    # 셀 글자가 날짜가 아니면 순서대로 1일, 2일, ... 로 간주
+    booked = known = 0
+    for position, (text, disabled) in enumerate(cells, start=1):
+        match = _DAY.search(text)
+        day = int(match.group()) if match and 1 <= int(match.group()) <= 31 else position
+        bit = 1 << (day - 1)
+        known |= bit
+        if disabled:
+            booked |= bit
+    return booked, known
+
+
+def popcount(bits):
+    return bin(bits).count("1")
+
+
+def expand_bits(bits):
+    # 정수 비트맵 배열 (n,) → 불리언 행렬 (n, 31), [i, d] 는 (d+1)일
+    words = np.asarray(bits, dtype="<u4").reshape(-1, 1).view(np.uint8)
+    return np.unpackbits(words, axis=1, bitorder="little")[:, :31].astype(bool)
+
+
+def _month_grid(months):
+    # "YYYY-MM" 배열 → 각 칸의 날짜 서수 (n, 31), 존재하지 않는 날(31일 없는 달 등)은 마스크
+    first = np.array([datetime.date(int(m[:4]), int(m[5:7]), 1).toordinal() for m in months], dtype=np.int64)
+    days_in = np.array([calendar.monthrange(int(m[:4]), int(m[5:7]))[1] for m in months], dtype=np.int64)
+    offsets = np.arange(31)
+    ordinals = first[:, None] + offsets
+    valid = offsets[None, :] < days_in[:, None]
+    return ordinals, valid
+
+
+def weekday_occupancy(rows):
+    # rows: (month, booked_bits, known_bits) 목록 → 요일별(월=0 … 일=6) 예약률 배열 (7,)
+    if not rows:
+        return np.zeros(7)
+    months, booked, known = zip(*rows)
+    ordinals, valid = _month_grid(months)
+    booked = expand_bits(booked) & valid
+    known = expand_bits(known) & valid
+    # date.fromordinal(n).weekday() == (n - 1) % 7
+    weekdays = (ordinals - 1) % 7
+    booked_count = np.bincount(weekdays[booked], minlength=7)
+    known_count = np.bincount(weekdays[known], minlength=7)
+    return np.divide(booked_count, known_count, out=np.zeros(7), where=known_count > 0)
+
+
+def range_occupancy(rows, start, end):
+    # start ~ end(포함) 기간의 예약률 (예약 불가 일수 / 달력에 표시된 일수)
+    if not rows:
+        return 0.0
+    months, booked, known = zip(*rows)
+    ordinals, valid = _month_grid(months)
+    in_range = valid & (ordinals >= start.toordinal()) & (ordinals <= end.toordinal())
+    booked_count = int((expand_bits(booked) & in_range).sum())
+    known_count = int((expand_bits(known) & in_range).sum())
+    return booked_count / known_count if known_count else 0.0
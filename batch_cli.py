@@ -0,0 +1,241 @@
+# batch_cli.py
+#
+# GUI 없이 작업 파일(JSON)로 크롤링을 실행하는 명령줄 실행기.
+# 서버/스케줄러(cron 등)에서 여러 키워드를 밤새 돌리는 용도.
+#
+#   python batch_cli.py job.json
+#   python batch_cli.py job.json --keywords 사당,양평 --resume
+#
+# 상태 파일은 작업 파일과 mode 마다 따로 두고(<output_dir>/job_state_<작업 파일 이름>_<mode>.json),
+# 모든 키워드가 성공하면 지운다. --resume 은 중간에 끊긴 실행을 이어서 돌릴 때만 쓴다
+#
+# 종료 코드: 0 = 모든 키워드 성공, 1 = 일부 키워드 실패, 2 = 작업 파일 오류, 3 = 실행 오류
+
+import argparse
+import datetime
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+
+EXIT_OK = 0
+EXIT_PARTIAL = 1
+EXIT_BAD_JOB = 2
+EXIT_ERROR = 3
+
+# 작업 파일 기본값 (example_job.json 참고)
+JOB_DEFAULTS = {
+    "mode": "crawl",                # "crawl" = 전체 수집, "refresh" = 예약 달력만 갱신, "sample" = 표본으로 예약률 추정
+    "keywords": [],
+    "keywords_file": None,          # 한 줄에 키워드 하나인 텍스트 파일
+    "output_dir": "output",
+    "image_dir": "images",
+    "output_formats": ["xlsx"],     # "xlsx", "csv", "jsonl"
+    "max_workers": 1,
+    "requests_per_second": None,
+    "calendar_months": 3,
+    "max_sections": 100,
+    "headless": True,
+    "login_wait": 0,                # 수동 로그인 대기(초). 헤드리스에서는 cookies 사용
+    "cookies": None,                # 로그인 쿠키 JSON 파일 (GUI 실행에서 저장 가능)
+    "resume": False,                # 중간에 끊긴 이전 실행의 상태 파일에 완료로 기록된 키워드는 건너뜀
+    "state_file": None,             # 기본: <output_dir>/job_state_<작업 파일 이름>_<mode>.json
+    "cache_max_age_hours": None,    # 결과 파일이 이 시간보다 새로우면 다시 수집하지 않음
+    "json_log": None,
+    "recycle_rooms": None,          # 브라우저 하나로 이만큼 방을 처리하면 브라우저 재시작
+    "recycle_rss_mb": None,         # 크롬 메모리(MB)가 이 값을 넘으면 브라우저 재시작 (psutil 필요)
+    "export_workers": 0,            # 엑셀 생성을 맡을 백그라운드 프로세스 수 (0 = 크롤링 스레드에서 바로)
+    "shard_rows": None,             # 엑셀을 이 행 수마다 나눠 저장하고 목차 파일 생성
+    "prefetch_tabs": 0,             # 현재 방을 처리하는 동안 미리 열어 둘 다음 방 상세 탭 수
+    "batch_fetch": 0,               # 페이지의 방들을 브라우저 안에서 이 수만큼 동시에 수집 (0 = 방마다 탭 열기)
+    "adaptive_fetch": False,        # batch_fetch 를 시작값으로 지연/오류에 따라 동시 수 자동 조절 (AIMD)
+    "max_batch_fetch": 16,          # 자동 조절 시 최대 동시 수
+    "quick_scan": False,            # 상세 페이지 없이 검색 결과 카드만 수집 (달력/관리비/청소비 빈 칸)
+    "parse_workers": 0,             # HTML 파싱을 맡을 프로세스 수 (0 = 브라우저를 조작하는 스레드에서 바로)
+    "html_archive": None,           # true 또는 경로: 상세 페이지 HTML 보관 (html_archive.py 로 재추출)
+    "queue": None,                  # 공유 작업 큐 DB 경로: 지정하면 분산 수집의 조정자로 실행 (distributed.py)
+    "queue_job": None,              # 분산 작업 ID (기본: crawl-<오늘 날짜>, 같은 ID 로 다시 실행하면 이어서)
+    "local_workers": 0,             # 분산 수집 때 이 PC 에서 함께 실행할 작업자 프로세스 수
+    "sample_width": 0.05,           # sample: 신뢰구간 폭이 이보다 좁아지면 중단 (0.05 = ±2.5%p)
+    "sample_confidence": 0.95,      # sample: 신뢰수준
+    "sample_rooms_per_page": 2,     # sample: 방문한 페이지에서 뽑을 방 수
+    "sample_max_rooms": None,       # sample: 최대 표본 수
+    "profile": False,               # 실행 전체를 프로파일링해 출력 폴더에 profile_*.prof / .txt 저장
+}
+
+
+def load_job(path, keywords=None):
+    # keywords 를 주면 작업 파일의 키워드 대신 사용
+    with open(path, encoding="utf-8") as f:
+        job = json.load(f)
+    unknown = set(job) - set(JOB_DEFAULTS)
+    if unknown:
+        raise ValueError(f"알 수 없는 작업 설정: {', '.join(sorted(unknown))}")
+    job = {**JOB_DEFAULTS, **job}
+
+    if keywords:
+        job["keywords"], job["keywords_file"] = keywords, None
+    keywords = list(job["keywords"])
+    if job["keywords_file"]:
+        with open(job["keywords_file"], encoding="utf-8") as f:
+            keywords.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    # 중복 제거 (순서 유지)
+    job["keywords"] = list(dict.fromkeys(keywords))
+
+    if job["mode"] not in ("crawl", "refresh", "sample"):
+        raise ValueError(f"mode 는 crawl, refresh, sample 중 하나여야 합니다: {job['mode']}")
+    if not job["keywords"]:
+        raise ValueError("키워드가 없습니다.")
+    # 상태는 작업 파일과 mode 별로 (같은 출력 폴더의 다른 작업/갱신/표본 실행이 서로 건너뛰지 않게)
+    name = os.path.splitext(os.path.basename(path))[0]
+    job["state_file"] = job["state_file"] or os.path.join(job["output_dir"],
+                                                          f"job_state_{name}_{job['mode']}.json")
+    return job
+
+
+def load_state(path):
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def finish_state(job, state):
+    # 모든 키워드가 성공한 실행의 상태는 남기지 않는다 (다음 정기 실행은 처음부터).
+    # 실패한 키워드가 있으면 저장해 두고 --resume 으로 그 키워드만 다시 수집
+    if all(state.get(keyword, {}).get("status") == "ok" for keyword in job["keywords"]):
+        if os.path.exists(job["state_file"]):
+            os.remove(job["state_file"])
+    else:
+        save_state(job["state_file"], state)
+
+
+def save_state(path, state):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def pending_keywords(job, state):
+    # 이어하기/캐시 설정에 따라 이번에 수집할 키워드만 남긴다
+    pending = []
+    max_age = job["cache_max_age_hours"]
+    for keyword in job["keywords"]:
+        if job["resume"] and state.get(keyword, {}).get("status") == "ok":
+            logging.info(f"이어하기: '{keyword}' 이미 완료 → 건너뜀")
+            continue
+        excel_path = os.path.join(job["output_dir"], f"rooms_data_{keyword}.xlsx")
+        if (job["mode"] == "crawl" and max_age is not None and os.path.exists(excel_path)
+                and time.time() - os.path.getmtime(excel_path) < max_age * 3600):
+            logging.info(f"캐시: '{keyword}' 결과가 {max_age}시간 이내 → 건너뜀")
+            continue
+        pending.append(keyword)
+    return pending
+
+
+def run_job(job):
+    # 무거운 의존성(selenium, openpyxl 등)은 실제 실행 시점에 로딩
+    from crawler import crawl, refresh, setup_logger
+
+    setup_logger(job["json_log"])
+    os.makedirs(job["output_dir"], exist_ok=True)
+    os.makedirs(job["image_dir"], exist_ok=True)
+
+    state = load_state(job["state_file"]) if job["resume"] else {}
+    keywords = pending_keywords(job, state)
+    if not keywords:
+        logging.info("수집할 키워드가 없습니다.")
+        if job["resume"]:
+            finish_state(job, state)
+        return state, []
+
+    common = dict(json_log_path=job["json_log"], max_workers=job["max_workers"],
+                  requests_per_second=job["requests_per_second"], calendar_months=job["calendar_months"],
+                  headless=job["headless"], login_wait=job["login_wait"], cookies_path=job["cookies"],
+                  recycle_rooms=job["recycle_rooms"], recycle_rss_mb=job["recycle_rss_mb"])
+    if job["mode"] == "refresh":
+        results = refresh(keywords, job["output_dir"], **common)
+    elif job["mode"] == "sample":
+        from sampling import sample
+        results = sample(keywords, job["image_dir"], job["output_dir"], target_width=job["sample_width"],
+                         confidence=job["sample_confidence"], rooms_per_page=job["sample_rooms_per_page"],
+                         max_rooms=job["sample_max_rooms"], max_sections=job["max_sections"],
+                         output_formats=tuple(job["output_formats"]), **common)
+    elif job["queue"]:
+        from distributed import coordinate
+        del common["max_workers"]  # 브라우저 수는 작업자 수로 정해진다
+        results = coordinate(keywords, job["image_dir"], job["output_dir"], job["queue"], job["queue_job"],
+                             max_sections=job["max_sections"], output_formats=tuple(job["output_formats"]),
+                             local_workers=job["local_workers"], **common)
+    else:
+        results = crawl(keywords, job["image_dir"], job["output_dir"], max_sections=job["max_sections"],
+                        output_formats=tuple(job["output_formats"]),
+                        html_archive_path=job["html_archive"] or None, prefetch_tabs=job["prefetch_tabs"],
+                        export_workers=job["export_workers"], shard_rows=job["shard_rows"],
+                        parse_workers=job["parse_workers"], batch_fetch=job["batch_fetch"],
+                        adaptive_fetch=job["adaptive_fetch"], max_batch_fetch=job["max_batch_fetch"],
+                        quick_scan=job["quick_scan"],
+                        profile=job["profile"], **common)
+
+    finished_at = datetime.datetime.now().isoformat(timespec="seconds")
+    for keyword in keywords:
+        result = results.get(keyword, {"keyword": keyword, "status": "error", "error": "결과 없음"})
+        state[keyword] = {**result, "finished_at": finished_at}
+    finish_state(job, state)
+    return state, keywords
+
+
+def print_summary(state, keywords, elapsed):
+    print(f"\n=== 작업 요약 ({elapsed / 60:.1f}분) ===")
+    for keyword in keywords:
+        result = state.get(keyword, {})
+        line = f"{result.get('status', '?'):>7}  {keyword}: {result.get('rooms', 0)}개"
+        if result.get("ci_low") is not None:
+            line += (f", 추정 예약률 {result['average_rate']:.1%} "
+                     f"({result['ci_low']:.1%} ~ {result['ci_high']:.1%})")
+        if result.get("failed"):
+            line += f" (실패 {result['failed']}개)"
+        if result.get("error"):
+            line += f" - {result['error']}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="삼삼엠투 크롤링 배치 실행기 (GUI 없이 실행)")
+    parser.add_argument("job", help="작업 파일 (JSON)")
+    parser.add_argument("--keywords", help="작업 파일의 키워드 대신 사용할 키워드 (쉼표 구분)")
+    parser.add_argument("--resume", dest="resume", action="store_true", default=None,
+                        help="중간에 끊긴 이전 실행에서 완료된 키워드 건너뛰기")
+    parser.add_argument("--no-resume", dest="resume", action="store_false",
+                        help="모든 키워드 다시 수집 (기본)")
+    args = parser.parse_args(argv)
+
+    try:
+        keywords = [kw.strip() for kw in (args.keywords or "").split(",") if kw.strip()]
+        job = load_job(args.job, keywords)
+        if args.resume is not None:
+            job["resume"] = args.resume
+    except (OSError, ValueError) as e:
+        print(f"작업 파일 오류: {e}", file=sys.stderr)
+        return EXIT_BAD_JOB
+
+    started = time.monotonic()
+    try:
+        state, keywords = run_job(job)
+    except Exception as e:
+        logging.error(f"작업 실행 오류: {e}", exc_info=True)
+        return EXIT_ERROR
+
+    print_summary(state, keywords, time.monotonic() - started)
+    if any(state.get(keyword, {}).get("status") != "ok" for keyword in keywords):
+        return EXIT_PARTIAL
+    return EXIT_OK
+
+
+if __name__ == "__main__":
+    # PyInstaller 단일 실행 파일에서 spawn 프로세스 풀(파싱/내보내기)이 프로그램 전체를 다시 실행하지 않게
+    multiprocessing.freeze_support()
+    sys.exit(main())
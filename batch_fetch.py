@@ -0,0 +1,150 @@
+# batch_fetch.py
+#
+# 검색 결과 페이지 하나의 방들을 브라우저 안에서 한꺼번에 수집 (execute_async_script 한 번).
+# 방마다 탭을 열고 전환하고 기다리고 닫는 WebDriver 왕복 대신, 로그인된 결과 페이지에서
+# 숨긴 같은 출처 iframe 으로 상세 페이지를 몇 개씩 동시에 열고(브라우저의 쿠키/연결 재사용),
+# 달력을 넘겨 가며 필드 글자와 월별 달력 표 HTML 만 JSON 으로 돌려받는다.
+# 달력은 상세 페이지에서 버튼을 눌러야 그려지므로 fetch() 로 받은 HTML 만으로는 읽을 수 없어 iframe 을 쓴다.
+
+import datetime
+import math
+
+from availability import add_months, month_key
+from extraction import DETAIL_SELECTORS, build_record, calendar_bits_html
+from rate_limit import request_interval, throttle
+
+# 방 하나에서 기다리는 최대 시간(초): 상세 페이지 로드, 달력 표시 각각
+ROOM_TIMEOUT = 15
+
+BATCH_SCRIPT = """
+var rooms = arguments[0], months = arguments[1], selectors = arguments[2], keepHtml = arguments[3],
+    concurrency = arguments[4], timeout = arguments[5], done = arguments[arguments.length - 1];
+var results = new Array(rooms.length), next = 0;
+
+// read() 가 값을 돌려주고 두 번 연속 같으면(다 그려졌으면) 그 값으로 완료
+function waitStable(read, limit) {
+    var started = Date.now(), last = null;
+    return new Promise(function (resolve, reject) {
+        (function poll() {
+            var value = null;
+            try { value = read(); } catch (e) {}
+            if (value && value === last) { return resolve(value); }
+            last = value;
+            if (Date.now() - started > limit) { return reject(new Error('timeout')); }
+            setTimeout(poll, 150);
+        })();
+    });
+}
+
+function calendarHtml(doc) {
+    var html = Array.from(doc.querySelectorAll('.calendar_table')).map(function (table) {
+        return table.outerHTML;
+    }).join('');
+    return /\\b(enable|disable)\\b/.test(html) ? html : null;
+}
+
+async function crawlRoom(url) {
+    var frame = document.createElement('iframe'), started = Date.now();
+    frame.style.cssText = 'position:fixed;left:-10000px;top:0;width:1280px;height:1000px;border:0;';
+    try {
+        await new Promise(function (resolve, reject) {
+            frame.onload = resolve;
+            frame.onerror = function () { reject(new Error('load error')); };
+            frame.src = url;
+            document.body.appendChild(frame);
+        });
+        var doc = frame.contentDocument;
+        if (!doc) { throw new Error('iframe blocked'); }
+        await waitStable(function () { return doc.querySelector('.room_detail') ? 'ready' : null; }, timeout);
+        var detailMs = Date.now() - started;
+
+        var fields = {};
+        Object.keys(selectors).forEach(function (field) {
+            var element = doc.querySelector(selectors[field]);
+            fields[field] = element ? element.innerText.trim() : null;
+        });
+        // HTML 보관: 탭 방식의 page_source 와 같이 달력을 열기 전 페이지 전체
+        var detail = keepHtml ? doc.documentElement.outerHTML : null;
+
+        var calendars = [];
+        if (months > 0) {
+            doc.querySelector('#btn_check_schdule').click();
+            var html = await waitStable(function () { return calendarHtml(doc); }, timeout);
+            calendars.push(html);
+            // 다음 달부터는 실패하면 읽은 달까지만 (탭 방식과 같음)
+            try {
+                for (var j = 1; j < months; j++) {
+                    var before = html;
+                    doc.querySelector('#btn_next_month').click();
+                    html = await waitStable(function () {
+                        var current = calendarHtml(doc);
+                        return current !== before ? current : null;
+                    }, timeout);
+                    calendars.push(html);
+                }
+            } catch (e) {}
+        }
+        return {url: url, fields: fields, calendars: calendars, detail: detail, detail_ms: detailMs};
+    } finally {
+        frame.remove();
+    }
+}
+
+async function worker() {
+    while (next < rooms.length) {
+        var i = next++;
+        try {
+            results[i] = await crawlRoom(rooms[i]);
+        } catch (e) {
+            results[i] = {url: rooms[i], error: String((e && e.message) || e)};
+        }
+    }
+}
+
+var workers = [];
+for (var w = 0; w < Math.min(concurrency, rooms.length); w++) { workers.push(worker()); }
+Promise.all(workers).then(function () { done(results); },
+                          function (e) { done({error: String((e && e.message) || e)}); });
+"""
+
+
+def fetch_rooms(driver, links, calendar_months=3, concurrency=4, keep_html=False):
+    # links 의 상세 페이지를 브라우저 안에서 동시에 수집 → [{"url", "fields", "calendars", "detail", "detail_ms"}
+    # 또는 {"url", "error"}] (links 와 같은 순서). keep_html 이면 상세 페이지 전체 HTML 도 담는다 (HTML 보관용)
+    # detail_ms: 상세 페이지가 뜰 때까지 걸린 시간(ms)
+    if not links:
+        return []
+    # 속도 제한이 있으면 모든 브라우저가 공유하는 토큰 버킷(rate_limit.py)에서 방마다
+    # 요청 수(상세 페이지 1 + 달력 calendar_months)만큼 토큰을 받고, 받은 방들만 concurrency 개씩 넘긴다
+    # (스크립트 안에서 브라우저별로 간격을 두면 브라우저 수만큼 전체 요청 속도가 늘어난다)
+    chunk = concurrency if request_interval() else len(links)
+    results = []
+    for start in range(0, len(links), chunk):
+        part = links[start:start + chunk]
+        throttle(len(part) * (calendar_months + 1))
+        results.extend(_fetch_chunk(driver, part, calendar_months, concurrency, keep_html))
+    return results
+
+
+def _fetch_chunk(driver, links, calendar_months, concurrency, keep_html):
+    rounds = math.ceil(len(links) / concurrency)
+    driver.set_script_timeout(rounds * ROOM_TIMEOUT * (calendar_months + 1) + 30)
+    results = driver.execute_async_script(BATCH_SCRIPT, links, calendar_months, DETAIL_SELECTORS,
+                                          bool(keep_html), concurrency,
+                                          ROOM_TIMEOUT * 1000)
+    if isinstance(results, dict):
+        raise RuntimeError(results.get("error"))
+    return results
+
+
+def calendar_fragments(result):
+    # 결과의 달력 표 목록 → {"YYYY-MM": html} (이번 달부터)
+    today = datetime.date.today()
+    return {month_key(*add_months(today.year, today.month, j)): html
+            for j, html in enumerate(result["calendars"])}
+
+
+def record_from_result(thumbnail_url, result, calendar_months=3):
+    # fetch_rooms() 결과 하나 → crawl_room() 과 같은 레코드
+    bits = {month: calendar_bits_html(html) for month, html in calendar_fragments(result).items()}
+    return build_record(thumbnail_url, result["url"], result["fields"], bits, calendar_months)
@@ -0,0 +1,144 @@
+# browser.py
+#
+# 오래 실행되는 크롤링용 브라우저 재시작(recycling)과 메모리 감시.
+# 탭을 수천 번 열고 닫으면 크롬 메모리가 계속 늘고 페이지 로드가 느려지므로,
+# 방 N개를 처리했거나 크롬 프로세스 메모리(RSS)가 기준을 넘으면 브라우저를 새로 띄운다.
+#
+# ManagedBrowser 는 webdriver 를 감싸서 나머지 코드가 그대로 쓰게 하고, 재시작할 때
+# 쿠키와 마지막 검색 위치(키워드, 페이지)를 복원하므로 재시작이 호출하는 쪽에 드러나지 않는다.
+
+import collections
+import logging
+import time
+
+try:
+    import psutil
+except ImportError:  # psutil 이 없으면 메모리 기준은 쓰지 않고 방 수 기준만 사용
+    psutil = None
+
+# 재시작 기준 (configure_recycling 으로 설정, None 이면 해당 기준 사용 안 함)
+_max_rooms = None
+_max_rss_mb = None
+# 재시작 전후 평균 처리 시간을 비교할 방 수
+LATENCY_WINDOW = 20
+# 메모리 기준 재시작은 최소 이만큼 처리한 뒤에만 (새 브라우저도 기준을 넘으면 매번 재시작하는 것 방지)
+MIN_ROOMS_BETWEEN = 10
+
+
+def configure_recycling(max_rooms=None, max_rss_mb=None):
+    global _max_rooms, _max_rss_mb
+    _max_rooms = max_rooms or None
+    _max_rss_mb = max_rss_mb or None
+    if _max_rss_mb and psutil is None:
+        logging.warning("psutil 이 설치되지 않아 메모리 기준 브라우저 재시작을 사용할 수 없습니다.")
+
+
+class ManagedBrowser:
+    def __init__(self, factory, restore=None, cookies=None):
+        # factory(cookies) → 새 webdriver, restore(browser, keyword, page) → 검색 위치 복원
+        self._factory = factory
+        self._restore = restore
+        self._driver = factory(cookies)
+        self._cookies = cookies  # 브라우저가 죽어 쿠키를 읽을 수 없을 때 재시작에 사용
+        self.keyword = None  # 마지막 검색 키워드 (search_keyword 가 기록)
+        self.page = None     # 현재 검색 결과 페이지 (goto_page 가 기록)
+        self.rooms = 0       # 현재 브라우저로 처리한 방 수
+        self.recycles = 0
+        self._latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self._before_recycle = None  # 직전 재시작 전 평균 처리 시간
+
+    def __getattr__(self, name):
+        # 나머지 속성/메서드는 실제 webdriver 로 전달
+        if "_driver" not in self.__dict__:
+            raise AttributeError(name)
+        return getattr(self.__dict__["_driver"], name)
+
+    def rss_mb(self):
+        # 크롬드라이버와 그 자식(크롬 브라우저/렌더러) 프로세스의 메모리 합계 (MB). 알 수 없으면 None
+        if psutil is None:
+            return None
+        try:
+            root = psutil.Process(self._driver.service.process.pid)
+            processes = [root] + root.children(recursive=True)
+        except Exception:
+            return None
+        total = 0
+        for process in processes:
+            try:
+                total += process.memory_info().rss
+            except psutil.Error:
+                pass
+        return total / (1024 * 1024)
+
+    def average_latency(self):
+        return sum(self._latencies) / len(self._latencies) if self._latencies else None
+
+    def room_done(self, seconds):
+        self.rooms += 1
+        self._latencies.append(seconds)
+        if self._before_recycle is not None and len(self._latencies) == LATENCY_WINDOW:
+            logging.info(f"브라우저 재시작 후 방 평균 처리 시간 {self.average_latency():.2f}초 "
+                         f"(재시작 전 {self._before_recycle:.2f}초), 메모리 {_mb_text(self.rss_mb())}",
+                         extra={"stage": "recycle"})
+            self._before_recycle = None
+
+    def needs_recycle(self):
+        if _max_rooms and self.rooms >= _max_rooms:
+            return True
+        if _max_rss_mb and self.rooms >= MIN_ROOMS_BETWEEN:
+            rss = self.rss_mb()
+            return rss is not None and rss >= _max_rss_mb
+        return False
+
+    def recycle(self):
+        # 쿠키를 옮겨 새 브라우저를 띄우고 마지막 검색 위치로 돌아간다
+        rss, latency = self.rss_mb(), self.average_latency()
+        logging.info(f"브라우저 재시작: 방 {self.rooms}개 처리, 메모리 {_mb_text(rss)}, "
+                     f"최근 방 평균 {latency or 0:.2f}초", extra={"stage": "recycle"})
+        started = time.perf_counter()
+        try:
+            cookies = self._cookies = self._driver.get_cookies()
+        except Exception as e:
+            logging.warning(f"쿠키를 읽을 수 없어 마지막으로 저장한 쿠키 사용: {e}")
+            cookies = self._cookies
+        try:
+            self._driver.quit()
+        except Exception as e:
+            logging.warning(f"이전 브라우저 종료 오류: {e}")
+        self._driver = self._factory(cookies)
+        if self._restore is not None and self.keyword is not None:
+            self._restore(self, self.keyword, self.page or 1)
+
+        self.recycles += 1
+        self.rooms = 0
+        self._before_recycle = latency
+        self._latencies.clear()
+        logging.info(f"브라우저 재시작 완료 ({time.perf_counter() - started:.1f}초): 메모리 {_mb_text(self.rss_mb())}"
+                     + (f", '{self.keyword}' {self.page or 1}페이지로 복귀" if self.keyword else ""),
+                     extra={"stage": "recycle"})
+
+
+def maybe_recycle(driver):
+    # 재시작 기준을 넘었으면 재시작. 재시작했으면 True (안전한 지점, 즉 검색 결과 탭에서만 호출)
+    if isinstance(driver, ManagedBrowser) and driver.needs_recycle():
+        driver.recycle()
+        return True
+    return False
+
+
+def note_position(driver, keyword=None, page=None):
+    # 재시작 때 돌아갈 검색 위치 기록 (일반 webdriver 면 무시)
+    if isinstance(driver, ManagedBrowser):
+        if keyword is not None:
+            driver.keyword, driver.page = keyword, 1
+        if page is not None:
+            driver.page = page
+
+
+def note_room(driver, seconds):
+    if isinstance(driver, ManagedBrowser):
+        driver.room_done(seconds)
+
+
+def _mb_text(value):
+    return f"{value:.0f}MB" if value is not None else "알 수 없음"
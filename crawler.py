@@ -1,10 +1,15 @@
+import collections
+import glob
+import math
 import os
-import shutil
+import queue
+import re
+import threading
 import time
 import datetime
+import json
 import logging
-import requests
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -12,37 +17,90 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.action_chains import ActionChains
 from webdriver_manager.chrome import ChromeDriverManager
-from bs4 import BeautifulSoup
 from openpyxl import load_workbook
-from openpyxl.drawing.image import Image as ExcelImage
 from openpyxl.styles import Alignment
-
-def setup_logger():
-    logging.basicConfig(
-        level=logging.INFO,  # INFO 레벨로 설정
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),  # 콘솔 출력
-            logging.FileHandler("crawler.log")  # 로그 파일
-        ]
-    )
-
-def click_page_button(driver, nth_child):
+from openpyxl.utils import get_column_letter
+
+from log_setup import setup_queue_logging, log_context
+from rate_limit import configure_rate_limit, throttle
+from retry import retry_call
+from snapshot_store import SnapshotStore, CALENDAR_KEY
+from progress import CrawlProgress
+from sinks import CallbackSink, CsvSink, JsonlSink, SnapshotSink, StatsSink, drain
+from export import ExcelExporter, excel_sink
+from parse_pool import ParsePool
+from adaptive_concurrency import AimdController
+from batch_fetch import calendar_fragments, fetch_rooms, record_from_result
+from availability import add_months, month_key, month_label, popcount
+from extraction import (BASE_COLUMNS, DETAIL_SELECTORS, build_card_record, build_record, calendar_bits,
+                        calendar_fragment, extract_card, parse_html, reservation_summary)
+from html_archive import archive_enabled, archive_room, configure_archive
+from browser import ManagedBrowser, configure_recycling, maybe_recycle, note_position, note_room
+from profiling import profiling
+from utils import room_id_from_url
+
+SITE_URL = "https://33m2.co.kr"
+
+# 수집 스레드와 결과 기록 사이에 대기할 수 있는 최대 레코드 수
+RECORD_WINDOW = 32
+# 큐가 가득 찼을 때 중단 여부를 다시 확인하는 간격(초)
+PUT_POLL = 0.5
+
+# 페이지네이션에서 번호로 페이지 버튼 찾기
+PAGE_LINK_XPATH = "//*[contains(concat(' ', normalize-space(@class), ' '), ' pagination ')]/a[normalize-space()='{page}']"
+# 검색 결과 수 문구 ("총 1,234개", "1,234개의 방")
+RESULT_COUNT_PATTERN = re.compile(r"(\d[\d,]*)\s*개")
+# 마지막 페이지 버튼 링크/onclick 안의 페이지 번호 ("?page=57", "goPage(57)")
+LAST_PAGE_PATTERN = re.compile(r"(?:page|Page)\D{0,3}(\d+)")
+# 페이지네이션에서 지금 열린 페이지 번호 링크에 붙는 클래스
+CURRENT_PAGE_CLASSES = {"on", "active", "current", "selected", "is_current", "is_selected"}
+
+class FetchOptions:
+    # 방 수집 방식. 실행(crawl)이나 서비스 작업마다 하나씩 만들어 crawl_keyword 부터 process_rooms 까지 넘긴다
+    # (모듈 전역에 두면 서비스에서 동시에 도는 작업끼리 설정이 섞인다)
+    def __init__(self, prefetch_tabs=0, batch_fetch=0, controller=None, parse_pool=None, quick_scan=False):
+        # prefetch_tabs: 현재 방의 달력을 읽는 동안 다음 몇 개 방의 상세 탭을 미리 열어 둘지 (0 = 끔)
+        # batch_fetch: 한 페이지의 방들을 execute_async_script 한 번으로 수집할 때 동시에 열 상세 페이지 수
+        #              (batch_fetch.py, 0 = 방마다 탭 열기)
+        # controller: 일괄 수집 동시 수 자동 조절 (fetch_controller(), None 이면 batch_fetch 로 고정)
+        # parse_pool: HTML 파싱을 맡길 parse_pool.ParsePool (None 이면 수집 스레드에서 바로 파싱)
+        # quick_scan: 상세 페이지를 열지 않고 검색 결과 카드만 읽는다 (달력/관리비/청소비는 빈 칸)
+        self.prefetch_tabs = max(0, int(prefetch_tabs or 0))
+        self.batch_fetch = max(0, int(batch_fetch or 0))
+        self.controller = controller
+        self.parse_pool = parse_pool
+        self.quick_scan = bool(quick_scan)
+
+def fetch_controller(concurrency, adaptive=False, max_concurrency=16):
+    # adaptive 면 concurrency 에서 시작해 지연/오류에 따라 페이지마다 1 ~ max_concurrency 로 조절하는 컨트롤러
+    # (같은 사이트에 요청하는 모든 브라우저/작업이 하나를 공유한다)
+    concurrency = max(0, int(concurrency or 0))
+    return AimdController(concurrency, maximum=max_concurrency) if adaptive and concurrency else None
+
+DEFAULT_FETCH = FetchOptions()
+
+def setup_logger(json_log_path=None):
+    # 콘솔 + 회전 로그 파일(crawler.log) + 선택적 JSON-lines 로그를 큐 리스너 스레드에서 기록
+    setup_queue_logging("crawler.log", json_log_path=json_log_path)
+
+def click_page_button(driver, page):
+    # 현재 보이는 페이지네이션에서 page 번호 버튼을 눌러 이동
     try:
         page_button = WebDriverWait(driver, 10).until(
-            EC.element_to_be_clickable((By.CSS_SELECTOR, f".pagination > a:nth-child({nth_child})"))
+            EC.element_to_be_clickable((By.XPATH, PAGE_LINK_XPATH.format(page=page)))
         )
         driver.execute_script("arguments[0].scrollIntoView(true);", page_button)
         time.sleep(0.5)
+        throttle()
         page_button.click()
         # 페이지 로드 대기
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.CSS_SELECTOR, ".room_item"))
         )
         time.sleep(2)  # 추가 페이지 로드 대기
-        logging.info(f"이 섹션의 {nth_child - 1}번째 페이지 버튼을 성공적으로 클릭했습니다.")
+        logging.info(f"{page}페이지 버튼을 성공적으로 클릭했습니다.")
     except Exception as e:
-        logging.error(f"페이지 버튼 {nth_child} 클릭 중 오류 발생: {e}")
+        logging.error(f"{page}페이지 버튼 클릭 중 오류 발생: {e}")
         raise
 
 def click_next_section(driver):
@@ -52,6 +110,7 @@ def click_next_section(driver):
         )
         driver.execute_script("arguments[0].scrollIntoView(true);", next_button)
         time.sleep(0.5)
+        throttle()
         next_button.click()
         # 섹션 로드 대기
         WebDriverWait(driver, 10).until(
@@ -63,393 +122,1209 @@ def click_next_section(driver):
         logging.error(f"다음 섹션 버튼 클릭 중 오류 발생: {e}")
         raise
 
-def test_pagination(driver, data_list, image_dir, max_sections=100, pages_per_section=10):
-    section_number = 1  # 섹션 번호 초기화
+def has_element(driver, css_selector):
+    # 대기 없이 현재 페이지에 요소가 있는지만 확인 (마지막 페이지 판별용)
+    return bool(driver.find_elements(By.CSS_SELECTOR, css_selector))
+
+def read_pagination(driver):
+    # 페이지네이션 링크 정보를 스크립트 한 번으로 수집 (요소마다 WebDriver 왕복하지 않음)
+    return driver.execute_script("""
+        return Array.from(document.querySelectorAll('.pagination > a')).map(function (a) {
+            return {text: a.textContent.trim(), cls: a.className || '',
+                    href: a.getAttribute('href') || '', onclick: a.getAttribute('onclick') || '',
+                    page: a.getAttribute('data-page') || '', current: a.getAttribute('aria-current') || ''};
+        });
+    """) or []
+
+def visible_pages(links):
+    return [int(link["text"]) for link in links if link["text"].isdigit()]
+
+def shown_page(driver, current):
+    # 지금 열려 있는 페이지 번호를 페이지네이션에서 다시 읽는다. goto_page 가 실패해 페이지를 건너뛸 때
+    # 이동 도중(다음 섹션까지는 넘어간 뒤 등) 실패했을 수 있으므로 모든 페이지 순회에서 이 값으로 current 를 고친다.
+    # 표시된 번호가 없으면 current 가 보이는 섹션 안에 있을 때는 그대로, 아니면 섹션 첫 페이지
+    # (다음 섹션 이동은 성공하고 번호 클릭만 실패한 경우). 읽지 못하면 current 그대로
+    try:
+        links = read_pagination(driver)
+    except Exception as e:
+        logging.warning(f"현재 페이지 번호 확인 실패: {e}")
+        return current
+    for link in links:
+        if link["text"].isdigit() and (link.get("current") or CURRENT_PAGE_CLASSES & set(link["cls"].split())):
+            return int(link["text"])
+    numbers = visible_pages(links)
+    if not numbers or current in numbers:
+        return current
+    return min(numbers)
+
+def read_result_count(driver):
+    # "총 1,234개" 같은 검색 결과 수 문구가 있으면 읽는다 (없으면 None)
+    # 검색 결과 머리글만 본다: 첫 방 카드보다 앞에 있고 카드 안이 아닌 요소 (카드의 후기 수 "12개" 등 제외)
+    texts = driver.execute_script("""
+        var first = document.querySelector('.result_room, .room_item');
+        return Array.from(document.querySelectorAll(
+            '[class*="result"] [class*="count"], [class*="result"] [class*="total"], '
+            + '[class*="result"] strong, [class*="result"] em'
+        )).filter(function (el) {
+            return !el.closest('.result_room, .room_item')
+                && (!first || (el.compareDocumentPosition(first) & Node.DOCUMENT_POSITION_FOLLOWING));
+        }).slice(0, 50).map(function (el) { return el.textContent; });
+    """) or []
+    for text in texts:
+        match = RESULT_COUNT_PATTERN.search(text)
+        if match:
+            return int(match.group(1).replace(",", ""))
+    return None
+
+def discover_total_pages(driver):
+    # 검색 직후 전체 페이지 수를 알아낸다 → (페이지 수, 정확한 값인지)
+    # 1) 다음 섹션이 없으면 보이는 마지막 번호가 끝
+    # 2) 마지막 페이지 버튼에 페이지 번호가 있으면 사용
+    # 3) 검색 결과 수 ÷ 페이지당 방 수
+    # 4) 모두 실패하면 보이는 마지막 번호를 하한값으로 사용 (섹션을 넘기며 갱신)
+    try:
+        links = read_pagination(driver)
+        visible = max(visible_pages(links), default=1)
+        if not any({"next", "is_active"} <= set(link["cls"].split()) for link in links):
+            return visible, True
+
+        # 다음 섹션이 있으므로 2), 3) 의 값이 보이는 마지막 번호 이하면 엉뚱한 값(다른 숫자)으로 보고 쓰지 않는다
+        for link in links:
+            if {"last", "end"} & set(link["cls"].split()):
+                match = re.search(r"\d+", link["page"]) or LAST_PAGE_PATTERN.search(link["href"] + " " + link["onclick"])
+                last = int(match.group(match.lastindex or 0)) if match else 0
+                if last > visible:
+                    return last, True
+
+        total_rooms = read_result_count(driver)
+        rooms_per_page = len(driver.find_elements(By.CSS_SELECTOR, ".room_item"))
+        if total_rooms and rooms_per_page:
+            last = math.ceil(total_rooms / rooms_per_page)
+            if last > visible:
+                return last, True
+
+        return visible, False
+    except Exception as e:
+        logging.warning(f"총 페이지 수를 확인할 수 없습니다: {e}")
+        return 1, False
+
+def goto_page(driver, current, page):
+    # current 페이지에서 page 로 이동. 보이는 번호면 바로 클릭, 아니면 다음 섹션으로 넘기며 찾는다.
+    # 이동한 페이지 번호를 반환, 검색 결과의 끝이면 None (대기/타임아웃 없음)
+    while current != page:
+        links = read_pagination(driver)
+        numbers = visible_pages(links)
+        if page in numbers:
+            retry_call(click_page_button, driver, page, stage="page")
+            note_position(driver, page=page)
+            return page
+        if not any({"next", "is_active"} <= set(link["cls"].split()) for link in links):
+            return None
+        retry_call(click_next_section, driver, stage="section")
+        # 다음 섹션으로 이동하면 바로 그 섹션의 첫 페이지가 열린다
+        current = max(numbers, default=current) + 1
+        note_position(driver, page=current)
+    return current
+
+def crawl_pages(driver, start_page, end_page=None, dead_letters=None, calendar_months=3, progress=None,
+                fetch=DEFAULT_FETCH):
+    # 검색 결과 1페이지에 있는 driver 로 start_page ~ end_page(포함, None 이면 끝까지) 를 수집해
+    # 레코드를 하나씩 내보낸다
+    current = 1
+    page = start_page
+    while end_page is None or page <= end_page:
+        # 페이지 이동 실패는 해당 페이지만 건너뛰고 다음 페이지로 진행
+        try:
+            moved = goto_page(driver, current, page)
+        except Exception as e:
+            logging.error(f"{page}페이지 이동 실패 → 이 페이지 건너뜀: {e}")
+            page += 1
+            current = shown_page(driver, current)
+            continue
+        if moved is None:
+            logging.info(f"마지막 페이지({current})까지 처리했습니다.")
+            break
+        current = moved
+
+        rooms = 0
+        for record in process_rooms(driver, dead_letters, calendar_months, fetch):  # 각 페이지 크롤링
+            rooms += 1
+            yield record
+        if progress is not None:
+            if not progress.exact:
+                # 전체 페이지 수를 모르면 새로 보이는 번호로 갱신
+                progress.update_total(*discover_total_pages(driver))
+            progress.page_done(rooms)
+        # 페이지 사이(검색 결과 탭)에서만 브라우저 재시작 → 같은 페이지로 복귀
+        maybe_recycle(driver)
+        page += 1
+
+def test_pagination(driver, max_sections=100, pages_per_section=10, dead_letters=None,
+                    calendar_months=3, progress=None, fetch=DEFAULT_FETCH):
+    # 2페이지부터 마지막 페이지(최대 max_sections 섹션)까지 수집
+    yield from crawl_pages(driver, 2, max_sections * pages_per_section, dead_letters,
+                           calendar_months, progress, fetch)
+    logging.info("페이지 넘기기 기능이 성공적으로 작동합니다.")
+
+# 현재 상세 탭의 달력 표 HTML
+CALENDAR_HTML_SCRIPT = """
+    return Array.from(document.querySelectorAll('.calendar_table')).map(function (table) {
+        return table.outerHTML;
+    }).join('');
+"""
+# 검색 결과 페이지의 카드마다 링크, 썸네일, 제목, 카드 글자 줄 (한 번의 호출로)
+CARD_SCRIPT = """
+    var items = document.querySelectorAll('.room_item');
+    return Array.from(document.querySelectorAll('.result_room > a')).map(function (link, i) {
+        var item = link.querySelector('.room_item') || items[i], img = item && item.querySelector('dt > img');
+        var title = item && item.querySelector('[class*="title"], [class*="name"]');
+        var lines = item ? item.innerText.split('\\n').map(function (line) {
+            return line.trim();
+        }).filter(Boolean) : [];
+        return {url: link.href, thumbnail: img ? img.src : null, lines: lines,
+                title: title ? title.textContent.trim() || null : null};
+    });
+"""
+
+def open_tab(driver, link):
+    # 새 탭에서 링크를 연다 (작업 중인 탭은 그대로). 새 탭의 핸들 반환
+    throttle()
+    before = set(driver.window_handles)
+    driver.execute_script("window.open(arguments[0]);", link)
+    opened = [handle for handle in driver.window_handles if handle not in before]
+    if not opened:
+        raise RuntimeError(f"새 탭을 열지 못했습니다: {link}")
+    return opened[0]
+
+def close_tab(driver, handle, home):
+    # handle 탭을 닫고 검색 결과 탭(home)으로 돌아간다
+    try:
+        if handle != home and handle in driver.window_handles:
+            driver.switch_to.window(handle)
+            driver.close()
+    finally:
+        driver.switch_to.window(home)
 
-    while section_number <= max_sections:
-        
+def close_detail_tab(driver, home):
+    # 상세 탭(현재 탭)이 열려 있으면 닫고 검색 결과 탭(home)으로 돌아간다
+    try:
+        current = driver.current_window_handle
+    except Exception:
+        current = None  # 현재 탭이 이미 닫힌 경우
+    close_tab(driver, current, home)
+
+def open_detail_tab(driver, link, handle=None):
+    # 상세 탭으로 전환: handle 이 있으면 미리 열어 둔 탭, 없으면 새 탭에서 링크 열기. 탭 핸들 반환
+    prefetched = handle is not None
+    if not prefetched:
+        handle = open_tab(driver, link)
+    driver.switch_to.window(handle)
+
+    # 페이지 로드 대기
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, ".room_detail"))
+    )
+    if not prefetched:
+        time.sleep(1)  # 추가 로드 대기 (미리 연 탭은 이전 방을 처리하는 동안 이미 로드됨)
+    return handle
+
+def prefetch_detail_tabs(driver, rooms, start, ahead, tabs):
+    # 현재 방(start) 다음 tabs 개 방 중 아직 열지 않은 방의 상세 탭을 미리 연다 (ahead: 순번 → 핸들)
+    # 현재 방 탭은 미리 열지 않았으면 process_room 이 연다
+    for idx in range(start + 1, min(start + 1 + tabs, len(rooms))):
+        if idx in ahead:
+            continue
         try:
-            if section_number == 1:
-                # 첫 번째 섹션: 페이지 2는 a:nth-child(2), 페이지 3~12는 a:nth-child(4) ~ a:nth-child(11)
-                click_page_button(driver, 2)  # 페이지 2
-                process_rooms(driver, data_list, image_dir)  # 페이지 2 크롤링
-
-                for nth in range(4, 12):  # 페이지 3~10
-                    click_page_button(driver, nth)
-                    process_rooms(driver, data_list, image_dir)  # 각 페이지 크롤링
-            else:
-                # 두 번째 섹션 이상: 페이지 12, 22, ...는 a:nth-child(3), 페이지 13~22, 23~32, ...는 a:nth-child(4) ~ a:nth-child(11)
-                click_page_button(driver, 3)  # 두번째 페이지 (12, 22, 32, ...)
-                process_rooms(driver, data_list, image_dir)  # 첫 페이지 크롤링
+            ahead[idx] = open_tab(driver, rooms[idx][1])
+        except Exception as e:
+            logging.warning(f"상세 탭 미리 열기 실패: {e}")
+            break
+
+def read_calendar_month(driver):
+    # 페이지 완전히 로드될 때까지 대기
+    WebDriverWait(driver, 10).until(
+        lambda d: d.execute_script('return document.readyState') == 'complete'
+    )
+
+    # 예약 상태 추출
+    soup = parse_html(driver.page_source)
+
+    # 날짜별 예약 가능 여부를 비트맵으로 (booked_bits, known_bits) + 보관용 달력 표 HTML
+    booked, known = calendar_bits(soup)
+    return booked, known, calendar_fragment(soup)
+
+def read_calendar_html(driver):
+    # 달력 표 HTML 만 브라우저에서 잘라 온다 (페이지 전체를 받아 파싱하지 않음)
+    WebDriverWait(driver, 10).until(
+        lambda d: d.execute_script('return document.readyState') == 'complete'
+    )
+    return driver.execute_script(CALENDAR_HTML_SCRIPT) or ""
+
+def click_next_month(driver):
+    # 다음 달 버튼 클릭
+    next_month_btn = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "#btn_next_month > img"))
+    )
+    driver.execute_script("arguments[0].scrollIntoView(true);", next_month_btn)
+    time.sleep(0.5)
+    throttle()
+    actions = ActionChains(driver)
+    actions.move_to_element(next_month_btn).click().perform()
+
+    # 다음 달 페이지 로드 대기
+    WebDriverWait(driver, 10).until(
+        lambda d: d.execute_script('return document.readyState') == 'complete'
+    )
+    time.sleep(1)  # 추가 로드 대기
 
-                for nth in range(4, 12):  # 페이지 다음 8개 (3번째~10번째 페이지)
-                    click_page_button(driver, nth)
-                    process_rooms(driver, data_list, image_dir)  # 각 페이지 크롤링
+def read_calendar(driver, calendar_months, read_month):
+    # 예약 확인 달력을 열어 calendar_months 개월을 차례로 넘기며 read_month(driver, 연, 월) 호출
+    # 예약 확인 버튼 클릭
+    reservation_check_btn = WebDriverWait(driver, 10).until(
+        EC.element_to_be_clickable((By.CSS_SELECTOR, "#btn_check_schdule"))
+    )
+    throttle()
+    reservation_check_btn.click()
+    time.sleep(1)  # 예약 상태 로드 대기
+
+    today = datetime.date.today()
+    for j in range(calendar_months):
+        try:
+            # 연/월 계산 (12월 이후에는 다음 해 1월)
+            year, month_num = add_months(today.year, today.month, j)
+            read_month(driver, year, month_num)
 
-            # 다음 섹션으로 이동
-            click_next_section(driver)
-            # 다음 섹션으로 이동하자마자 바로 첫페이지가 나오기때문에 여기도 크롤링하고넘어가야함
-            process_rooms(driver, data_list, image_dir)
-            section_number += 1
+            # 마지막 달이면 다음 달 버튼을 누를 필요 없음
+            if j < calendar_months - 1:
+                retry_call(click_next_month, driver, stage="calendar")
 
         except Exception as e:
-            logging.warning(f"섹션 {section_number} 처리 중 오류 발생 또는 마지막 페이지: {e}")
-            break  # 오류 발생 시 페이지네이션 테스트 종료
+            logging.warning(f"예약 데이터 수집 오류: {e}")
+            break  # 오류 발생 시 루프 종료
+
+def read_reservations(driver, calendar_months=3, fragments=None):
+    # 예약 확인 달력을 열어 calendar_months 개월의 월별 예약 현황, 전체 예약률,
+    # 월별 날짜 비트맵({"YYYY-MM": (booked_bits, known_bits)})을 읽는다
+    # fragments 딕셔너리를 주면 월별 달력 표 HTML 도 담는다 (HTML 보관용)
+    bits_by_month = {}
+
+    def read_month(driver, year, month_num):
+        booked, known, fragment = retry_call(read_calendar_month, driver, stage="calendar")
+        # 예약 상태 저장
+        bits_by_month[month_key(year, month_num)] = (booked, known)
+        if fragments is not None:
+            fragments[month_key(year, month_num)] = fragment
+        logging.info(f"{month_num}월 예약현황 : {popcount(booked)} / {popcount(known)}")
+
+    read_calendar(driver, calendar_months, read_month)
+
+    # 월별 현황과 예약률 계산
+    reservation_data, reservation_rate = reservation_summary(bits_by_month, calendar_months)
+    if reservation_rate is None:
+        logging.warning("읽은 예약 날짜가 없어 예약률을 알 수 없음")
+    else:
+        logging.info(f"평균 예약률: {reservation_rate * 100:.1f}%")
+
+    return reservation_data, reservation_rate, bits_by_month
+
+def read_calendar_fragments(driver, calendar_months=3):
+    # 파싱 프로세스용: 파싱하지 않고 월별 달력 표 HTML 만 모은다 {"YYYY-MM": html}
+    fragments = {}
+
+    def read_month(driver, year, month_num):
+        fragments[month_key(year, month_num)] = retry_call(read_calendar_html, driver, stage="calendar")
+
+    read_calendar(driver, calendar_months, read_month)
+    return fragments
+
+def crawl_room(driver, thumbnail_url, link, calendar_months=3, home=None, handle=None, parse_async=False,
+               fetch=DEFAULT_FETCH):
+    # 상세 탭을 열어(handle 이 있으면 미리 열어 둔 탭 사용) 한 게시물의 정보와 예약 현황을 수집하고
+    # 탭을 닫은 뒤 검색 결과 탭(home, 기본: 현재 탭)으로 돌아온다
+    # parse_async 면 HTML 만 모아 파싱 프로세스 풀(fetch.parse_pool)에 넘기고 레코드 대신 Future 를 반환
+    home = home or driver.current_window_handle
+    open_detail_tab(driver, link, handle)
+    if parse_async:
+        snapshot = {"url": link, "thumbnail": thumbnail_url, "detail": driver.page_source,
+                    "horizon": calendar_months}
+        snapshot["calendars"] = read_calendar_fragments(driver, calendar_months)
+        archive_room(link, thumbnail_url, snapshot["detail"], snapshot["calendars"])
+        close_detail_tab(driver, home)
+        if not fetch.prefetch_tabs:
+            time.sleep(0.5)
+        return fetch.parse_pool.submit(snapshot)
+
+    # HTML 보관이 켜져 있으면 달력을 열기 전의 상세 페이지를 보관
+    detail_html = driver.page_source if archive_enabled() else None
+    fragments = {} if detail_html is not None else None
+
+    # 방 상세 정보 수집
+    details = {field: driver.find_element(By.CSS_SELECTOR, selector).text
+               for field, selector in DETAIL_SELECTORS.items()}
+
+    _, _, bits_by_month = read_reservations(driver, calendar_months, fragments)
+
+    # 데이터 딕셔너리 준비 (날짜별 비트맵은 엑셀에는 쓰지 않고 예약 스냅샷 DB 에 저장)
+    data = build_record(thumbnail_url, link, details, bits_by_month, calendar_months)
+    if detail_html is not None:
+        archive_room(link, thumbnail_url, detail_html, fragments)
+
+    # 현재 탭 닫고 원래 탭으로 전환
+    close_detail_tab(driver, home)
+    if not fetch.prefetch_tabs:
+        time.sleep(0.5)
+    return data
+
+def process_room(driver, thumbnail_url, link, label="", calendar_months=3, handle=None, parse_async=False,
+                 fetch=DEFAULT_FETCH):
+    # 한 게시물을 재시도 정책에 따라 수집. 최종 실패 시 None 반환
+    # handle: 미리 열어 둔 상세 탭 (첫 시도에만 사용)
+    # parse_async 면 레코드 대신 파싱 결과 Future 반환 (crawl_room 참고)
+    room_id = room_id_from_url(link)
+    room_started = time.perf_counter()
+    home = driver.current_window_handle
+    tabs = [handle]
+    try:
+        logging.info(f"게시물 처리 중 {label}: {link}",
+                     extra={"room_id": room_id, "stage": "room_start"})
 
-    logging.info("페이지 넘기기 기능이 성공적으로 작동합니다.")
+        def attempt():
+            tab, tabs[0] = tabs[0], None
+            return crawl_room(driver, thumbnail_url, link, calendar_months, home, tab, parse_async, fetch)
+
+        # 실패한 시도의 탭은 닫고 새 탭에서 처음부터 다시 시도
+        data = retry_call(attempt, stage="detail", on_retry=lambda: close_detail_tab(driver, home))
 
-def get_total_pages(driver):
+        duration = time.perf_counter() - room_started
+        logging.info("HTML 수집됨 → 파싱 대기" if parse_async else f"데이터 추가됨: {data['매물명']}",
+                     extra={"room_id": room_id, "stage": "room_done", "duration": round(duration, 3)})
+        note_room(driver, duration)
+        return data
 
+    except Exception as e:
+        logging.error(f"게시물 처리 중 오류: {e}", exc_info=True,
+                      extra={"room_id": room_id, "stage": "room_error",
+                             "duration": round(time.perf_counter() - room_started, 3)})
+        # 오류 발생 시 현재 탭 닫고 원래 탭으로 전환
+        close_detail_tab(driver, home)
+        if tabs[0] is not None:
+            close_tab(driver, tabs[0], home)  # 한 번도 쓰지 못한 미리 연 탭
+        return None
+
+def list_rooms(driver):
+    # 현재 검색 결과 페이지의 (썸네일, 상세 링크) 목록
+    # 모든 방 링크 찾기
+    room_links = driver.find_elements(By.CSS_SELECTOR, ".result_room > a")
+    links = [link.get_attribute('href') for link in room_links]
+
+    # 썸네일 추출
+    room_elements = driver.find_elements(By.CSS_SELECTOR, ".room_item")
+    thumbnails = []
+    for idx, room in enumerate(room_elements, start=1):
+        try:
+            thumbnail_url = room.find_element(By.CSS_SELECTOR, ".room_item > dt > img").get_attribute('src')
+            thumbnails.append(thumbnail_url)
+        except Exception as e:
+            logging.warning(f"썸네일 추출 오류: {e}")
+            thumbnails.append(None)
+
+    # 링크와 썸네일 수가 일치하는지 확인
+    if len(links) != len(thumbnails):
+        logging.warning("링크 수와 썸네일 수가 일치하지 않습니다.")
+    return list(zip(thumbnails, links))
+
+def process_rooms(driver, dead_letters=None, calendar_months=3, fetch=DEFAULT_FETCH):
+    # 현재 검색 결과 페이지의 게시물을 하나씩 수집해 레코드를 내보낸다 (수집 방식은 fetch)
     try:
-        pagination = driver.find_element(By.CSS_SELECTOR, ".pagination")
-        page_buttons = pagination.find_elements(By.TAG_NAME, "a")
-        page_numbers = []
-        for btn in page_buttons:
-            text = btn.text.strip()
-            if text.isdigit():
-                page_numbers.append(int(text))
-        return max(page_numbers) if page_numbers else 1
+        if fetch.quick_scan:
+            yield from process_cards(driver)
+            return
+        rooms = list_rooms(driver)
+        if fetch.batch_fetch:
+            yield from process_rooms_batched(driver, rooms, dead_letters, calendar_months, fetch)
+            return
+        home = driver.current_window_handle
+        ahead = {}  # 미리 열어 둔 상세 탭 (방 순번 → 핸들)
+        parsing = collections.deque()  # 파싱 중인 방 (Future, 썸네일, 링크), 수집 순서대로
+
+        try:
+            # 각 게시물을 순회하며 데이터 수집
+            for idx, (thumbnail_url, link) in enumerate(rooms):
+                if fetch.prefetch_tabs:
+                    # 다음 방들의 탭을 미리 열어 두고, 현재 방을 처리하는 동안 로드되게 한다
+                    prefetch_detail_tabs(driver, rooms, idx, ahead, fetch.prefetch_tabs)
+                data = process_room(driver, thumbnail_url, link, f"{idx + 1}/{len(rooms)}", calendar_months,
+                                    ahead.pop(idx, None), fetch.parse_pool is not None, fetch)
+                if data is None:
+                    if dead_letters is not None:
+                        # 재시도까지 실패한 게시물은 키워드 마지막에 다시 시도
+                        dead_letters.append((thumbnail_url, link))
+                elif fetch.parse_pool is None:
+                    yield data
+                else:
+                    # 파싱은 다른 프로세스에서: 먼저 끝난 것만 내보내고 바로 다음 방 수집
+                    parsing.append((data, thumbnail_url, link))
+                    yield from parsed_records(parsing, dead_letters)
+            yield from parsed_records(parsing, dead_letters, wait=True)
+        finally:
+            # 중간에 멈췄으면 남은 미리 연 탭 정리
+            for handle in ahead.values():
+                close_tab(driver, handle, home)
+
     except Exception as e:
-        logging.warning(f"총 페이지 수를 확인할 수 없습니다: {e}")
-        return 1
+        logging.error(f"process_rooms 함수 오류: {e}", exc_info=True)
 
-def process_rooms(driver, data_list, image_dir):
+def process_cards(driver):
+    # 빠른 훑어보기: 상세 탭을 열지 않고 현재 페이지의 카드 글자에서 필드를 읽는다
+    cards = driver.execute_script(CARD_SCRIPT)
+    for card in cards:
+        if card["url"]:
+            yield build_card_record(card["thumbnail"], card["url"], extract_card(card["lines"], card.get("title")))
+    logging.info(f"카드 {len(cards)}개 수집 (상세 페이지 생략)")
+
+def process_rooms_batched(driver, rooms, dead_letters=None, calendar_months=3, fetch=DEFAULT_FETCH):
+    # 페이지의 방들을 브라우저 안에서 한꺼번에 수집. 실패한 방만 탭을 여는 방식으로 다시 수집
+    started = time.perf_counter()
+    controller = fetch.controller
     try:
-        # 모든 방 링크 찾기
-        room_links = driver.find_elements(By.CSS_SELECTOR, ".result_room > a")
-        links = [link.get_attribute('href') for link in room_links]
-
-        # 썸네일 추출
-        room_elements = driver.find_elements(By.CSS_SELECTOR, ".room_item")
-        thumbnails = []
-        for idx, room in enumerate(room_elements, start=1):
+        results = fetch_rooms(driver, [link for _, link in rooms], calendar_months,
+                              controller.current if controller else fetch.batch_fetch, archive_enabled())
+    except Exception as e:
+        logging.warning(f"일괄 수집 실패 → 방마다 탭을 열어 수집: {e}")
+        results = [None] * len(rooms)
+    if controller is not None and rooms:
+        # 이 페이지의 상세 페이지 지연/실패로 다음 페이지의 동시 수 결정 (묶음 전체 실패도 실패로 센다)
+        for result in results:
+            if result is None or result.get("error"):
+                controller.record(error=True)
+            else:
+                controller.record(result["detail_ms"] / 1000)
+        controller.adjust()
+    per_room = (time.perf_counter() - started) / max(1, len(rooms))
+
+    for idx, ((thumbnail_url, link), result) in enumerate(zip(rooms, results)):
+        data = None
+        if result and not result.get("error"):
             try:
-                thumbnail_url = room.find_element(By.CSS_SELECTOR, ".room_item > dt > img").get_attribute('src')
-                thumbnails.append(thumbnail_url)
+                data = record_from_result(thumbnail_url, result, calendar_months)
             except Exception as e:
-                logging.warning(f"썸네일 추출 오류: {e}")
-                thumbnails.append(None)
+                result = {"error": e}
+            else:
+                if result.get("detail") is not None:
+                    archive_room(link, thumbnail_url, result["detail"], calendar_fragments(result))
+                logging.info(f"데이터 추가됨: {data['매물명']}",
+                             extra={"room_id": room_id_from_url(link), "stage": "room_done",
+                                    "duration": round(per_room, 3)})
+                note_room(driver, per_room)
+        if data is None:
+            if result:
+                logging.warning(f"일괄 수집 실패 ({link}): {result.get('error')} → 탭을 열어 다시 수집")
+            data = process_room(driver, thumbnail_url, link, f"{idx + 1}/{len(rooms)}", calendar_months,
+                                fetch=fetch)
+        if data is not None:
+            yield data
+        elif dead_letters is not None:
+            dead_letters.append((thumbnail_url, link))
+
+def parsed_records(parsing, dead_letters=None, wait=False):
+    # 파싱이 끝난 레코드를 수집 순서대로 내보낸다 (wait 면 남은 파싱이 모두 끝날 때까지 기다림)
+    while parsing and (wait or parsing[0][0].done()):
+        future, thumbnail_url, link = parsing.popleft()
+        try:
+            data = future.result()
+        except Exception as e:
+            logging.error(f"HTML 파싱 오류 ({link}): {e}", exc_info=True)
+            if dead_letters is not None:
+                dead_letters.append((thumbnail_url, link))
+            continue
+        logging.info(f"데이터 추가됨: {data['매물명']}",
+                     extra={"room_id": room_id_from_url(link), "stage": "parsed"})
+        yield data
+
+def retry_dead_letters(driver, dead_letters, calendar_months=3, failed=None, fetch=DEFAULT_FETCH):
+    # 실패 목록(dead letter)에 남은 게시물을 한 번 더 수집. 끝까지 실패한 게시물은 failed 에 담는다
+    if not dead_letters:
+        return
+    logging.info(f"실패한 게시물 {len(dead_letters)}개 재시도")
+    remaining = []
+    for idx, (thumbnail_url, link) in enumerate(dead_letters, start=1):
+        data = process_room(driver, thumbnail_url, link, f"재시도 {idx}/{len(dead_letters)}", calendar_months,
+                            fetch=fetch)
+        if data is not None:
+            yield data
+        else:
+            remaining.append((thumbnail_url, link))
+    if remaining:
+        logging.warning(f"최종 수집 실패 게시물 {len(remaining)}개: "
+                        + ", ".join(link for _, link in remaining))
+    if failed is not None:
+        failed.extend(remaining)
+
+def add_average_row(ws):
+    # 마지막 행 아래에 "예약률 전체 평균" 행 추가
+    try:
+        # "예약률" 열 찾기
+        reservation_rate_col = None
+        for col in range(1, ws.max_column + 1):
+            if ws.cell(row=1, column=col).value == "예약률":
+                reservation_rate_col = col
+                break
+
+        if reservation_rate_col is not None:
+            total_rate = 0
+            count = 0
+            for row in range(2, ws.max_row + 1):
+                cell_value = ws.cell(row=row, column=reservation_rate_col).value
+                if cell_value:
+                    try:
+                        rate = float(cell_value.strip('%')) / 100
+                        total_rate += rate
+                        count += 1
+                    except:
+                        pass
 
-        # 링크와 썸네일 수가 일치하는지 확인
-        if len(links) != len(thumbnails):
-            logging.warning("링크 수와 썸네일 수가 일치하지 않습니다.")
+            average_rate = (total_rate / count) if count > 0 else 0
 
-        # 각 게시물을 순회하며 데이터 수집
-        for idx, (thumbnail_url, link) in enumerate(zip(thumbnails, links), start=1):
-            try:
-                logging.info(f"게시물 처리 중 {idx}/{len(links)}: {link}")
-
-                # 새 탭에서 링크 열기
-                driver.execute_script("window.open(arguments[0]);", link)
-                driver.switch_to.window(driver.window_handles[1])
-
-                # 페이지 로드 대기
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, ".room_detail"))
-                )
-                time.sleep(1)  # 추가 로드 대기
-
-                # 방 상세 정보 수집
-                title = driver.find_element(By.CSS_SELECTOR, "body > div.wrap > section > div > div.room_detail > div:nth-child(1) > div.title > strong").text
-                address = driver.find_element(By.CSS_SELECTOR, "body > div.wrap > section > div > div.room_detail > div:nth-child(1) > p").text
-                area = driver.find_element(By.CSS_SELECTOR, ".place_detail > li:nth-child(1) > strong").text
-                type_of_room = driver.find_element(By.CSS_SELECTOR, ".place_detail > li:nth-child(2) > strong").text
-                weekly_rent_price = driver.find_element(By.CSS_SELECTOR, ".tbl_style > tbody > tr > td:nth-child(1)").text
-                management_price = driver.find_element(By.CSS_SELECTOR, ".tbl_style > tbody > tr > td:nth-child(2)").text
-                cleaning_price = driver.find_element(By.CSS_SELECTOR, ".tbl_style > tbody > tr > td:nth-child(3)").text
-
-                # 예약 확인 버튼 클릭
-                reservation_check_btn = WebDriverWait(driver, 10).until(
-                    EC.element_to_be_clickable((By.CSS_SELECTOR, "#btn_check_schdule"))
-                )
-                reservation_check_btn.click()
-                time.sleep(1)  # 예약 상태 로드 대기
-
-                # 예약 데이터 초기화
-                reservation_data = {}
-                total_disabled = 0
-                total_total = 0
-                current_month = datetime.datetime.now().month
-
-                for j in range(1, 4):
-                    try:
-                        # 페이지 완전히 로드될 때까지 대기
-                        WebDriverWait(driver, 10).until(
-                            lambda d: d.execute_script('return document.readyState') == 'complete'
-                        )
-
-                        # 예약 상태 추출
-                        html = driver.page_source
-                        soup = BeautifulSoup(html, 'html.parser')
-
-                        month_disabled = len(soup.select('.calendar_table > thead > tr > .disable'))
-                        month_enabled = len(soup.select(".calendar_table > thead > tr > .enable"))
-                        month_total = month_disabled + month_enabled
-
-                        # 총합 누적
-                        total_disabled += month_disabled
-                        total_total += month_total
-
-                        # 월 번호 계산 (12월 이후에는 1월로 돌아감)
-                        month_num = (current_month + j - 1) % 12
-                        month_num = 12 if month_num == 0 else month_num
-
-                        # 예약 상태 저장
-                        reservation_data[f"{month_num}월 예약"] = f"{month_disabled}/{month_total}"
-                        logging.info(f"{month_num}월 예약현황 : {month_disabled} / {month_total}")
-
-                        # 다음 달 버튼 클릭
-                        next_month_btn = WebDriverWait(driver, 10).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, "#btn_next_month > img"))
-                        )
-                        driver.execute_script("arguments[0].scrollIntoView(true);", next_month_btn)
-                        time.sleep(0.5)
-                        actions = ActionChains(driver)
-                        actions.move_to_element(next_month_btn).click().perform()
-
-                        # 다음 달 페이지 로드 대기
-                        WebDriverWait(driver, 10).until(
-                            lambda d: d.execute_script('return document.readyState') == 'complete'
-                        )
-                        time.sleep(1)  # 추가 로드 대기
-
-                    except Exception as e:
-                        logging.warning(f"예약 데이터 수집 오류: {e}")
-                        break  # 오류 발생 시 루프 종료
-
-                # 예약률 계산
-                reservation_rate = (total_disabled / total_total) if total_total > 0 else 0
-                logging.info(f"평균 예약률: {reservation_rate * 100:.1f}%")
-
-                # 데이터 딕셔너리 준비
-                data = {
-                    "대표이미지": thumbnail_url,
-                    "매물명": title,
-                    "주소": address,
-                    "건물유형": type_of_room,
-                    "전용면적": area,
-                    "임대료(1주)": weekly_rent_price,
-                    "관리비용": management_price,
-                    "청소비용": cleaning_price,
-                    "URL": link  # 'URL'을 키로 사용
-                }
-
-                # 예약 데이터와 예약률 추가
-                data.update(reservation_data)
-                data["예약률"] = f"{reservation_rate:.2%}"
-
-                # 데이터 리스트에 추가
-                data_list.append(data)
-
-                logging.info(f"데이터 추가됨: {title}")
-
-                # 현재 탭 닫고 원래 탭으로 전환
-                driver.close()
-                driver.switch_to.window(driver.window_handles[0])
-                time.sleep(0.5)
+            # 평균을 위한 새로운 행 추가
+            average_row = ws.max_row + 1
+            label_col = reservation_rate_col - 1  # "예약률" 열 앞 열
 
-            except Exception as e:
-                logging.error(f"게시물 처리 중 오류: {e}", exc_info=True)
-                # 오류 발생 시 현재 탭 닫고 원래 탭으로 전환
-                if len(driver.window_handles) > 1:
-                    driver.close()
-                    driver.switch_to.window(driver.window_handles[0])
-                continue
+            ws.cell(row=average_row, column=label_col).value = "예약률 전체 평균"
+            ws.cell(row=average_row, column=label_col).alignment = Alignment(horizontal='center', vertical='center')
+            ws.cell(row=average_row, column=label_col).font = ws.cell(row=average_row, column=label_col).font.copy(bold=True)
 
-    except Exception as e:
-        logging.error(f"process_rooms 함수 오류: {e}", exc_info=True)
+            ws.cell(row=average_row, column=reservation_rate_col).value = f"{average_rate:.2%}"
+            ws.cell(row=average_row, column=reservation_rate_col).alignment = Alignment(horizontal='center', vertical='center')
 
-def crawl(keywords, base_image_dir, output_dir, max_sections=100, pages_per_section=10):
-    setup_logger()
+            logging.info(f"전체 평균 예약률 추가됨: {average_rate:.1%}")
+        else:
+            logging.warning("'예약률' 열을 찾을 수 없습니다.")
+    except Exception as e:
+        logging.error(f"평균 예약률 계산 오류: {e}", exc_info=True)
 
+def create_driver(cookies=None, headless=False):
     # 크롬 드라이버 옵션
     chrome_options = webdriver.ChromeOptions()
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--no-sandbox')
+    if headless:
+        # 화면 없는 서버/스케줄러 실행용
+        chrome_options.add_argument('--headless=new')
+        chrome_options.add_argument('--window-size=1920,1080')
+        chrome_options.add_argument('--disable-dev-shm-usage')
 
-    # 드라이버 1번만 생성
     service = Service(ChromeDriverManager().install())
     service.log_path = os.devnull
     driver = webdriver.Chrome(service=service, options=chrome_options)
 
-    try:
-        # 로그인 1번만 수행
-        driver.get("https://33m2.co.kr/")
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CSS_SELECTOR, ".room_item"))
-        )
-        logging.info("웹사이트 접속 성공")
-        time.sleep(2)
-        logging.info("1분간 로그인 대기…")
-        time.sleep(60)
+    if cookies:
+        # 로그인된 브라우저의 쿠키를 복사해 추가 브라우저도 로그인 상태로 만든다
+        throttle()
+        driver.get(SITE_URL)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logging.warning(f"쿠키 복사 실패 ({cookie.get('name')}): {e}")
+    return driver
 
-        # ----------------------------
-        # 🔥 키워드별로 따로 처리 시작
-        # ----------------------------
-        for keyword in keywords:
 
-            logging.info(f"키워드 '{keyword}' 크롤링 시작")
+def search_keyword(driver, keyword):
+    # 첫 번째 키워드는 로그인 직후 검색
+    # 두 번째 이후는 guest 페이지로 돌아가 검색
+    throttle()
+    driver.get(SITE_URL)
+    time.sleep(2)
 
-            # 키워드별 이미지 디렉토리
-            image_dir = os.path.join(base_image_dir, keyword)
-            os.makedirs(image_dir, exist_ok=True)
+    search = driver.find_element(By.CSS_SELECTOR, '#txt_search_keyword')
+    search.clear()
+    search.send_keys(keyword)
 
-            # 키워드별 엑셀 파일 경로
-            excel_path = os.path.join(output_dir, f"rooms_data_{keyword}.xlsx")
+    throttle()
+    driver.find_element(By.CSS_SELECTOR, "#btn_search").click()
 
-            # 첫 번째 키워드는 로그인 직후 검색
-            # 두 번째 이후는 guest 페이지로 돌아가 검색
-            driver.get("https://33m2.co.kr")
-            time.sleep(2)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, ".room_item"))
+    )
+    time.sleep(2)
+    note_position(driver, keyword=keyword)
 
-            search = driver.find_element(By.CSS_SELECTOR, '#txt_search_keyword')
-            search.clear()
-            search.send_keys(keyword)
 
-            driver.find_element(By.CSS_SELECTOR, "#btn_search").click()
+def restore_position(driver, keyword, page):
+    # 재시작한 브라우저를 keyword 검색 결과의 page 페이지로 되돌린다
+    retry_call(search_keyword, driver, keyword, stage="search")
+    if page > 1 and goto_page(driver, 1, page) is None:
+        logging.warning(f"재시작 후 {page}페이지로 돌아가지 못했습니다.")
 
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, ".room_item"))
-            )
-            time.sleep(2)
 
-            # 결과 데이터 담을 리스트
-            data_list = []
+def record_snapshots(snapshot_store, keyword, records):
+    # 예약 현황 시계열 DB 에 이번 수집 결과 누적
+    if snapshot_store is None or not records:
+        return
+    try:
+        count = snapshot_store.record(keyword, records)
+        logging.info(f"예약 스냅샷 {count}건 저장 → {snapshot_store.path}")
+    except Exception as e:
+        logging.error(f"예약 스냅샷 저장 오류: {e}", exc_info=True)
 
-            # 페이지 1
-            process_rooms(driver, data_list, image_dir)
 
-            # 페이지네이션
-            test_pagination(driver, data_list, image_dir, max_sections, pages_per_section)
-
-            logging.info(f"키워드 '{keyword}' 크롤링 완료 → 엑셀 생성 시작")
-
-            # ---------------------------
-            # 🔥 엑셀 저장 (네 코드 그대로 유지)
-            # ---------------------------
-            if data_list:
-                df = pd.DataFrame(data_list)
-                df.insert(0, "순번", range(1, len(df) + 1))
-
-                df.to_excel(excel_path, index=False, engine='openpyxl')
-
-                wb = load_workbook(excel_path)
-                ws = wb.active
-
-                # 열 너비 조정
-                column_widths = {
-                    'A': 10,  # 순번
-                    'B': 20,  # 대표이미지
-                    'C': 30,  # 매물명
-                    'D': 50,  # 주소
-                    'E': 15,  # 건물유형
-                    'F': 15,  # 전용면적
-                    'G': 15,  # 임대료(1주)
-                    'H': 15,  # 관리비용
-                    'I': 15,  # 청소비용
-                    'J': 50,  # URL
-                    'K': 15,  # 첫번째달예약
-                    'L': 15,  # 두번째달예약
-                    'M': 15,  # 세번째달예약
-                    'N': 15   # 예약률
-                }
-
-                for col, width in column_widths.items():
-                    ws.column_dimensions[col].width = width
-
-                # 이미지 삽입 및 셀 서식 지정
-                for row in range(2, ws.max_row + 1):
-                    # 대표이미지 삽입
-                    img_url = ws.cell(row=row, column=2).value
-                    if img_url:
-                        try:
-                            img_response = requests.get(img_url, stream=True)
-                            img_path = os.path.join(image_dir, f"img_{row}.jpg")
-                            with open(img_path, 'wb') as out_file:
-                                shutil.copyfileobj(img_response.raw, out_file)
-                            img = ExcelImage(img_path)
-                            img.width = 155  # 필요에 따라 조정
-                            img.height = 100  # 필요에 따라 조정
-                            img.anchor = f'B{row}'
-                            ws.add_image(img)
-
-                            ws.cell(row=row, column=2).value = None  # 이미지 삽입 후 URL 제거
-                        except Exception as e:
-                            logging.warning(f"이미지 삽입 오류 (행 {row}): {e}")
-
-                    # 예약 데이터 서식 지정
-                    for col in range(11, ws.max_column - 1):  # K열부터 M열까지
-                        cell = ws.cell(row=row, column=col)
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                    # 예약률 서식 지정
-                    reservation_rate_cell = ws.cell(row=row, column=ws.max_column - 1)  # N열
-                    reservation_rate_cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                    # 모든 셀 가운데 정렬
-                    for col in range(1, ws.max_column + 1):
-                        cell = ws.cell(row=row, column=col)
-                        cell.alignment = Alignment(horizontal='center', vertical='center')
-
-                # 헤더 서식 지정
-                for cell in ws[1]:
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    cell.font = cell.font.copy(bold=True)
-
-                # 행 높이 조정
-                for row in range(2, ws.max_row + 1):
-                    ws.row_dimensions[row].height = 80  # 필요에 따라 조정
-
-                # 평균 예약률 계산 및 추가
+def open_snapshot_store(output_dir, snapshot_db_path=None):
+    # 기본 위치: 출력 폴더의 reservation_history.db (False 이면 저장하지 않음)
+    if snapshot_db_path is False:
+        return None
+    return SnapshotStore(snapshot_db_path or os.path.join(output_dir, "reservation_history.db"))
+
+
+def partition_pages(first_page, last_page, parts, min_pages=10):
+    # first_page ~ last_page 를 최대 parts 개의 연속 구간으로 나눈다 (구간당 최소 min_pages 페이지)
+    count = last_page - first_page + 1
+    parts = max(1, min(parts, count // max(1, min_pages)))
+    size, extra = divmod(count, parts)
+    ranges, start = [], first_page
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0) - 1
+        ranges.append((start, end))
+        start = end + 1
+    return ranges
+
+
+def borrow_idle_drivers(driver_pool, count):
+    # 지금 쉬고 있는 브라우저만 가져온다 (기다리지 않음)
+    borrowed = []
+    while driver_pool is not None and len(borrowed) < count:
+        try:
+            borrowed.append(driver_pool.get_nowait())
+        except queue.Empty:
+            break
+    return borrowed
+
+
+def put_record(out, item, stop):
+    # 큐가 가득 차면 기다리되, 소비 쪽이 멈췄으면(stop) 포기하고 False
+    while not stop.is_set():
+        try:
+            out.put(item, timeout=PUT_POLL)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+def crawl_page_range(driver, keyword, start_page, end_page, out, stop, dead_letters, calendar_months=3,
+                     progress=None, search=True, fetch=DEFAULT_FETCH):
+    # 브라우저 하나가 맡은 구간: start_page ~ end_page 를 수집해 out 큐에 넣는다
+    # search 면 같은 키워드로 먼저 검색 (False 면 이미 검색 결과 1페이지에 있는 브라우저)
+    with log_context(keyword=keyword, stage="keyword"):
+        records = None
+        try:
+            if search:
+                retry_call(search_keyword, driver, keyword, stage="search")
+            records = crawl_pages(driver, start_page, end_page, dead_letters, calendar_months, progress, fetch)
+            for record in records:
+                if not put_record(out, record, stop):
+                    logging.info(f"{start_page}~{end_page}페이지 구간 수집 중단")
+                    break
+        except Exception as e:
+            logging.error(f"{start_page}~{end_page}페이지 구간 수집 오류: {e}", exc_info=True)
+        finally:
+            if records is not None:
+                records.close()
+            put_record(out, None, stop)  # 구간 종료 표시
+
+
+def crawl_partitioned(driver, helpers, keyword, ranges, dead_letters, calendar_months=3, progress=None,
+                      fetch=DEFAULT_FETCH, window=RECORD_WINDOW):
+    # 구간마다 브라우저 하나씩 동시에 수집하고, 도착하는 순서대로 레코드를 내보낸다.
+    # 큐 크기(window)를 넘으면 수집 쪽이 기다리므로 메모리에 쌓이는 레코드 수가 제한된다
+    out = queue.Queue(maxsize=window)
+    stop = threading.Event()
+    with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+        try:
+            for d, (start, end) in zip([driver] + helpers, ranges):
+                # 첫 구간은 이미 검색 결과 1페이지에 있는 현재 브라우저가 맡는다 (다시 검색하지 않음)
+                executor.submit(crawl_page_range, d, keyword, start, end, out, stop, dead_letters,
+                                calendar_months, progress, search=d is not driver, fetch=fetch)
+            remaining = len(ranges)
+            while remaining:
+                record = out.get()
+                if record is None:
+                    remaining -= 1
+                else:
+                    yield record
+        finally:
+            # 소비 쪽이 중간에 멈췄으면(generator.close(), sink 오류 등) 수집 스레드에 중단을 알리고
+            # 큐를 비워 put 에서 기다리는 스레드를 깨운다 (그래야 executor 종료 대기가 끝난다)
+            stop.set()
+            while True:
                 try:
-                    # "예약률" 열 찾기
-                    reservation_rate_col = None
-                    for col in range(1, ws.max_column + 1):
-                        if ws.cell(row=1, column=col).value == "예약률":
-                            reservation_rate_col = col
-                            break
-
-                    if reservation_rate_col is not None:
-                        total_rate = 0
-                        count = 0
-                        for row in range(2, ws.max_row + 1):
-                            cell_value = ws.cell(row=row, column=reservation_rate_col).value
-                            if cell_value:
-                                try:
-                                    rate = float(cell_value.strip('%')) / 100
-                                    total_rate += rate
-                                    count += 1
-                                except:
-                                    pass
-
-                        average_rate = (total_rate / count) if count > 0 else 0
-
-                        # 평균을 위한 새로운 행 추가
-                        average_row = ws.max_row + 1
-                        label_col = reservation_rate_col - 1  # "예약률" 열 앞 열
-
-                        ws.cell(row=average_row, column=label_col).value = "예약률 전체 평균"
-                        ws.cell(row=average_row, column=label_col).alignment = Alignment(horizontal='center', vertical='center')
-                        ws.cell(row=average_row, column=label_col).font = ws.cell(row=average_row, column=label_col).font.copy(bold=True)
-
-                        ws.cell(row=average_row, column=reservation_rate_col).value = f"{average_rate:.2%}"
-                        ws.cell(row=average_row, column=reservation_rate_col).alignment = Alignment(horizontal='center', vertical='center')
-
-                        logging.info(f"전체 평균 예약률 추가됨: {average_rate:.1%}")
-                    else:
-                        logging.warning("'예약률' 열을 찾을 수 없습니다.")
-                except Exception as e:
-                    logging.error(f"평균 예약률 계산 오류: {e}", exc_info=True)
-
-                wb.save(excel_path)
-                logging.info(f"엑셀 저장 완료 → {excel_path}")
+                    out.get_nowait()
+                except queue.Empty:
+                    break
+
+
+def iter_keyword_rooms(driver, keyword, max_sections=100, pages_per_section=10, calendar_months=3,
+                       driver_pool=None, failed=None, progress_holder=None, fetch=DEFAULT_FETCH):
+    # 검색 → 페이지 1 → 나머지 페이지 → 실패 게시물 재시도 순서로 레코드를 하나씩 내보낸다
+    retry_call(search_keyword, driver, keyword, stage="search")
+
+    # 재시도까지 실패한 게시물 목록
+    dead_letters = []
+
+    # 검색 직후 전체 페이지 수 확인 → 진행률/남은 시간, 작업 분할에 사용
+    max_pages = max_sections * pages_per_section
+    total_pages, exact = discover_total_pages(driver)
+    last_page = min(total_pages, max_pages)
+    logging.info(f"검색 결과 {total_pages}{'' if exact else '+'}페이지 (수집 대상 {last_page}페이지)")
+    progress = CrawlProgress(keyword, last_page, exact)
+    if progress_holder is not None:
+        progress_holder.append(progress)
+
+    # 페이지 1
+    rooms = 0
+    for record in process_rooms(driver, dead_letters, calendar_months, fetch):
+        rooms += 1
+        yield record
+    progress.page_done(rooms)
+    maybe_recycle(driver)
+
+    # 쉬고 있는 브라우저가 있으면 남은 페이지를 구간으로 나눠 함께 수집 (전체 페이지 수를 알 때만)
+    helpers = []
+    if exact and last_page >= 2:
+        max_parts = (last_page - 1) // pages_per_section
+        helpers = borrow_idle_drivers(driver_pool, max_parts - 1)
+    try:
+        if helpers:
+            ranges = partition_pages(2, last_page, len(helpers) + 1, pages_per_section)
+            helpers = helpers[:len(ranges) - 1]
+            logging.info(f"브라우저 {len(ranges)}개로 페이지 분할 수집: {ranges}")
+            yield from crawl_partitioned(driver, helpers, keyword, ranges, dead_letters, calendar_months,
+                                         progress, fetch)
+        elif exact:
+            yield from crawl_pages(driver, 2, last_page, dead_letters, calendar_months, progress, fetch)
+        else:
+            # 페이지네이션
+            yield from test_pagination(driver, max_sections, pages_per_section, dead_letters,
+                                       calendar_months, progress, fetch)
+    finally:
+        for helper in helpers:
+            driver_pool.put(helper)
+
+    # 실패한 게시물은 키워드 마지막에 다시 수집
+    yield from retry_dead_letters(driver, dead_letters, calendar_months, failed, fetch)
+
+
+def record_columns(calendar_months=3):
+    # 결과 파일의 열 순서 (월별 예약 열은 달력 개월 수만큼)
+    today = datetime.date.today()
+    months = [month_label(*add_months(today.year, today.month, j), calendar_months)
+              for j in range(calendar_months)]
+    return BASE_COLUMNS + months + ["예약률"]
+
+
+def make_sinks(keyword, excel_path, image_dir, output_formats=("xlsx",), calendar_months=3,
+               snapshot_store=None, record_callback=None, exporter=None, shard_rows=None):
+    # 키워드 하나의 결과를 받을 sink 목록 (선택한 파일 형식 + 스냅샷 DB + 콜백 + 통계)
+    # exporter 가 있으면 엑셀은 키워드가 끝난 뒤 별도 프로세스에서 만든다
+    columns = record_columns(calendar_months)
+    base_path = os.path.splitext(excel_path)[0]
+    sinks = []
+    for fmt in output_formats:
+        if fmt == "xlsx" and exporter is not None:
+            sinks.append(exporter.sink(keyword, excel_path, image_dir, columns, shard_rows))
+        elif fmt == "xlsx":
+            sinks.append(excel_sink(excel_path, image_dir, columns, shard_rows))
+        elif fmt == "csv":
+            sinks.append(CsvSink(base_path + ".csv", columns))
+        elif fmt == "jsonl":
+            sinks.append(JsonlSink(base_path + ".jsonl"))
+        else:
+            logging.warning(f"알 수 없는 출력 형식: {fmt}")
+    if snapshot_store is not None:
+        sinks.append(SnapshotSink(snapshot_store, keyword))
+    if record_callback is not None:
+        sinks.append(CallbackSink(lambda record: record_callback(keyword, record)))
+    return sinks
+
+
+def crawl_keyword(driver, keyword, base_image_dir, output_dir, max_sections=100, pages_per_section=10,
+                  snapshot_store=None, calendar_months=3, driver_pool=None, output_formats=("xlsx",),
+                  record_callback=None, exporter=None, shard_rows=None, progress_holder=None, fetch=DEFAULT_FETCH):
+    # progress_holder: 목록을 넘기면 진행률(CrawlProgress)이 담긴다 (실행 중에 진행 상황 조회용)
+    # fetch: 방 수집 방식 (FetchOptions)
+    with log_context(keyword=keyword, stage="keyword"):
+        logging.info(f"키워드 '{keyword}' 크롤링 시작")
+
+        # 키워드별 이미지 디렉토리
+        image_dir = os.path.join(base_image_dir, keyword)
+        os.makedirs(image_dir, exist_ok=True)
+
+        # 키워드별 엑셀 파일 경로
+        excel_path = os.path.join(output_dir, f"rooms_data_{keyword}.xlsx")
+
+        # 수집한 방을 바로 결과 파일/DB 에 기록 (키워드 전체를 메모리에 모으지 않음)
+        stats = StatsSink()
+        sinks = make_sinks(keyword, excel_path, image_dir, output_formats, calendar_months,
+                           snapshot_store, record_callback, exporter, shard_rows) + [stats]
+        failed = []
+        if progress_holder is None:
+            progress_holder = []
+        records = iter_keyword_rooms(driver, keyword, max_sections, pages_per_section, calendar_months,
+                                     driver_pool, failed, progress_holder, fetch)
+        outputs = drain(records, sinks)
+
+        if stats.rooms:
+            logging.info(f"키워드 '{keyword}' 크롤링 완료 → {stats.rooms}개 저장")
+        else:
+            logging.info(f"키워드 '{keyword}'는 데이터 없음 → 엑셀 미생성")
+
+        pages = progress_holder[0].pages_done if progress_holder else 0
+        return {"keyword": keyword, "status": "ok", "rooms": stats.rooms, "failed": len(failed),
+                "pages": pages, "average_rate": stats.average_rate, "outputs": outputs}
+
+
+def load_cookies(cookies_path):
+    if cookies_path and os.path.exists(cookies_path):
+        with open(cookies_path, encoding="utf-8") as f:
+            return json.load(f)
+    return None
+
+
+def save_cookies(driver, cookies_path):
+    # 다음 실행(헤드리스 포함)에서 로그인 대기 없이 쓰도록 쿠키 저장
+    if not cookies_path:
+        return
+    try:
+        with open(cookies_path, "w", encoding="utf-8") as f:
+            json.dump(driver.get_cookies(), f, ensure_ascii=False)
+        logging.info(f"로그인 쿠키 저장 → {cookies_path}")
+    except Exception as e:
+        logging.warning(f"쿠키 저장 실패: {e}")
 
-            else:
-                logging.info(f"키워드 '{keyword}'는 데이터 없음 → 엑셀 미생성")
 
+def login(driver, login_wait=60, cookies_path=None):
+    # 로그인 1번만 수행
+    throttle()
+    driver.get(SITE_URL)
+    WebDriverWait(driver, 10).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, ".room_item"))
+    )
+    logging.info("웹사이트 접속 성공")
+    time.sleep(2)
+
+    cookies = load_cookies(cookies_path)
+    if cookies:
+        # 저장된 쿠키로 로그인 상태 복원 (수동 로그인 대기 생략)
+        for cookie in cookies:
+            try:
+                driver.add_cookie(cookie)
+            except Exception as e:
+                logging.warning(f"쿠키 복원 실패 ({cookie.get('name')}): {e}")
+        throttle()
+        driver.refresh()
+        logging.info(f"저장된 로그인 쿠키 사용 ← {cookies_path}")
+        return
+
+    if login_wait:
+        logging.info(f"{login_wait}초간 로그인 대기…")
+        time.sleep(login_wait)
+        save_cookies(driver, cookies_path)
+
+
+def start_drivers(max_workers, task_count, headless=False, login_wait=60, cookies_path=None):
+    # 로그인용 드라이버를 만들어 로그인한 뒤, 필요한 만큼 쿠키를 복사한 드라이버를 추가로 만든다
+    # (재시작 기준을 넘으면 쿠키와 검색 위치를 유지한 채 새 브라우저로 바뀌는 ManagedBrowser)
+    def factory(cookies):
+        return create_driver(cookies, headless)
+
+    driver = ManagedBrowser(factory, restore_position)
+    drivers = [driver]
+    try:
+        login(driver, login_wait, cookies_path)
+
+        # 동시에 사용할 브라우저 수 (작업 수보다 많을 필요 없음)
+        worker_count = max(1, min(max_workers, task_count))
+        if worker_count > 1:
+            cookies = driver.get_cookies()
+            for _ in range(worker_count - 1):
+                drivers.append(ManagedBrowser(factory, restore_position, cookies))
+            logging.info(f"브라우저 {worker_count}개로 병렬 크롤링")
+    except Exception:
+        quit_drivers(drivers)
+        raise
+    return drivers
+
+
+def quit_drivers(drivers):
+    for d in drivers:
+        try:
+            d.quit()
+        except Exception as e:
+            logging.warning(f"드라이버 종료 오류: {e}")
+    logging.info("드라이버가 정상 종료되었습니다.")
+
+
+def run_on_drivers(drivers, keywords, task):
+    # 사용 가능한 브라우저 풀: 키워드 작업이 하나씩 꺼내 쓰고 돌려놓는다
+    driver_pool = queue.Queue()
+    for d in drivers:
+        driver_pool.put(d)
+
+    def run_keyword(keyword):
+        d = driver_pool.get()
+        try:
+            return task(d, keyword, driver_pool)
+        finally:
+            driver_pool.put(d)
+
+    # 키워드별 결과 요약 (작업 함수의 반환값, 예외가 나면 status="error")
+    results = {}
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        futures = {executor.submit(run_keyword, keyword): keyword for keyword in keywords}
+        for future in as_completed(futures):
+            keyword = futures[future]
+            try:
+                results[keyword] = future.result() or {"keyword": keyword, "status": "ok"}
+            except Exception as e:
+                logging.error(f"키워드 '{keyword}' 처리 오류: {e}", exc_info=True)
+                results[keyword] = {"keyword": keyword, "status": "error", "error": str(e)}
+    return results
+
+
+def crawl(keywords, base_image_dir, output_dir, max_sections=100, pages_per_section=10,
+          json_log_path=None, max_workers=1, requests_per_second=None, snapshot_db_path=None,
+          calendar_months=3, output_formats=("xlsx",), headless=False, login_wait=60, cookies_path=None,
+          record_callback=None, html_archive_path=None, prefetch_tabs=0, recycle_rooms=None,
+          recycle_rss_mb=None, export_workers=0, shard_rows=None, profile=False, parse_workers=0,
+          batch_fetch=0, adaptive_fetch=False, max_batch_fetch=16, quick_scan=False):
+    setup_logger(json_log_path)
+    # profile=True 면 실행 전체를 프로파일링해 출력 폴더에 결과를 남긴다 (profiling.py)
+    with profiling(output_dir, "crawl", enabled=profile):
+        snapshot_store = open_snapshot_store(output_dir, snapshot_db_path)
+
+        # 상세 페이지/달력 HTML 보관 (True 면 출력 폴더의 html_archive.jsonl.gz)
+        if html_archive_path is True:
+            html_archive_path = os.path.join(output_dir, "html_archive.jsonl.gz")
+        configure_archive(html_archive_path)
+        # batch_fetch > 0 이면 페이지마다 브라우저 안에서 그 수만큼 동시에 상세 페이지를 읽는다
+        # adaptive_fetch 면 그 수를 시작값으로 사이트 응답에 맞춰 max_batch_fetch 까지 자동 조절
+        controller = fetch_controller(batch_fetch, adaptive_fetch, max_batch_fetch)
+        # 방 recycle_rooms 개마다 또는 크롬 메모리가 recycle_rss_mb 를 넘으면 브라우저 재시작
+        configure_recycling(recycle_rooms, recycle_rss_mb)
+
+        # 모든 브라우저가 공유하는 요청 속도 제한 (None 이면 제한 없음)
+        configure_rate_limit(requests_per_second)
+
+        # export_workers > 0 이면 엑셀 생성은 별도 프로세스에서 (다음 키워드 크롤링과 동시에)
+        exporter = ExcelExporter(export_workers) if export_workers and "xlsx" in output_formats else None
+        # parse_workers > 0 이면 HTML 파싱은 프로세스 풀에서 (브라우저는 파싱을 기다리지 않고 다음 방 수집)
+        parse_pool = ParsePool(parse_workers) if parse_workers else None
+        # quick_scan 이면 검색 결과 카드만 모든 페이지에서 읽는다 (같은 엑셀 형식, 달력 열은 빈 칸)
+        fetch = FetchOptions(prefetch_tabs, batch_fetch, controller, parse_pool, quick_scan)
+
+        # 키워드 수보다 브라우저가 많으면 남는 브라우저는 한 키워드의 페이지를 나눠 맡는다
+        drivers = start_drivers(max_workers, max_workers, headless, login_wait, cookies_path)
+        try:
+            # ----------------------------
+            # 🔥 키워드별로 따로 처리 시작
+            # ----------------------------
+            results = run_on_drivers(drivers, keywords, lambda d, keyword, pool: crawl_keyword(
+                d, keyword, base_image_dir, output_dir, max_sections, pages_per_section, snapshot_store,
+                calendar_months, pool, output_formats, record_callback, exporter, shard_rows, fetch=fetch))
+        finally:
+            quit_drivers(drivers)
+            if controller is not None:
+                logging.info(f"동시 수집 수 조정 이력 (시각, 동시 수, 사유):\n{controller.summary()}")
+            if parse_pool is not None:
+                parse_pool.shutdown()
+            if exporter is not None:
+                exported = exporter.wait()
+                exporter.shutdown()
+
+        if exporter is not None:
+            for keyword, outputs in exported.items():
+                if keyword in results:
+                    results[keyword].setdefault("outputs", []).extend(outputs)
+        return results
+
+
+# ----------------------------
+# 예약 현황만 갱신 (이전 실행 결과 재사용)
+# ----------------------------
+def room_url(room):
+    # 방 번호 또는 URL → 상세 페이지 URL
+    room = str(room).strip()
+    return room if room.startswith("http") else f"{SITE_URL}/room/detail/{room}"
+
+
+def result_workbooks(excel_path):
+    # 결과 엑셀 경로 목록. 분할 저장(shard_rows)이면 URL 열이 없는 목차 파일 대신
+    # 같은 폴더의 <이름>_001.xlsx, _002.xlsx ... (snapshot_diff 와 같은 규칙)
+    wb = load_workbook(excel_path, read_only=True)
+    try:
+        header = next(wb.active.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    if "URL" in header:
+        return [excel_path]
+    shards = sorted(glob.glob(glob.escape(os.path.splitext(excel_path)[0]) + "_[0-9][0-9][0-9].xlsx"))
+    if not shards:
+        raise ValueError(f"URL 열이 없는 결과 파일입니다: {excel_path}")
+    return shards
+
+
+def load_room_urls(excel_path):
+    # 이전 실행의 엑셀에서 URL 열을 읽는다 (평균 행 등 URL 이 없는 행은 제외). 분할 저장이면 모든 분할 파일에서
+    urls = []
+    for path in result_workbooks(excel_path):
+        wb = load_workbook(path, read_only=True)
+        try:
+            rows = wb.active.iter_rows(values_only=True)
+            header = next(rows)
+            url_col = header.index("URL")
+            urls.extend(row[url_col] for row in rows if row[url_col])
+        finally:
+            wb.close()
+    return urls
+
+
+def refresh_room(driver, link, calendar_months=3, home=None):
+    # 상세 탭에서 예약 달력만 다시 읽는다
+    home = home or driver.current_window_handle
+    open_detail_tab(driver, link)
+    result = read_reservations(driver, calendar_months)
+    close_detail_tab(driver, home)
+    return result
+
+
+def refresh_rooms(driver, rooms, calendar_months=3):
+    # rooms: 방 번호 또는 URL 목록 → {URL: (월별 예약, 예약률, 날짜 비트맵)}
+    refreshed = {}
+    home = driver.current_window_handle
+    for idx, room in enumerate(rooms, start=1):
+        if maybe_recycle(driver):
+            home = driver.current_window_handle
+        link = room_url(room)
+        room_started = time.perf_counter()
+        try:
+            refreshed[link] = retry_call(refresh_room, driver, link, calendar_months, home, stage="refresh",
+                                         on_retry=lambda: close_detail_tab(driver, home))
+            duration = time.perf_counter() - room_started
+            logging.info(f"예약 현황 갱신 {idx}/{len(rooms)}: {link}",
+                         extra={"room_id": room_id_from_url(link), "stage": "refresh",
+                                "duration": round(duration, 3)})
+            note_room(driver, duration)
+        except Exception as e:
+            logging.error(f"예약 현황 갱신 실패 {idx}/{len(rooms)}: {link} ({e})",
+                          extra={"room_id": room_id_from_url(link), "stage": "refresh_error"})
+            close_detail_tab(driver, home)
+    return refreshed
+
+
+def update_workbook_reservations(excel_path, refreshed, out_path=None):
+    # 기존 엑셀의 월별 예약 열과 예약률 열만 새 값으로 교체 (이미지 등 나머지는 유지)
+    wb = load_workbook(excel_path)
+    ws = wb.active
+    header = [cell.value for cell in ws[1]]
+    url_col = header.index("URL") + 1
+    rate_col = header.index("예약률") + 1
+    month_cols = [i + 1 for i, h in enumerate(header) if isinstance(h, str) and re.fullmatch(r"(\d+년 )?\d+월 예약", h)]
+
+    # 이전 평균 행 제거 (다시 계산)
+    for row in range(ws.max_row, 1, -1):
+        if ws.cell(row=row, column=rate_col - 1).value == "예약률 전체 평균":
+            ws.delete_rows(row)
+
+    # 새 월 라벨 (갱신 결과 중 가장 많은 월을 읽은 방 기준)
+    labels = max((list(data) for data, _, _ in refreshed.values()), key=len, default=[])
+    first_col = month_cols[0] if month_cols else rate_col
+    diff = len(labels) - len(month_cols)
+    if diff > 0:
+        ws.insert_cols(rate_col, diff)
+    elif diff < 0:
+        ws.delete_cols(first_col, -diff)
+    rate_col += diff
+
+    for offset, label in enumerate(labels):
+        cell = ws.cell(row=1, column=first_col + offset, value=label)
+        cell.alignment = Alignment(horizontal='center', vertical='center')
+        cell.font = cell.font.copy(bold=True)
+        ws.column_dimensions[get_column_letter(first_col + offset)].width = 15
+
+    for row in range(2, ws.max_row + 1):
+        link = ws.cell(row=row, column=url_col).value
+        if not link:
+            continue
+        reservation_data, reservation_rate, _ = refreshed.get(link, ({}, None, None))
+        for offset, label in enumerate(labels):
+            cell = ws.cell(row=row, column=first_col + offset, value=reservation_data.get(label))
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+        rate_cell = ws.cell(row=row, column=rate_col,
+                            value=f"{reservation_rate:.2%}" if reservation_rate is not None else None)
+        rate_cell.alignment = Alignment(horizontal='center', vertical='center')
+
+    add_average_row(ws)
+
+    out_path = out_path or excel_path
+    wb.save(out_path)
+    logging.info(f"예약 현황 갱신 엑셀 저장 완료 → {out_path}")
+
+
+def update_shard_index(index_path, refreshed):
+    # 분할 저장 목차 파일의 파일별 평균 예약률과 합계를 갱신한 값으로 다시 계산
+    wb = load_workbook(index_path)
+    ws = wb.active
+    folder = os.path.dirname(index_path)
+    rate_total = rate_count = 0
+    for row in range(2, ws.max_row + 1):
+        name = ws.cell(row=row, column=1).value
+        if name == "합계":
+            ws.cell(row=row, column=4, value=f"{rate_total / rate_count:.2%}" if rate_count else "")
+            continue
+        rates = [refreshed[link][1] for link in load_room_urls(os.path.join(folder, name))
+                 if link in refreshed and refreshed[link][1] is not None]
+        rate_total += sum(rates)
+        rate_count += len(rates)
+        ws.cell(row=row, column=4, value=f"{sum(rates) / len(rates):.2%}" if rates else "")
+    wb.save(index_path)
+
+
+def refresh_keyword(driver, keyword, output_dir, snapshot_store=None, calendar_months=3):
+    with log_context(keyword=keyword, stage="refresh"):
+        excel_path = os.path.join(output_dir, f"rooms_data_{keyword}.xlsx")
+        if not os.path.exists(excel_path):
+            logging.warning(f"키워드 '{keyword}'의 이전 결과가 없습니다 → {excel_path}")
+            return {"keyword": keyword, "status": "missing", "rooms": 0, "failed": 0, "outputs": []}
+
+        workbooks = result_workbooks(excel_path)
+        urls = load_room_urls(excel_path)
+        logging.info(f"키워드 '{keyword}' 예약 현황 갱신 시작 ({len(urls)}개)")
+        refreshed = refresh_rooms(driver, urls, calendar_months)
+        for path in workbooks:
+            update_workbook_reservations(path, refreshed)
+        if workbooks != [excel_path]:
+            update_shard_index(excel_path, refreshed)
+        record_snapshots(snapshot_store, keyword,
+                         [{"URL": link, **data, CALENDAR_KEY: bits} for link, (data, _, bits) in refreshed.items()])
+        outputs = [excel_path] + [path for path in workbooks if path != excel_path]
+        return {"keyword": keyword, "status": "ok", "rooms": len(refreshed),
+                "failed": len(urls) - len(refreshed), "outputs": outputs}
+
+
+def refresh(keywords, output_dir, json_log_path=None, max_workers=1, requests_per_second=None,
+            snapshot_db_path=None, calendar_months=3, headless=False, login_wait=60, cookies_path=None,
+            recycle_rooms=None, recycle_rss_mb=None):
+    # 검색/페이지 이동/상세 정보 수집 없이, 이전 결과 엑셀의 방들의 예약 달력만 다시 읽는다
+    setup_logger(json_log_path)
+    configure_recycling(recycle_rooms, recycle_rss_mb)
+    snapshot_store = open_snapshot_store(output_dir, snapshot_db_path)
+    configure_rate_limit(requests_per_second)
+
+    drivers = start_drivers(max_workers, len(keywords), headless, login_wait, cookies_path)
+    try:
+        return run_on_drivers(drivers, keywords, lambda d, keyword, pool: refresh_keyword(
+            d, keyword, output_dir, snapshot_store, calendar_months))
     finally:
-        driver.quit()
-        logging.info("드라이버가 정상 종료되었습니다.")
+        quit_drivers(drivers)
 
 
 # if __name__ == "__main__":
@@ -0,0 +1,269 @@
+# distributed.py
+#
+# 여러 PC/프로세스에 걸친 분산 크롤링 (조정자 1 + 작업자 N, work_queue.py 의 공유 큐 사용).
+#   조정자: 키워드를 검색해 결과 페이지의 방 링크만 훑어 큐에 넣고, 작업자가 돌려준 레코드를
+#           키워드별 결과 파일/스냅샷 DB 에 기록한다. (batch_cli.py 작업 파일에 "queue" 를 지정)
+#   작업자: 큐에서 방을 하나씩 임대해 상세 페이지/달력을 수집하고 결과를 돌려준다.
+#
+#   python batch_cli.py job.json                      (작업 파일: "queue": "Z:/shared/queue.db")
+#   python distributed.py worker --queue Z:/shared/queue.db --processes 3
+
+import argparse
+import contextlib
+import datetime
+import logging
+import multiprocessing
+import os
+import socket
+import sys
+import threading
+import time
+
+from work_queue import WorkQueue
+
+# 작업자가 큐를 다시 확인하기 전 대기 시간(초)
+IDLE_POLL = 5
+
+
+def default_job_id():
+    return f"crawl-{datetime.date.today().isoformat()}"
+
+
+@contextlib.contextmanager
+def keep_lease(work_queue, task_id, worker_id):
+    # with 블록(방 하나 수집) 동안 임대 시간의 1/3 마다 임대 연장
+    # (방이 lease_seconds 보다 오래 걸려도 다른 작업자에게 넘어가 두 번 수집되지 않게)
+    stop = threading.Event()
+
+    def renew():
+        while not stop.wait(work_queue.lease_seconds / 3):
+            try:
+                if not work_queue.extend(task_id, worker_id):
+                    logging.warning(f"임대 연장 실패 (이미 다른 작업자에게 넘어감): 작업 {task_id}")
+                    return
+            except Exception as e:
+                logging.warning(f"임대 연장 오류 (작업 {task_id}): {e}")
+
+    thread = threading.Thread(target=renew, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def enumerate_keyword(driver, work_queue, job, keyword, max_pages):
+    # 검색 결과 페이지를 넘기며 방 링크만 모아 큐에 넣는다 (상세 페이지는 열지 않음). 넘긴 페이지 수 반환
+    from crawler import discover_total_pages, goto_page, list_rooms, search_keyword, shown_page
+    from retry import retry_call
+
+    retry_call(search_keyword, driver, keyword, stage="search")
+    total_pages, exact = discover_total_pages(driver)
+    last_page = min(total_pages, max_pages) if exact else max_pages
+    current, added = 1, 0
+    for page in range(1, last_page + 1):
+        if page > 1:
+            try:
+                moved = goto_page(driver, current, page)
+            except Exception as e:
+                logging.error(f"{page}페이지 이동 실패 → 이 페이지 건너뜀: {e}")
+                current = shown_page(driver, current)
+                continue
+            if moved is None:
+                break
+            current = moved
+        rooms = [{"url": link, "thumbnail": thumbnail} for thumbnail, link in list_rooms(driver) if link]
+        added += work_queue.enqueue(job, keyword, rooms)
+    logging.info(f"키워드 '{keyword}': {current}페이지에서 방 {added}개를 작업 큐에 추가")
+    return current
+
+
+def collect_results(work_queue, job, sinks_by_keyword, stats_by_keyword, poll=IDLE_POLL):
+    # 작업자가 올린 결과를 키워드별 sink 에 기록하고, 남은 작업이 없는 키워드부터 파일을 닫는다
+    outputs = {}
+    last_id = 0
+    remaining = set(sinks_by_keyword)
+    while remaining:
+        # 완료 여부를 먼저 확인한 뒤 결과를 읽어야 마지막 결과를 놓치지 않는다
+        finished = set()
+        for keyword in remaining:
+            counts = work_queue.counts(job, keyword)
+            if not counts["pending"] and not counts["leased"]:
+                finished.add(keyword)
+        for result_id, keyword, record in work_queue.results(job, last_id):
+            last_id = result_id
+            for sink in sinks_by_keyword.get(keyword, []):
+                sink.write(record)
+        for keyword in finished:
+            outputs[keyword] = []
+            for sink in sinks_by_keyword[keyword]:
+                try:
+                    outputs[keyword].extend(sink.close())
+                except Exception as e:
+                    logging.error(f"출력 저장 오류 ({type(sink).__name__}): {e}", exc_info=True)
+            logging.info(f"키워드 '{keyword}' 분산 수집 완료 → {stats_by_keyword[keyword].rooms}개 저장")
+        remaining -= finished
+        if remaining:
+            time.sleep(poll)
+    return outputs
+
+
+def coordinate(keywords, base_image_dir, output_dir, queue_path, job=None, max_sections=100,
+               pages_per_section=10, json_log_path=None, requests_per_second=None, snapshot_db_path=None,
+               calendar_months=3, output_formats=("xlsx",), headless=False, login_wait=60, cookies_path=None,
+               local_workers=0, lease_seconds=300, recycle_rooms=None, recycle_rss_mb=None):
+    from crawler import make_sinks, open_snapshot_store, quit_drivers, setup_logger, start_drivers
+    from log_setup import log_context
+    from rate_limit import configure_rate_limit
+    from sinks import StatsSink
+
+    setup_logger(json_log_path)
+    configure_rate_limit(requests_per_second)
+    snapshot_store = open_snapshot_store(output_dir, snapshot_db_path)
+    job = job or default_job_id()
+    work_queue = WorkQueue(queue_path, lease_seconds)
+    # 작업자는 큐 경로만 알면 되도록 필요한 설정을 job 에 함께 저장
+    work_queue.open_job(job, {"calendar_months": calendar_months, "requests_per_second": requests_per_second,
+                              "cookies": cookies_path, "lease_seconds": lease_seconds,
+                              "recycle_rooms": recycle_rooms, "recycle_rss_mb": recycle_rss_mb})
+    logging.info(f"분산 작업 '{job}' 시작 (큐: {queue_path})")
+
+    pages = {}
+    # 조정자가 먼저 로그인해 쿠키 파일을 저장한 뒤에 같은 PC 의 작업자 프로세스를 띄운다
+    # (먼저 띄우면 첫 실행에서 쿠키 파일이 없어 작업자가 로그인 없이 수집)
+    drivers = start_drivers(1, 1, headless, login_wait, cookies_path)
+    workers = []
+    try:
+        workers = start_local_workers(local_workers, queue_path, job, headless, cookies_path)
+        for keyword in keywords:
+            with log_context(keyword=keyword, stage="enumerate"):
+                try:
+                    pages[keyword] = enumerate_keyword(drivers[0], work_queue, job, keyword,
+                                                       max_sections * pages_per_section)
+                except Exception as e:
+                    logging.error(f"키워드 '{keyword}' 링크 수집 오류: {e}", exc_info=True)
+    finally:
+        quit_drivers(drivers)
+    work_queue.mark_enumerated(job)
+
+    sinks_by_keyword, stats_by_keyword = {}, {}
+    for keyword in keywords:
+        image_dir = os.path.join(base_image_dir, keyword)
+        os.makedirs(image_dir, exist_ok=True)
+        excel_path = os.path.join(output_dir, f"rooms_data_{keyword}.xlsx")
+        stats_by_keyword[keyword] = StatsSink()
+        sinks_by_keyword[keyword] = make_sinks(keyword, excel_path, image_dir, output_formats, calendar_months,
+                                               snapshot_store) + [stats_by_keyword[keyword]]
+    try:
+        outputs = collect_results(work_queue, job, sinks_by_keyword, stats_by_keyword)
+    finally:
+        work_queue.close_job(job)
+        for worker in workers:
+            worker.join()
+
+    results = {}
+    for keyword in keywords:
+        failed = work_queue.failed_tasks(job, keyword)
+        if failed:
+            logging.warning(f"키워드 '{keyword}' 최종 수집 실패 게시물 {len(failed)}개: "
+                            + ", ".join(url for url, _ in failed))
+        stats = stats_by_keyword[keyword]
+        results[keyword] = {"keyword": keyword, "status": "ok" if keyword in pages else "error",
+                            "rooms": stats.rooms, "failed": len(failed), "pages": pages.get(keyword, 0),
+                            "average_rate": stats.average_rate, "outputs": outputs.get(keyword, [])}
+    return results
+
+
+def run_worker(queue_path, job=None, worker_id=None, headless=True, login_wait=0, cookies_path=None,
+               idle_poll=IDLE_POLL):
+    # 큐가 빌 때까지(또는 조정자가 작업을 닫을 때까지) 방을 하나씩 임대해 수집. 처리한 방 수 반환
+    from browser import configure_recycling, maybe_recycle
+    from crawler import process_room, quit_drivers, start_drivers
+    from log_setup import log_context, setup_queue_logging
+    from rate_limit import configure_rate_limit
+
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    # 프로세스마다 로그 파일을 따로 쓴다 (여러 프로세스가 같은 회전 로그 파일을 쓰면 깨짐)
+    setup_queue_logging(f"crawler_{worker_id}.log")
+    work_queue = WorkQueue(queue_path)
+
+    while job is None:
+        job = work_queue.latest_open_job()
+        if job is None:
+            logging.info("열린 분산 작업이 없습니다. 대기 중…")
+            time.sleep(idle_poll)
+    settings, _, _ = work_queue.job_state(job)
+    calendar_months = settings.get("calendar_months", 3)
+    work_queue.lease_seconds = settings.get("lease_seconds", work_queue.lease_seconds)
+    # 속도 제한은 작업자 프로세스마다 따로 적용된다
+    configure_rate_limit(settings.get("requests_per_second"))
+    configure_recycling(settings.get("recycle_rooms"), settings.get("recycle_rss_mb"))
+    logging.info(f"작업자 {worker_id}: 분산 작업 '{job}' 참여")
+
+    done = 0
+    drivers = start_drivers(1, 1, headless, login_wait, cookies_path or settings.get("cookies"))
+    try:
+        while True:
+            maybe_recycle(drivers[0])
+            task = work_queue.claim(job, worker_id)
+            if task is None:
+                _, enumerated, closed = work_queue.job_state(job)
+                counts = work_queue.counts(job)
+                # 다른 작업자의 임대가 남아 있으면 만료 후 다시 가져올 수 있도록 기다린다
+                if closed or (enumerated and not counts["pending"] and not counts["leased"]):
+                    break
+                time.sleep(idle_poll)
+                continue
+
+            with log_context(keyword=task["keyword"]), keep_lease(work_queue, task["id"], worker_id):
+                record = process_room(drivers[0], task.get("thumbnail"), task["url"], f"작업 {task['id']}",
+                                      calendar_months)
+            if record is None:
+                work_queue.fail(task["id"], worker_id, "수집 실패")
+            elif work_queue.ack(task["id"], worker_id, record):
+                done += 1
+            else:
+                logging.warning(f"임대가 만료되어 다른 작업자에게 넘어간 작업: {task['url']}")
+    finally:
+        quit_drivers(drivers)
+    logging.info(f"작업자 {worker_id}: {done}개 처리 후 종료")
+    return done
+
+
+def start_local_workers(count, queue_path, job=None, headless=True, cookies_path=None):
+    # 현재 PC 에서 작업자 프로세스 count 개 실행
+    # fork 로 만들면 부모의 로깅 리스너 상태가 복사되므로 새 인터프리터(spawn)로 실행
+    context = multiprocessing.get_context("spawn")
+    workers = []
+    for _ in range(count):
+        worker = context.Process(target=run_worker, args=(queue_path, job),
+                                         kwargs={"headless": headless, "cookies_path": cookies_path})
+        worker.start()
+        workers.append(worker)
+    return workers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분산 크롤링 작업자 (조정자는 batch_cli.py 작업 파일의 queue 설정)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    worker = sub.add_parser("worker", help="공유 큐에서 방을 가져와 수집")
+    worker.add_argument("--queue", required=True, help="공유 작업 큐 DB 경로")
+    worker.add_argument("--job", help="참여할 작업 ID (기본: 가장 최근에 열린 작업)")
+    worker.add_argument("--processes", type=int, default=1, help="이 PC 에서 실행할 작업자 프로세스 수")
+    worker.add_argument("--cookies", help="로그인 쿠키 JSON (기본: 조정자가 지정한 경로)")
+    worker.add_argument("--show-browser", dest="headless", action="store_false", help="브라우저 창 표시")
+    args = parser.parse_args(argv)
+
+    if args.processes <= 1:
+        run_worker(args.queue, args.job, headless=args.headless, cookies_path=args.cookies)
+    else:
+        for process in start_local_workers(args.processes, args.queue, args.job, args.headless, args.cookies):
+            process.join()
+    return 0
+
+
+if __name__ == "__main__":
+    # PyInstaller 단일 실행 파일에서 spawn 프로세스 풀(파싱/내보내기)이 프로그램 전체를 다시 실행하지 않게
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# export.py
+#
+# 엑셀 생성을 별도 프로세스에서 실행.
+# 이미지가 많은 큰 엑셀은 이미지 다운로드와 저장에 몇 분씩 걸리므로, 크롤링 중에는 레코드를
+# 임시 jsonl(spool)에 기록만 하고 키워드가 끝나면 프로세스 풀에 엑셀 생성을 맡긴다.
+# 그동안 브라우저는 바로 다음 키워드 크롤링을 시작한다.
+
+import json
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from log_setup import LOG_FORMAT
+from sinks import ExcelSink, ShardedExcelSink, Sink, drain, public_fields
+
+
+def excel_sink(path, image_dir, columns, shard_rows=None, embed_images=True):
+    # shard_rows 를 주면 그 행 수마다 파일을 나누고 목차 파일을 만든다
+    if shard_rows:
+        return ShardedExcelSink(path, image_dir, columns, shard_rows, embed_images)
+    return ExcelSink(path, image_dir, columns, embed_images)
+
+
+def read_spool(spool_path):
+    with open(spool_path, encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def export_excel(spool_path, excel_path, image_dir, columns, shard_rows=None):
+    # 작업 프로세스에서 실행: spool 의 레코드로 엑셀을 만들고 spool 은 지운다. 만든 파일 목록 반환
+    try:
+        return drain(read_spool(spool_path), [excel_sink(excel_path, image_dir, columns, shard_rows)])
+    finally:
+        os.remove(spool_path)
+
+
+def _init_worker():
+    # 작업 프로세스의 로그는 콘솔로 출력 (파일 로그는 크롤러 프로세스만 기록)
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+
+
+class DeferredExcelSink(Sink):
+    # 크롤링 중에는 spool 에 쓰기만 하고, 닫을 때 엑셀 생성을 ExcelExporter 에 넘긴다
+    def __init__(self, exporter, keyword, path, image_dir, columns, shard_rows=None):
+        self.exporter = exporter
+        self.keyword = keyword
+        self.path = path
+        self.image_dir = image_dir
+        self.columns = columns
+        self.shard_rows = shard_rows
+        self.spool_path = path + ".spool.jsonl"
+        self._file = None
+
+    def write(self, record):
+        if self._file is None:
+            self._file = open(self.spool_path, "w", encoding="utf-8")
+        self._file.write(json.dumps(public_fields(record), ensure_ascii=False) + "\n")
+
+    def close(self):
+        # 실제 파일 목록은 ExcelExporter.wait() 에서 받는다
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.exporter.submit(self.keyword, self.spool_path, self.path, self.image_dir, self.columns,
+                                 self.shard_rows)
+        return []
+
+
+class ExcelExporter:
+    def __init__(self, max_workers=1):
+        # spawn: 크롤러 프로세스의 브라우저/로깅 스레드 상태를 복사하지 않는다
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self._futures = []
+
+    def sink(self, keyword, path, image_dir, columns, shard_rows=None):
+        return DeferredExcelSink(self, keyword, path, image_dir, columns, shard_rows)
+
+    def submit(self, keyword, spool_path, excel_path, image_dir, columns, shard_rows=None):
+        logging.info(f"키워드 '{keyword}' 엑셀 생성을 백그라운드 프로세스에 맡김 → {excel_path}")
+        future = self._executor.submit(export_excel, spool_path, excel_path, image_dir, columns, shard_rows)
+        self._futures.append((keyword, future))
+
+    def wait(self):
+        # 모든 엑셀 생성이 끝날 때까지 기다린다. {키워드: 만든 파일 목록}
+        outputs = {}
+        for keyword, future in self._futures:
+            try:
+                outputs.setdefault(keyword, []).extend(future.result())
+            except Exception as e:
+                logging.error(f"키워드 '{keyword}' 엑셀 생성 오류: {e}", exc_info=True)
+        self._futures = []
+        return outputs
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
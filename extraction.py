@@ -0,0 +1,200 @@
+# extraction.py
+#
+# 상세 페이지 HTML → 결과 레코드 변환 (브라우저 없이 HTML 만으로).
+# 실시간 크롤링과 HTML 보관본 재추출(html_archive.py)이 같은 선택자와 같은 계산을 쓴다.
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from availability import month_label, parse_calendar_cells, popcount
+from snapshot_store import CALENDAR_KEY
+
+# 결과 파일의 기본 열 (뒤에 월별 예약 열과 예약률이 붙는다)
+BASE_COLUMNS = ["대표이미지", "매물명", "주소", "건물유형", "전용면적",
+                "임대료(1주)", "관리비용", "청소비용", "URL"]
+
+# 상세 페이지 필드별 CSS 선택자
+DETAIL_SELECTORS = {
+    "매물명": "div.room_detail > div:nth-child(1) > div.title > strong",
+    "주소": "div.room_detail > div:nth-child(1) > p",
+    "전용면적": ".place_detail > li:nth-child(1) > strong",
+    "건물유형": ".place_detail > li:nth-child(2) > strong",
+    "임대료(1주)": ".tbl_style > tbody > tr > td:nth-child(1)",
+    "관리비용": ".tbl_style > tbody > tr > td:nth-child(2)",
+    "청소비용": ".tbl_style > tbody > tr > td:nth-child(3)",
+}
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# DETAIL_SELECTORS 와 같은 요소를 가리키는 XPath (lxml 로 직접 파싱할 때 사용)
+DETAIL_XPATHS = {
+    "매물명": f"//div[{_has_class('room_detail')}]/*[1][self::div]/div[{_has_class('title')}]/strong",
+    "주소": f"//div[{_has_class('room_detail')}]/*[1][self::div]/p",
+    "전용면적": f"//*[{_has_class('place_detail')}]/*[1][self::li]/strong",
+    "건물유형": f"//*[{_has_class('place_detail')}]/*[2][self::li]/strong",
+    "임대료(1주)": f"//*[{_has_class('tbl_style')}]/tbody/tr/*[1][self::td]",
+    "관리비용": f"//*[{_has_class('tbl_style')}]/tbody/tr/*[2][self::td]",
+    "청소비용": f"//*[{_has_class('tbl_style')}]/tbody/tr/*[3][self::td]",
+}
+
+CALENDAR_CELLS_XPATH = (f"//*[{_has_class('calendar_table')}]/thead/tr/*"
+                        f"[{_has_class('enable')} or {_has_class('disable')}]")
+
+# 검색 결과 카드(.room_item) 글자에서 필드 찾기 (카드에는 관리비/청소비가 없어 빈 칸으로 둔다)
+# 매물명(첫 줄)은 "8평 원룸", "양평역넓은투룸" 처럼 면적/유형 같은 글자가 섞여 있어 빼고 찾는다.
+# 면적/유형은 줄(또는 "·", "|" 로 나뉜 조각) 전체가 그 값일 때만 쓰고, 애매하면 빈 칸으로 둔다
+CARD_PATTERNS = {
+    "임대료(1주)": re.compile(r"\d[\d,.]*\s*(?:만\s*)?원"),
+    "전용면적": re.compile(r"^\d+(?:\.\d+)?\s*(?:㎡|m²|m2|평)(?:\s*\(\s*\d+(?:\.\d+)?\s*(?:㎡|m²|m2)\s*\))?$"),
+    "건물유형": re.compile(r"^(?:복층\s*)?(?:오피스텔|아파트|원룸건물|연립빌라|빌라|상가주택|단독주택|다세대주택|다가구주택|"
+                       r"도시형생활주택|주택|고시원|펜션|레지던스|한옥|타운하우스|게스트하우스)$"),
+}
+CARD_SEGMENT_SEPARATOR = re.compile(r"\s*[·|•]\s*")
+# "서울특별시 동작구 ...", "서울 강남구 역삼동", "동작구 사당동 ..." 처럼 시/도/구로 시작하는 줄
+CARD_ADDRESS_PATTERN = re.compile(
+    r"^(?:\S+(?:시|도)|서울|부산|대구|인천|광주|대전|울산|세종|경기|강원|충북|충남|전북|전남|경북|경남|제주)"
+    r"\s+\S+(?:구|군|시)|^\S+(?:구|군)\s+\S+(?:동|읍|면|가|로|길)")
+
+# 상세 필드가 들어 있는 요소 (오프라인 재추출 때 이 부분만 트리로 만든다)
+DETAIL_ROOTS = ["room_detail", "place_detail", "tbl_style"]
+CALENDAR_STATES = {"enable", "disable"}
+
+# lxml 이 설치돼 있으면 훨씬 빠른 lxml 파서와 미리 컴파일한 XPath 사용
+try:
+    import lxml.html
+    PARSER = "lxml"
+except ImportError:
+    lxml = None
+    PARSER = "html.parser"
+else:
+    _COMPILED_XPATHS = {field: lxml.etree.XPath(xpath) for field, xpath in DETAIL_XPATHS.items()}
+    _COMPILED_CALENDAR_XPATH = lxml.etree.XPath(CALENDAR_CELLS_XPATH)
+
+
+def parse_html(html, only_classes=None):
+    # only_classes 를 주면 해당 class 를 가진 요소만 트리로 만든다 (나머지 페이지는 건너뛰어 빠름)
+    parse_only = SoupStrainer(class_=only_classes) if only_classes else None
+    return BeautifulSoup(html, PARSER, parse_only=parse_only)
+
+
+def extract_details(soup):
+    # 상세 페이지 → {필드: 글자}. 선택자에 맞는 요소가 없으면 None
+    details = {}
+    for field, selector in DETAIL_SELECTORS.items():
+        element = soup.select_one(selector)
+        details[field] = element.get_text(" ", strip=True) if element else None
+    return details
+
+
+def extract_details_html(html):
+    # HTML 문자열 → 상세 필드. lxml 이 있으면 BeautifulSoup 트리를 만들지 않고 XPath 로 바로 찾는다
+    if lxml is None:
+        return extract_details(parse_html(html, DETAIL_ROOTS))
+    tree = lxml.html.fromstring(html)
+    details = {}
+    for field, xpath in _COMPILED_XPATHS.items():
+        found = xpath(tree)
+        details[field] = " ".join(found[0].text_content().split()) if found else None
+    return details
+
+
+def extract_card(lines, title=None):
+    # 카드의 글자 줄 목록 → 상세 필드 (카드에 보이는 것만, 나머지는 None)
+    # title: 카드의 제목 요소 글자 (없으면 첫 줄을 매물명으로 본다). 매물명 줄에서는 다른 필드를 찾지 않는다
+    details = dict.fromkeys(DETAIL_SELECTORS)
+    if title is None and lines:
+        title = lines[0]
+    details["매물명"] = title or None
+    lines = [line for line in lines if line != title]
+    segments = [segment for line in lines for segment in CARD_SEGMENT_SEPARATOR.split(line) if segment]
+
+    prices = [(line, match) for line in lines for match in [CARD_PATTERNS["임대료(1주)"].search(line)] if match]
+    # 가격이 여러 개면 주 단위 가격 우선
+    prices.sort(key=lambda item: "주" not in item[0])
+    if prices:
+        details["임대료(1주)"] = prices[0][1].group(0)
+    for field in ("전용면적", "건물유형"):
+        details[field] = next((segment for segment in segments if CARD_PATTERNS[field].match(segment)), None)
+    details["주소"] = next((line for line in lines if CARD_ADDRESS_PATTERN.search(line)), None)
+    return details
+
+
+def calendar_fragment(soup):
+    # 보관용: 페이지 전체 대신 달력 표 부분만
+    table = soup.find(class_="calendar_table")
+    return str(table) if table else ""
+
+
+def calendar_cells(soup):
+    # ".calendar_table > thead > tr > .enable/.disable" 과 같은 셀 (CSS 선택자 엔진보다 빠른 직접 탐색)
+    cells = []
+    for table in soup.find_all(class_="calendar_table"):
+        thead = table.find("thead", recursive=False)
+        if thead is None:
+            continue
+        for row in thead.find_all("tr", recursive=False):
+            cells.extend(cell for cell in row.find_all(True, recursive=False)
+                         if CALENDAR_STATES & set(cell.get("class") or []))
+    return cells
+
+
+def calendar_bits(soup):
+    return parse_calendar_cells((cell.get_text(" ", strip=True), "disable" in cell.get("class"))
+                                for cell in calendar_cells(soup))
+
+
+def calendar_bits_html(html):
+    # 달력 표 HTML 문자열 → (booked_bits, known_bits). lxml 이 있으면 XPath 로 바로 찾는다
+    if lxml is None or not html:
+        return calendar_bits(parse_html(html or ""))
+    cells = _COMPILED_CALENDAR_XPATH(lxml.html.fragment_fromstring(html, create_parent="div"))
+    return parse_calendar_cells((" ".join(cell.text_content().split()),
+                                 "disable" in (cell.get("class") or "").split())
+                                for cell in cells)
+
+
+def reservation_summary(bits_by_month, horizon):
+    # {"YYYY-MM": (booked, known)} → ({"N월 예약": "예약/전체"}, 전체 예약률)
+    # 읽은 날짜가 하나도 없으면(달력 읽기 실패) 예약률은 0 이 아니라 None (알 수 없음)
+    reservation_data = {}
+    total_disabled = total_total = 0
+    for key, (booked, known) in bits_by_month.items():
+        disabled, total = popcount(booked), popcount(known)
+        total_disabled += disabled
+        total_total += total
+        reservation_data[month_label(int(key[:4]), int(key[5:7]), horizon)] = f"{disabled}/{total}"
+    rate = (total_disabled / total_total) if total_total > 0 else None
+    return reservation_data, rate
+
+
+def build_record(thumbnail_url, link, details, bits_by_month, horizon):
+    # crawl_room() 과 같은 모양의 결과 레코드
+    data = {"대표이미지": thumbnail_url}
+    data.update({field: details.get(field) for field in BASE_COLUMNS[1:-1]})
+    data["URL"] = link
+    reservation_data, reservation_rate = reservation_summary(bits_by_month, horizon)
+    data.update(reservation_data)
+    data["예약률"] = f"{reservation_rate:.2%}" if reservation_rate is not None else None
+    data[CALENDAR_KEY] = bits_by_month
+    return data
+
+
+def build_card_record(thumbnail_url, link, details):
+    # 카드만 읽은 레코드: 같은 열 순서, 월별 예약 열과 예약률은 빈 칸
+    data = {"대표이미지": thumbnail_url}
+    data.update({field: details.get(field) for field in BASE_COLUMNS[1:-1]})
+    data["URL"] = link
+    data["예약률"] = None
+    return data
+
+
+def extract_room(entry, horizon=None):
+    # HTML 스냅샷 {"url", "thumbnail", "detail": 상세 페이지, "calendars": {"YYYY-MM": 달력 표}} → 레코드
+    # (HTML 보관본 재추출과 파싱 프로세스가 같이 사용)
+    details = extract_details_html(entry["detail"])
+    bits = {month: calendar_bits_html(html) for month, html in entry["calendars"].items()}
+    return build_record(entry["thumbnail"], entry["url"], details, bits, horizon or len(bits))
@@ -0,0 +1,163 @@
+# html_archive.py
+#
+# 수집한 상세 페이지/달력 HTML 의 압축 보관본과 오프라인 재추출.
+# 선택자가 깨졌거나 새 필드가 필요할 때 사이트를 다시 크롤링하지 않고
+# 보관본을 다시 파싱해 결과 파일을 만든다 (브라우저 불필요).
+#
+# 형식: 방 하나 = gzip 멤버 하나에 담긴 JSON 한 줄. 추가 쓰기만 하므로 중간에 중단돼도
+# 그때까지 기록한 방은 그대로 남고, gzip 으로 열면 여러 멤버가 이어진 한 파일로 읽힌다.
+#
+#   python html_archive.py output/html_archive.jsonl.gz --keyword 사당 --output 사당_재추출.xlsx
+
+import argparse
+import datetime
+import gzip
+import itertools
+import json
+import logging
+import os
+import sys
+import threading
+import zlib
+
+from availability import month_label
+from extraction import BASE_COLUMNS, extract_room
+from log_setup import current_context
+from sinks import CsvSink, ExcelSink, JsonlSink, StatsSink, drain
+from utils import room_id_from_url
+
+
+class HtmlArchive:
+    def __init__(self, path, compresslevel=6):
+        self.path = path
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def add(self, url, thumbnail_url, detail_html, calendars, keyword=None):
+        # calendars: {"YYYY-MM": 달력 표 HTML}
+        entry = {
+            "room_id": room_id_from_url(url),
+            "keyword": keyword,
+            "fetched_at": datetime.datetime.now().isoformat(timespec="seconds"),
+            "url": url,
+            "thumbnail": thumbnail_url,
+            "detail": detail_html,
+            "calendars": calendars,
+        }
+        # 압축은 잠금 밖에서, 파일 끝에 붙이는 것만 잠금 안에서
+        data = gzip.compress((json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8"),
+                             self.compresslevel)
+        with self._lock, open(self.path, "ab") as f:
+            f.write(data)
+
+
+def read_archive(path, keyword=None, room_id=None):
+    # 보관된 항목을 기록 순서대로 하나씩 내보낸다. 끝이 잘린 멤버(기록 중 중단)는 건너뛴다
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        try:
+            for line in f:
+                entry = json.loads(line)
+                if keyword is not None and entry.get("keyword") != keyword:
+                    continue
+                if room_id is not None and entry.get("room_id") != str(room_id):
+                    continue
+                yield entry
+        except (EOFError, zlib.error, json.JSONDecodeError) as e:
+            logging.warning(f"보관본 끝부분이 손상되어 이후 항목은 건너뜀: {e}")
+
+
+def read_latest(path, keyword=None):
+    # 같은 방이 여러 번 보관됐으면 가장 최근 것만 (보관 순서 = 시간 순서).
+    # HTML 을 메모리에 모아두지 않도록 첫 번째 읽기에서는 위치만 기록하고 두 번째 읽기에서 내보낸다
+    latest = {}
+    for position, entry in enumerate(read_archive(path, keyword)):
+        latest[entry["room_id"] or entry["url"]] = position
+    keep = set(latest.values())
+    for position, entry in enumerate(read_archive(path, keyword)):
+        if position in keep:
+            yield entry
+
+
+def extract_entry(entry, horizon=None):
+    # 보관 항목 하나 → crawl_room() 과 같은 레코드
+    return extract_room(entry, horizon)
+
+
+def archive_months(path, keyword=None, latest=False):
+    # 재추출할 항목들의 달력 월 합집합 ("YYYY-MM" 정렬). 보관본은 여러 번의 실행이 함께 쓰므로
+    # 방마다 수집한 월이 다를 수 있다 (월이 바뀐 뒤의 실행 등)
+    entries = read_latest(path, keyword) if latest else read_archive(path, keyword)
+    return sorted({month for entry in entries for month in entry.get("calendars") or {}})
+
+
+def extract_archive(path, keyword=None, latest=False, horizon=None):
+    entries = read_latest(path, keyword) if latest else read_archive(path, keyword)
+    for entry in entries:
+        try:
+            yield extract_entry(entry, horizon)
+        except Exception as e:
+            logging.error(f"재추출 오류 ({entry.get('url')}): {e}", exc_info=True)
+
+
+def output_sink(path, months, horizon):
+    columns = BASE_COLUMNS + [month_label(int(m[:4]), int(m[5:7]), horizon) for m in months] + ["예약률"]
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return CsvSink(path, columns)
+    if ext == ".jsonl":
+        return JsonlSink(path)
+    image_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "images")
+    os.makedirs(image_dir, exist_ok=True)
+    return ExcelSink(path, image_dir, columns, embed_images=False)
+
+
+_archive = None
+
+
+def configure_archive(path):
+    # path 가 None 이면 보관하지 않는다
+    global _archive
+    _archive = HtmlArchive(path) if path else None
+    return _archive
+
+
+def archive_enabled():
+    return _archive is not None
+
+
+def archive_room(url, thumbnail_url, detail_html, calendars):
+    if _archive is None:
+        return
+    try:
+        _archive.add(url, thumbnail_url, detail_html, calendars, current_context().get("keyword"))
+    except Exception as e:
+        logging.warning(f"HTML 보관 오류 ({url}): {e}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTML 보관본에서 결과 파일 다시 만들기 (브라우저 불필요)")
+    parser.add_argument("archive", help="보관본 파일 (.jsonl.gz)")
+    parser.add_argument("--output", required=True, help="결과 파일 (.xlsx / .csv / .jsonl)")
+    parser.add_argument("--keyword", help="이 키워드로 수집한 방만")
+    parser.add_argument("--all", dest="latest", action="store_false",
+                        help="같은 방의 모든 보관본 사용 (기본: 가장 최근 것만)")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    # 열 구성은 모든 항목의 달력 월 합집합 (첫 레코드 기준이면 다른 월을 수집한 방의 값이 빠진다).
+    # 월 열 이름은 합집합 개월 수로 정한다 (12개월을 넘으면 연도를 붙임)
+    months = archive_months(args.archive, args.keyword, args.latest)
+    records = extract_archive(args.archive, args.keyword, args.latest, len(months))
+    first = next(records, None)
+    if first is None:
+        print("보관본에 해당하는 항목이 없습니다.", file=sys.stderr)
+        return 1
+    stats = StatsSink()
+    drain(itertools.chain([first], records), [output_sink(args.output, months, len(months)), stats])
+    print(f"{stats.rooms}개 레코드 → {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
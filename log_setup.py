@@ -0,0 +1,113 @@
+# log_setup.py
+#
+# 큐 기반 비동기 로깅 설정.
+# 크롤링 스레드는 QueueHandler 에 레코드를 넣기만 하고, 파일/콘솔/GUI 출력은
+# QueueListener 스레드가 처리하므로 I/O 가 크롤링 루프를 막지 않는다.
+
+import atexit
+import contextlib
+import contextvars
+import datetime
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# JSON-lines 로그에 별도 필드로 기록되는 구조화 필드
+STRUCTURED_FIELDS = ("room_id", "keyword", "stage", "duration", "concurrency")
+
+_context = contextvars.ContextVar("log_context", default={})
+_listener = None
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    # with 블록 안에서 남기는 모든 로그에 keyword 등의 필드를 붙인다 (스레드별로 독립)
+    token = _context.set({**_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+def current_context():
+    # 현재 스레드의 log_context 필드 (복사본)
+    return dict(_context.get())
+
+
+class ContextFilter(logging.Filter):
+    # 로그를 남긴 스레드의 log_context 필드를 레코드에 복사 (QueueHandler 에서 실행됨)
+    def filter(self, record):
+        for key, value in _context.get().items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    # 한 줄에 하나의 JSON 객체: 분석 도구에서 바로 읽을 수 있는 형식
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage(),
+        }
+        for key in STRUCTURED_FIELDS:
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_queue_logging(log_path="crawler.log", json_log_path=None,
+                        max_bytes=5 * 1024 * 1024, backup_count=3, level=logging.INFO):
+    global _listener
+    if _listener is not None:
+        return _listener
+
+    root = logging.getLogger()
+    formatter = logging.Formatter(LOG_FORMAT)
+
+    # 기존 루트 핸들러(GUI 텍스트 핸들러 등)도 리스너 뒤로 옮긴다
+    handlers = [h for h in root.handlers if not isinstance(h, QueueHandler)]
+    for h in handlers:
+        root.removeHandler(h)
+
+    if not any(type(h) is logging.StreamHandler for h in handlers):
+        console = logging.StreamHandler()  # 콘솔 출력
+        console.setFormatter(formatter)
+        handlers.append(console)
+
+    # 크기 기준 로그 회전 (crawler.log, crawler.log.1, ...)
+    file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes,
+                                       backupCount=backup_count, encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    handlers.append(file_handler)
+
+    if json_log_path:
+        json_handler = RotatingFileHandler(json_log_path, maxBytes=max_bytes,
+                                           backupCount=backup_count, encoding="utf-8")
+        json_handler.setFormatter(JsonLinesFormatter())
+        handlers.append(json_handler)
+
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    root.addHandler(queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_queue_logging)
+    return _listener
+
+
+def stop_queue_logging():
+    # 큐에 남은 로그를 모두 기록한 뒤 리스너 종료
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
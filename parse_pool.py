@@ -0,0 +1,39 @@
+# parse_pool.py
+#
+# HTML 파싱을 브라우저를 조작하는 스레드 밖(프로세스 풀)에서 실행.
+# 수집 쪽은 상세 페이지 HTML 과 월별 달력 표 HTML 만 가져와 스냅샷으로 넘기고 바로 다음 방으로 넘어가며,
+# 파싱(lxml/BeautifulSoup, 글자 정리, 예약률 계산)은 여러 코어에서 동시에 처리된다.
+# 아직 끝나지 않은 파싱이 max_pending 개를 넘으면 submit 이 기다리므로 수집이 파싱보다 너무 앞서가지 않는다.
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from extraction import extract_room
+
+
+def parse_snapshot(snapshot):
+    # 작업 프로세스에서 실행: 스냅샷 → crawl_room() 과 같은 레코드
+    return extract_room(snapshot, snapshot.get("horizon"))
+
+
+class ParsePool:
+    def __init__(self, max_workers=2, max_pending=None):
+        # spawn: 크롤러 프로세스의 브라우저/로깅 스레드 상태를 복사하지 않는다
+        self._executor = ProcessPoolExecutor(max_workers=max_workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        self._slots = threading.BoundedSemaphore(max_pending or max_workers * 4)
+
+    def submit(self, snapshot):
+        # 파싱할 스냅샷을 넘기고 Future 반환 (대기열이 가득 차면 자리가 날 때까지 기다림)
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(parse_snapshot, snapshot)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,147 @@
+# profiling.py
+#
+# 선택적 프로파일링 모드.
+# 실행이 느릴 때 CPU 가 HTML 파싱, WebDriver 왕복, 엑셀 서식 중 어디에 쓰이는지 보기 위해
+# crawl() 전체를 cProfile 로 측정하고(키워드 작업 스레드 포함), WebDriver 명령별 호출 수와
+# 누적 대기 시간을 함께 기록한다. 결과는 출력 폴더에 저장한다.
+#   profile_<시각>.prof : pstats 형식 (snakeviz 등으로 열기)
+#   profile_<시각>.txt  : 상위 N개 함수 + WebDriver 명령 요약
+# 엑셀 생성 프로세스(export_workers)는 측정 대상에 포함되지 않는다.
+
+import contextlib
+import cProfile
+import datetime
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+
+TOP_N = 40
+
+
+class WebDriverStats:
+    # WebDriver.execute 를 감싸 명령 이름별 (호출 수, 누적 시간) 기록
+    def __init__(self):
+        self.commands = {}
+        self._lock = threading.Lock()
+        self._original = None
+
+    def install(self):
+        from selenium.webdriver.remote.webdriver import WebDriver
+
+        original = WebDriver.execute
+        stats = self
+
+        def execute(driver, driver_command, params=None):
+            started = time.perf_counter()
+            try:
+                return original(driver, driver_command, params)
+            finally:
+                stats.add(driver_command, time.perf_counter() - started)
+
+        self._original = original
+        WebDriver.execute = execute
+
+    def uninstall(self):
+        if self._original is not None:
+            from selenium.webdriver.remote.webdriver import WebDriver
+            WebDriver.execute = self._original
+            self._original = None
+
+    def add(self, command, seconds):
+        with self._lock:
+            count, total = self.commands.get(command, (0, 0.0))
+            self.commands[command] = (count + 1, total + seconds)
+
+    def summary(self):
+        lines = [f"{'WebDriver 명령':<30}{'호출 수':>10}{'누적(초)':>12}{'평균(ms)':>12}"]
+        ordered = sorted(self.commands.items(), key=lambda item: item[1][1], reverse=True)
+        for command, (count, total) in ordered:
+            lines.append(f"{command:<30}{count:>10}{total:>12.2f}{total / count * 1000:>12.1f}")
+        count = sum(count for count, _ in self.commands.values())
+        total = sum(total for _, total in self.commands.values())
+        lines.append(f"{'합계':<30}{count:>10}{total:>12.2f}")
+        return "\n".join(lines)
+
+
+class RunProfiler:
+    def __init__(self, output_dir, label="crawl", top=TOP_N):
+        self.output_dir = output_dir
+        self.label = label
+        self.top = top
+        self.webdriver = WebDriverStats()
+        self._profiles = []
+        self._lock = threading.Lock()
+        self._started = None
+
+    def _new_profile(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        return profile
+
+    def _thread_hook(self, frame, event, arg):
+        # 새로 시작하는 스레드마다 별도 프로파일러를 켠다 (cProfile 은 켠 스레드만 측정)
+        self._new_profile().enable()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self.webdriver.install()
+        threading.setprofile(self._thread_hook)
+        self._main = self._new_profile()
+        self._main.enable()
+
+    def stop(self):
+        # 측정을 멈추고 결과 파일 경로 (prof, txt) 반환
+        self._main.disable()
+        threading.setprofile(None)
+        self.webdriver.uninstall()
+        elapsed = time.perf_counter() - self._started
+
+        stats = None
+        for profile in self._profiles:
+            try:
+                profile.create_stats()
+            except Exception:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+
+        stamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        os.makedirs(self.output_dir, exist_ok=True)
+        prof_path = os.path.join(self.output_dir, f"profile_{self.label}_{stamp}.prof")
+        txt_path = os.path.join(self.output_dir, f"profile_{self.label}_{stamp}.txt")
+        stats.dump_stats(prof_path)
+
+        report = io.StringIO()
+        report.write(f"{self.label} 프로파일 ({stamp}), 전체 {elapsed:.1f}초, 스레드 {len(self._profiles)}개\n\n")
+        report.write(self.webdriver.summary() + "\n\n")
+        for sort_key, title in (("tottime", "자체 시간 상위"), ("cumulative", "누적 시간 상위")):
+            report.write(f"=== {title} {self.top}개 ===\n")
+            stats.stream = report
+            stats.sort_stats(sort_key).print_stats(self.top)
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(report.getvalue())
+        logging.info(f"프로파일 저장 → {prof_path}, 요약 → {txt_path}")
+        return prof_path, txt_path
+
+
+@contextlib.contextmanager
+def profiling(output_dir, label="crawl", enabled=True):
+    # with 블록 전체를 프로파일링 (enabled 가 False 면 아무것도 하지 않음)
+    if not enabled:
+        yield None
+        return
+    profiler = RunProfiler(output_dir, label)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        try:
+            profiler.stop()
+        except Exception as e:
+            logging.error(f"프로파일 저장 오류: {e}", exc_info=True)
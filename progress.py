@@ -0,0 +1,49 @@
+# progress.py
+#
+# 키워드별 진행률과 남은 시간(ETA) 계산.
+# 검색 직후 알아낸 전체 페이지 수를 기준으로, 처리한 페이지 수와 경과 시간에서
+# 페이지당 평균 시간을 구해 남은 시간을 추정한다. 여러 브라우저가 한 키워드를
+# 나눠 처리해도 같은 객체를 공유하면 된다.
+
+import logging
+import threading
+import time
+
+
+class CrawlProgress:
+    def __init__(self, keyword, total_pages, exact=True):
+        self.keyword = keyword
+        self.total_pages = max(1, total_pages)
+        self.exact = exact  # False 면 total_pages 는 하한값 (섹션을 넘기며 갱신)
+        self.pages_done = 0
+        self.rooms_done = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def update_total(self, total_pages, exact):
+        with self._lock:
+            # 하한값끼리는 큰 쪽을 유지, 정확한 값이 나오면 그대로 사용
+            self.total_pages = max(1, total_pages if exact else max(self.total_pages, total_pages))
+            self.exact = exact
+
+    @property
+    def percent(self):
+        return min(100.0, self.pages_done / self.total_pages * 100)
+
+    @property
+    def eta_seconds(self):
+        if not self.pages_done:
+            return None
+        per_page = (time.monotonic() - self.started) / self.pages_done
+        return max(0, self.total_pages - self.pages_done) * per_page
+
+    def page_done(self, rooms):
+        with self._lock:
+            self.pages_done += 1
+            self.rooms_done += rooms
+        eta = self.eta_seconds
+        eta_text = f"{eta / 60:.1f}분" if eta is not None else "계산 중"
+        total_text = f"{self.total_pages}" if self.exact else f"{self.total_pages}+"
+        logging.info(f"진행률 {self.percent:.0f}% ({self.pages_done}/{total_text} 페이지, "
+                     f"{self.rooms_done}개 수집), 남은 시간 약 {eta_text}",
+                     extra={"stage": "progress"})
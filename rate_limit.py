@@ -0,0 +1,52 @@
+# rate_limit.py
+#
+# 모든 브라우저/작업자가 공유하는 요청 속도 제한 (토큰 버킷).
+# 페이지 이동, 상세 페이지 열기, 달력 넘기기 등 사이트에 요청이 나가기 직전에
+# throttle() 을 호출하면 전체 요청 속도가 설정값 이하로 유지된다.
+
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate=None, burst=1):
+        # rate: 초당 허용 요청 수 (None 이면 제한 없음), burst: 한 번에 몰아서 허용할 최대 요청 수
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+_shared = RateLimiter()
+
+
+def configure_rate_limit(rate, burst=1):
+    global _shared
+    _shared = RateLimiter(rate, burst)
+    return _shared
+
+
+def throttle(count=1):
+    # 요청 count 개 분량의 토큰을 받을 때까지 대기
+    for _ in range(count):
+        _shared.acquire()
+
+
+def request_interval():
+    # 설정된 속도 제한에서 요청 사이 최소 간격(초). 제한이 없으면 0
+    return 1 / _shared.rate if _shared.rate else 0
@@ -0,0 +1,360 @@
+# results_view.py
+#
+# GUI 결과 미리보기: 수집한 레코드를 엑셀을 열지 않고 표로 확인한다.
+# QTableView 는 화면에 보이는 행에 대해서만 data() 를 호출하므로, 모델이 레코드를 가볍게 들고 있으면
+# 5만 행 이상에서도 스크롤이 부드럽다.
+#   - 정렬/필터는 모델 안에서 미리 계산한 숫자 값으로 처리 (행마다 data() 를 부르는 프록시 모델 대신)
+#   - 행은 fetchMore 로 FETCH_SIZE 개씩 나눠서 뷰에 노출
+#   - 썸네일은 화면에 보이는 행이 요청할 때만 백그라운드에서 내려받아 LRU 캐시에 보관
+#   - 크롤링 스레드가 넘긴 레코드는 모아 두었다가 타이머로 한꺼번에 추가
+
+import bisect
+import collections
+import re
+import threading
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QObject, QSize, Qt, QTimer, QUrl, Signal
+from PySide6.QtGui import QDesktopServices, QPixmap
+from PySide6.QtWidgets import (QAbstractItemView, QDoubleSpinBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit,
+                               QSpinBox, QTableView, QVBoxLayout, QWidget)
+
+# (머리글, 레코드 필드)
+COLUMNS = [("썸네일", "대표이미지"), ("키워드", None), ("매물명", "매물명"), ("주소", "주소"),
+           ("건물유형", "건물유형"), ("전용면적", "전용면적"), ("임대료(1주)", "임대료(1주)"),
+           ("예약률", "예약률"), ("URL", "URL")]
+THUMBNAIL = 0
+# 숫자로 정렬/필터하는 열 → ResultRow 의 숫자 속성
+NUMERIC_COLUMNS = {5: "area", 6: "price", 7: "rate"}
+FETCH_SIZE = 500
+THUMBNAIL_SIZE = QSize(64, 48)
+THUMBNAIL_CACHE = 400
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+
+
+def parse_number(text):
+    # "350,000원" → 350000.0, "33.5㎡" → 33.5 (숫자가 없으면 None)
+    match = _NUMBER.search(str(text or ""))
+    return float(match.group().replace(",", "")) if match else None
+
+
+def parse_percent(text):
+    value = parse_number(text)
+    return value / 100 if value is not None else None
+
+
+class ResultRow:
+    __slots__ = ("values", "thumbnail", "search_text", "price", "area", "rate")
+
+    def __init__(self, keyword, record):
+        # 화면에 필요한 글자와 정렬/필터용 숫자만 보관 (날짜 비트맵 등은 버림)
+        self.values = tuple(keyword if field is None else str(record.get(field) or "")
+                            for _, field in COLUMNS)
+        self.thumbnail = record.get("대표이미지")
+        self.search_text = f"{keyword} {record.get('매물명') or ''} {record.get('주소') or ''}".lower()
+        self.price = parse_number(record.get("임대료(1주)"))
+        self.area = parse_number(record.get("전용면적"))
+        self.rate = parse_percent(record.get("예약률"))
+
+
+class ThumbnailLoader(QObject):
+    # 요청된 썸네일을 백그라운드 스레드에서 내려받는다. 가장 최근 요청(지금 보이는 행)부터 처리하고,
+    # 오래된 요청은 버린다 (빠르게 스크롤해 지나간 행)
+    loaded = Signal(str, bytes)
+
+    def __init__(self, workers=4, max_pending=120):
+        super().__init__()
+        self._pending = collections.deque()
+        self._requested = set()
+        self._max_pending = max_pending
+        self._wakeup = threading.Condition()
+        for _ in range(workers):
+            threading.Thread(target=self._run, daemon=True).start()
+
+    def request(self, url):
+        with self._wakeup:
+            if url in self._requested:
+                return
+            self._requested.add(url)
+            self._pending.append(url)
+            while len(self._pending) > self._max_pending:
+                self._requested.discard(self._pending.popleft())
+            self._wakeup.notify()
+
+    def forget(self, url):
+        # 실패한 썸네일을 다시 요청할 수 있게
+        with self._wakeup:
+            self._requested.discard(url)
+
+    def _run(self):
+        import requests  # GUI 시작 속도를 위해 실제 사용 시점에 로딩
+
+        while True:
+            with self._wakeup:
+                while not self._pending:
+                    self._wakeup.wait()
+                url = self._pending.pop()
+            try:
+                response = requests.get(url, timeout=10)
+                response.raise_for_status()
+                data = response.content
+            except Exception:
+                data = b""
+            self.loaded.emit(url, data)
+
+
+class ResultsModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []       # 전체 행 (추가된 순서)
+        self._view = []       # 필터를 통과한 행 번호 (정렬 키 오름차순)
+        self._keys = []       # _view 와 같은 순서의 정렬 키
+        self._loaded = 0      # 뷰에 노출한 행 수
+        self._sort_column = None
+        self._descending = False
+        self._filters = {}    # {"price": (최소, 최대), ...}
+        self._text = ""
+        self._pixmaps = collections.OrderedDict()
+        self._loader = ThumbnailLoader()
+        self._loader.loaded.connect(self._thumbnail_loaded)
+
+    # ---------------------------- Qt 모델 인터페이스 ----------------------------
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._loaded < len(self._view)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_SIZE, len(self._view) - self._loaded)
+        if count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._loaded, self._loaded + count - 1)
+        self._loaded += count
+        self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return COLUMNS[section][0]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.row_at(index.row())
+        column = index.column()
+        if column == THUMBNAIL:
+            if role == Qt.DecorationRole and row.thumbnail:
+                return self._pixmap(row.thumbnail)
+            if role == Qt.ToolTipRole:
+                return row.thumbnail
+            return None
+        if role == Qt.DisplayRole:
+            return row.values[column]
+        if role == Qt.TextAlignmentRole and column in NUMERIC_COLUMNS:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # 썸네일 열을 누르면 추가된 순서로 되돌린다
+        self._sort_column = None if column == THUMBNAIL else column
+        self._descending = order == Qt.DescendingOrder and self._sort_column is not None
+        self._rebuild()
+
+    # ---------------------------- 데이터 조작 ----------------------------
+    def row_at(self, display_row):
+        position = len(self._view) - 1 - display_row if self._descending else display_row
+        return self._rows[self._view[position]]
+
+    def add_records(self, items):
+        # items: [(키워드, 레코드)]. 이미 보이는 범위 안에 들어가는 행은 바로 삽입해서 표시
+        for keyword, record in items:
+            index = len(self._rows)
+            row = ResultRow(keyword, record)
+            self._rows.append(row)
+            if not self._accepts(row):
+                continue
+            key = self._sort_key(index)
+            position = bisect.bisect_right(self._keys, key)
+            fully_loaded = self._loaded == len(self._view)
+            self._keys.insert(position, key)
+            self._view.insert(position, index)
+            display = len(self._view) - 1 - position if self._descending else position
+            if display < self._loaded or (fully_loaded and self._loaded < FETCH_SIZE):
+                self.beginInsertRows(QModelIndex(), display, display)
+                self._loaded += 1
+                self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self._rows, self._view, self._keys, self._loaded = [], [], [], 0
+        self.endResetModel()
+
+    def set_filters(self, text="", **ranges):
+        # ranges: price/area/rate=(최소, 최대), 값이 None 이면 제한 없음
+        self._text = text.strip().lower()
+        self._filters = {field: bounds for field, bounds in ranges.items() if bounds != (None, None)}
+        self._rebuild()
+
+    @property
+    def total(self):
+        return len(self._rows)
+
+    @property
+    def matched(self):
+        return len(self._view)
+
+    def _accepts(self, row):
+        if self._text and self._text not in row.search_text:
+            return False
+        for field, (low, high) in self._filters.items():
+            value = getattr(row, field)
+            if value is None or (low is not None and value < low) or (high is not None and value > high):
+                return False
+        return True
+
+    def _sort_key(self, index):
+        # 빈 값은 정렬 방향과 관계없이 맨 뒤. 같은 값이면 추가된 순서
+        if self._sort_column is None:
+            return (0, index)
+        row = self._rows[index]
+        if self._sort_column in NUMERIC_COLUMNS:
+            value = getattr(row, NUMERIC_COLUMNS[self._sort_column])
+            if value is None:
+                return (-1 if self._descending else 1, 0, index)
+            return (0, value, index)
+        return (0, row.values[self._sort_column], index)
+
+    def _rebuild(self):
+        self.beginResetModel()
+        matched = [index for index, row in enumerate(self._rows) if self._accepts(row)]
+        pairs = sorted((self._sort_key(index), index) for index in matched)
+        self._keys = [key for key, _ in pairs]
+        self._view = [index for _, index in pairs]
+        self._loaded = min(len(self._view), FETCH_SIZE)
+        self.endResetModel()
+
+    # ---------------------------- 썸네일 ----------------------------
+    def _pixmap(self, url):
+        pixmap = self._pixmaps.get(url)
+        if pixmap is not None:
+            self._pixmaps.move_to_end(url)
+            return pixmap
+        self._loader.request(url)
+        return None
+
+    def _thumbnail_loaded(self, url, data):
+        pixmap = QPixmap()
+        if not data or not pixmap.loadFromData(data):
+            self._loader.forget(url)
+            return
+        self._pixmaps[url] = pixmap.scaled(THUMBNAIL_SIZE, Qt.KeepAspectRatio, Qt.SmoothTransformation)
+        while len(self._pixmaps) > THUMBNAIL_CACHE:
+            evicted, _ = self._pixmaps.popitem(last=False)
+            self._loader.forget(evicted)
+        if self._loaded:
+            # 보이는 행만 다시 그려진다
+            self.dataChanged.emit(self.index(0, THUMBNAIL), self.index(self._loaded - 1, THUMBNAIL),
+                                  [Qt.DecorationRole])
+
+
+class ResultsPanel(QWidget):
+    # 필터 입력 + 결과 표. add_record 는 크롤링 스레드에서 불러도 된다
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.model = ResultsModel(self)
+        self._incoming = collections.deque()
+
+        self.search = QLineEdit()
+        self.search.setPlaceholderText("키워드/매물명/주소 검색")
+        self.price_min, self.price_max = (self._spin(QSpinBox, 100_000_000, 10_000),
+                                          self._spin(QSpinBox, 100_000_000, 10_000))
+        self.area_min, self.area_max = self._spin(QDoubleSpinBox, 1000, 5), self._spin(QDoubleSpinBox, 1000, 5)
+        self.rate_min, self.rate_max = self._spin(QDoubleSpinBox, 100, 5), self._spin(QDoubleSpinBox, 100, 5)
+        self.count_label = QLabel()
+
+        filters = QHBoxLayout()
+        filters.addWidget(self.search, 2)
+        for label, low, high in (("임대료", self.price_min, self.price_max), ("면적", self.area_min, self.area_max),
+                                 ("예약률(%)", self.rate_min, self.rate_max)):
+            filters.addWidget(QLabel(label))
+            filters.addWidget(low)
+            filters.addWidget(QLabel("~"))
+            filters.addWidget(high)
+        filters.addWidget(self.count_label)
+
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(THUMBNAIL, Qt.AscendingOrder)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.setIconSize(THUMBNAIL_SIZE)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(THUMBNAIL_SIZE.height() + 4)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.table.setColumnWidth(THUMBNAIL, THUMBNAIL_SIZE.width() + 8)
+        self.table.doubleClicked.connect(self._open_room)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(filters)
+        layout.addWidget(self.table)
+
+        # 입력이 멈춘 뒤에 필터 적용 (글자마다 5만 행을 다시 거르지 않도록)
+        self._filter_timer = QTimer(self, singleShot=True, interval=300)
+        self._filter_timer.timeout.connect(self.apply_filters)
+        self.search.textChanged.connect(self._filter_timer.start)
+        for spin in (self.price_min, self.price_max, self.area_min, self.area_max, self.rate_min, self.rate_max):
+            spin.valueChanged.connect(self._filter_timer.start)
+
+        # 크롤링 스레드가 넘긴 레코드를 주기적으로 한꺼번에 추가
+        self._flush_timer = QTimer(self, interval=300)
+        self._flush_timer.timeout.connect(self.flush)
+        self._flush_timer.start()
+        self._update_count()
+
+    @staticmethod
+    def _spin(cls, maximum, step):
+        # 0 = 제한 없음
+        spin = cls()
+        spin.setRange(0, maximum)
+        spin.setSingleStep(step)
+        spin.setSpecialValueText("-")
+        return spin
+
+    def add_record(self, keyword, record):
+        # crawl(record_callback=...) 으로 넘긴다. deque 추가는 스레드 안전
+        self._incoming.append((keyword, record))
+
+    def flush(self):
+        items = []
+        while self._incoming:
+            items.append(self._incoming.popleft())
+        if items:
+            self.model.add_records(items)
+            self._update_count()
+
+    def clear(self):
+        self._incoming.clear()
+        self.model.clear()
+        self._update_count()
+
+    def apply_filters(self):
+        def bounds(low, high, scale=1):
+            return (low.value() / scale if low.value() else None, high.value() / scale if high.value() else None)
+
+        self.model.set_filters(self.search.text(), price=bounds(self.price_min, self.price_max),
+                               area=bounds(self.area_min, self.area_max),
+                               rate=bounds(self.rate_min, self.rate_max, 100))
+        self._update_count()
+
+    def _update_count(self):
+        self.count_label.setText(f"{self.model.matched:,} / {self.model.total:,}개")
+
+    def _open_room(self, index):
+        url = self.model.row_at(index.row()).values[-1]
+        if url:
+            QDesktopServices.openUrl(QUrl(url))
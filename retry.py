@@ -0,0 +1,95 @@
+# retry.py
+#
+# 일시적인 오류(타임아웃, 로딩 지연)에 대한 재시도 정책과 서킷 브레이커.
+# 페이지 이동, 상세 페이지 로드, 달력 넘기기 등을 retry_call() 로 감싸면
+# 지수 백오프 + 지터로 재시도하고, 사이트가 요청을 막기 시작하면(연속 실패)
+# 서킷 브레이커가 열려 모든 작업자가 잠시 쉬었다가 다시 시도한다.
+
+import logging
+import random
+import threading
+import time
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=3, base_delay=1.0, max_delay=30.0, jitter=0.5):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter  # 대기 시간의 ± 비율
+
+    def delay(self, attempt):
+        # attempt: 1부터 시작하는 실패 횟수
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self._opened_at is not None
+
+    def wait_if_open(self):
+        # 브레이커가 열려 있으면 쿨다운이 끝날 때까지 대기 (이후 반개방 상태로 시도)
+        with self._lock:
+            opened_at = self._opened_at
+        if opened_at is not None:
+            remaining = opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+
+    def record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logging.info("서킷 브레이커 닫힘: 요청이 다시 정상 처리됩니다.")
+            self._failures = 0
+            self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    logging.warning(f"연속 {self._failures}회 실패 → 서킷 브레이커 열림, "
+                                    f"{self.cooldown:.0f}초 대기 후 재시도합니다.")
+                self._opened_at = time.monotonic()
+
+
+DEFAULT_POLICY = RetryPolicy()
+_breaker = CircuitBreaker()
+
+
+def configure_circuit_breaker(failure_threshold=5, cooldown=60.0):
+    global _breaker
+    _breaker = CircuitBreaker(failure_threshold, cooldown)
+    return _breaker
+
+
+def retry_call(func, *args, policy=None, stage="", on_retry=None, **kwargs):
+    # func 를 policy 에 따라 재시도. 마지막 시도까지 실패하면 예외를 그대로 올린다.
+    policy = policy or DEFAULT_POLICY
+    for attempt in range(1, policy.max_attempts + 1):
+        _breaker.wait_if_open()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            _breaker.record_failure()
+            if attempt >= policy.max_attempts:
+                raise
+            delay = policy.delay(attempt)
+            logging.warning(f"{stage or func.__name__} 실패 ({attempt}/{policy.max_attempts}), "
+                            f"{delay:.1f}초 후 재시도: {e}",
+                            extra={"stage": stage or func.__name__})
+            if on_retry is not None:
+                on_retry()
+            time.sleep(delay)
+        else:
+            _breaker.record_success()
+            return result
@@ -0,0 +1,166 @@
+# sampling.py
+#
+# 표본 조사 모드: 키워드의 평균 예약률만 빠르게 추정.
+# 2단계 집락 추출: 검색 결과 페이지를 집락(1차 단위)으로 보고 무작위로 고른 페이지에서만
+# 방(2차 단위)을 몇 개씩 뽑아 달력을 읽은 뒤, 페이지별 평균을 방 수로 가중한 비율 추정량과 신뢰구간을 계산한다.
+# 모든 페이지에서 방을 뽑는 층화 추출이 아니므로 분산에 페이지 간 차이가 그대로 들어간다 —
+# 검색 결과가 인기순처럼 예약률과 관련된 순서로 정렬돼 있으면 같은 방 수의 층화 표본보다 신뢰구간이 넓다.
+# 대신 방문할 페이지 수가 표본 크기에 비례해(페이지 이동이 가장 비싸다) 전체 페이지를 돌지 않아도 된다.
+# 달력을 읽지 못해 예약률을 알 수 없는 방(None)은 표본에서 뺀다 (0% 로 세지 않는다).
+# 페이지는 한 번에 pages_per_round 개씩 무작위로 골라 앞쪽부터 순서대로 방문하고(페이지 이동은
+# 앞으로만 가능), 한 라운드가 끝날 때마다 신뢰구간 폭이 목표보다 좁아졌으면 멈춘다.
+
+import logging
+import math
+import os
+import random
+import statistics
+
+from retry import retry_call
+
+
+class OccupancyEstimate:
+    # 페이지별 (방 수, 표본 평균 예약률)로 전체 평균 예약률과 신뢰구간 계산
+    def __init__(self, confidence=0.95):
+        self.confidence = confidence
+        self.pages = []  # [(페이지의 방 수, 표본 평균 예약률)]
+        self.rooms = 0
+
+    def add_page(self, room_count, rates):
+        if rates:
+            self.pages.append((room_count, sum(rates) / len(rates)))
+            self.rooms += len(rates)
+
+    @property
+    def mean(self):
+        weight = sum(count for count, _ in self.pages)
+        return sum(count * rate for count, rate in self.pages) / weight if weight else None
+
+    @property
+    def half_width(self):
+        # 집락 표본의 비율 추정량 분산. 유한 모집단 보정을 하지 않은 (복원추출) 근사식이라
+        # 페이지 안에서 방을 일부만 뽑은 2단계 추출의 분산까지 보수적으로 포함한다. 페이지가 2개 미만이면 None
+        n = len(self.pages)
+        if n < 2:
+            return None
+        mean = self.mean
+        average_count = sum(count for count, _ in self.pages) / n
+        spread = sum((count * (rate - mean)) ** 2 for count, rate in self.pages) / (n - 1)
+        z = statistics.NormalDist().inv_cdf(0.5 + self.confidence / 2)
+        return z * math.sqrt(spread / n) / average_count
+
+    def interval(self):
+        half = self.half_width
+        if half is None:
+            return None, None
+        return max(0.0, self.mean - half), min(1.0, self.mean + half)
+
+
+def sample_keyword(driver, keyword, max_pages=1000, calendar_months=3, target_width=0.05, confidence=0.95,
+                   rooms_per_page=2, pages_per_round=10, max_rooms=None, seed=None, sinks=()):
+    # 표본 조사 결과 요약 딕셔너리 반환. 수집한 방 레코드는 sinks 에도 기록
+    from crawler import discover_total_pages, goto_page, list_rooms, process_room, search_keyword, shown_page
+    from sinks import parse_rate
+
+    rng = random.Random(seed)
+    retry_call(search_keyword, driver, keyword, stage="search")
+    total_pages, exact = discover_total_pages(driver)
+    total_pages = min(total_pages, max_pages)
+    if not exact:
+        logging.warning(f"키워드 '{keyword}': 전체 페이지 수를 알 수 없어 앞쪽 {total_pages}페이지에서만 표본 추출")
+
+    estimate = OccupancyEstimate(confidence)
+    remaining = list(range(1, total_pages + 1))
+    rng.shuffle(remaining)
+    visited = 0
+    stopped_early = False
+    while remaining:
+        # 이번 라운드 페이지 (무작위로 골라 오름차순 방문)
+        batch, remaining = sorted(remaining[:pages_per_round]), remaining[pages_per_round:]
+        current = 1
+        if visited:
+            retry_call(search_keyword, driver, keyword, stage="search")
+        for page in batch:
+            try:
+                moved = goto_page(driver, current, page)
+            except Exception as e:
+                logging.error(f"{page}페이지 이동 실패 → 이 페이지 건너뜀: {e}")
+                current = shown_page(driver, current)
+                continue
+            if moved is None:
+                break
+            current = moved
+            visited += 1
+
+            rooms = [room for room in list_rooms(driver) if room[1]]
+            rates = []
+            for idx, (thumbnail_url, link) in enumerate(rng.sample(rooms, min(rooms_per_page, len(rooms))), 1):
+                data = process_room(driver, thumbnail_url, link, f"{page}페이지 표본 {idx}", calendar_months)
+                if data is None:
+                    continue
+                rate = parse_rate(data.get("예약률"))  # 예약률을 알 수 없는 방은 None → 표본에서 제외
+                if rate is not None:
+                    rates.append(rate)
+                for sink in sinks:
+                    sink.write(data)
+            estimate.add_page(len(rooms), rates)
+
+        low, high = estimate.interval()
+        if low is not None:
+            logging.info(f"키워드 '{keyword}' 표본 {estimate.rooms}개 ({len(estimate.pages)}/{total_pages}페이지): "
+                         f"평균 예약률 {estimate.mean:.1%} (신뢰구간 {low:.1%} ~ {high:.1%})",
+                         extra={"stage": "sample"})
+            if high - low <= target_width:
+                stopped_early = bool(remaining)
+                break
+        if max_rooms and estimate.rooms >= max_rooms:
+            logging.info(f"키워드 '{keyword}': 최대 표본 수 {max_rooms}개에 도달")
+            break
+
+    low, high = estimate.interval()
+    return {"keyword": keyword, "status": "ok" if estimate.rooms else "error", "rooms": estimate.rooms,
+            "pages": len(estimate.pages), "total_pages": total_pages, "exact_pages": exact,
+            "average_rate": estimate.mean, "ci_low": low, "ci_high": high, "confidence": confidence,
+            "stopped_early": stopped_early}
+
+
+def sample(keywords, base_image_dir, output_dir, target_width=0.05, confidence=0.95, rooms_per_page=2,
+           pages_per_round=10, max_rooms=None, seed=None, max_sections=100, pages_per_section=10,
+           json_log_path=None, max_workers=1, requests_per_second=None, calendar_months=3,
+           output_formats=("xlsx",), headless=False, login_wait=60, cookies_path=None, recycle_rooms=None,
+           recycle_rss_mb=None):
+    # 키워드별 표본 조사. 표본 방 목록은 rooms_sample_<키워드>.* 로 저장
+    from browser import configure_recycling
+    from crawler import make_sinks, quit_drivers, run_on_drivers, setup_logger, start_drivers
+    from log_setup import log_context
+    from rate_limit import configure_rate_limit
+    from sinks import drain
+
+    setup_logger(json_log_path)
+    configure_rate_limit(requests_per_second)
+    configure_recycling(recycle_rooms, recycle_rss_mb)
+
+    def sample_one(driver, keyword, _pool):
+        image_dir = os.path.join(base_image_dir, keyword)
+        os.makedirs(image_dir, exist_ok=True)
+        excel_path = os.path.join(output_dir, f"rooms_sample_{keyword}.xlsx")
+        sinks = make_sinks(keyword, excel_path, image_dir, output_formats, calendar_months)
+        with log_context(keyword=keyword, stage="sample"):
+            try:
+                result = sample_keyword(driver, keyword, max_sections * pages_per_section, calendar_months,
+                                        target_width, confidence, rooms_per_page, pages_per_round, max_rooms,
+                                        seed, sinks)
+            finally:
+                outputs = drain((), sinks)
+        result["outputs"] = outputs
+        if result["ci_low"] is not None:
+            logging.info(f"키워드 '{keyword}' 추정 평균 예약률 {result['average_rate']:.1%} "
+                         f"({confidence:.0%} 신뢰구간 {result['ci_low']:.1%} ~ {result['ci_high']:.1%}, "
+                         f"표본 {result['rooms']}개)")
+        return result
+
+    drivers = start_drivers(max_workers, len(keywords), headless, login_wait, cookies_path)
+    try:
+        return run_on_drivers(drivers, keywords, sample_one)
+    finally:
+        quit_drivers(drivers)
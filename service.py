@@ -0,0 +1,534 @@
+# service.py
+#
+# 크롤링 서비스 (로컬 데몬): 로그인된 브라우저를 띄워 둔 채로 HTTP/JSON 으로 작업을 받아 처리.
+# 실행할 때마다 드는 import, 드라이버 준비, 크롬 실행, 로그인 대기를 서비스 시작 때 한 번만 하고,
+# 여러 사람/프로그램(GUI, 스크립트)이 넣은 작업을 큐에 쌓아 쉬는 브라우저가 키워드 단위로 처리한다.
+# 쉬는 브라우저가 더 있으면 crawl() 과 같이 한 키워드의 페이지를 나눠 맡는다.
+#
+#   python service.py --port 8765 --browsers 2 --cookies cookies.json
+#
+#   POST /jobs                       {"keywords": ["사당", "강남"], "calendar_months": 3}  → 작업
+#   GET  /jobs                       작업 목록
+#   GET  /jobs/<id>                  상태, 키워드별 진행률/남은 시간, 결과 파일
+#   GET  /jobs/<id>/records?since=N  수집된 레코드 (N 번째부터)
+#   GET  /jobs/<id>/files/<이름>      결과 파일 내려받기
+#   POST /jobs/<id>/cancel           아직 시작하지 않은 키워드 취소
+#   GET  /status                     브라우저/대기열 상태
+#   GET  /log?since=N                최근 로그
+#
+# 이 모듈은 가벼운 표준 라이브러리만 import 한다 (ServiceClient 는 GUI 에서도 사용).
+# crawler 모듈은 서비스를 시작할 때 불러온다.
+
+import argparse
+import collections
+import datetime
+import itertools
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import sys
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8765
+DEFAULT_URL = f"http://127.0.0.1:{DEFAULT_PORT}"
+# 작업마다 메모리에 남겨 둘 최근 레코드 수 (미리보기용, 결과 파일에는 모두 기록됨)
+MAX_JOB_RECORDS = 50000
+# /log 로 돌려줄 최근 로그 줄 수
+LOG_LINES = 2000
+# 작업마다 지정할 수 있는 설정과 기본값 (나머지는 서비스 시작 옵션)
+JOB_OPTIONS = {
+    "max_sections": 100,
+    "pages_per_section": 10,
+    "calendar_months": 3,
+    "output_formats": ["xlsx"],
+    "shard_rows": None,
+    "quick_scan": False,  # 검색 결과 카드만 읽기 (달력/관리비/청소비는 빈 칸)
+}
+FINISHED = ("done", "partial", "error", "cancelled")
+
+
+def _now():
+    return datetime.datetime.now().isoformat(timespec="seconds")
+
+
+class LogBuffer(logging.Handler):
+    # 최근 로그를 번호와 함께 보관 (클라이언트는 받은 다음 번호부터 다시 요청)
+    def __init__(self, capacity=LOG_LINES):
+        super().__init__()
+        self.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+        self.lines = collections.deque(maxlen=capacity)
+        self.next_seq = 0
+
+    def emit(self, record):
+        self.lines.append((self.next_seq, self.format(record)))
+        self.next_seq += 1
+
+    def since(self, seq):
+        with self.lock:
+            return [line for n, line in self.lines if n >= seq], self.next_seq
+
+
+class Job:
+    def __init__(self, job_id, keywords, options, output_dir):
+        self.id = job_id
+        self.keywords = keywords
+        self.options = options
+        self.output_dir = output_dir
+        self.submitted = _now()
+        self.started = None
+        self.finished = None
+        self.cancelled = False
+        self.keyword_status = {keyword: "queued" for keyword in keywords}
+        self.results = {}
+        self.progress = {}  # 키워드 → CrawlProgress 를 받을 목록 (crawl_keyword 의 progress_holder)
+        self.records = collections.deque(maxlen=MAX_JOB_RECORDS)
+        self.record_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def status(self):
+        states = set(self.keyword_status.values())
+        if states & {"queued", "running"}:
+            return "running" if self.started else "queued"
+        if states == {"cancelled"}:
+            return "cancelled"
+        if states == {"ok"}:
+            return "done"
+        return "partial" if "ok" in states else "error"
+
+    def keyword_started(self, keyword):
+        with self._lock:
+            self.started = self.started or _now()
+            self.keyword_status[keyword] = "running"
+            self.progress[keyword] = []
+            return self.progress[keyword]
+
+    def keyword_done(self, keyword, result):
+        with self._lock:
+            self.results[keyword] = result
+            self.keyword_status[keyword] = result.get("status", "ok")
+            if self.status in FINISHED:
+                self.finished = _now()
+
+    def cancel(self):
+        # 대기 중인 키워드만 취소 (진행 중인 키워드는 끝까지 수집)
+        with self._lock:
+            self.cancelled = True
+            for keyword, state in self.keyword_status.items():
+                if state == "queued":
+                    self.keyword_status[keyword] = "cancelled"
+            if self.status in FINISHED:
+                self.finished = self.finished or _now()
+
+    def add_record(self, keyword, record):
+        # crawl_keyword(record_callback=...) 으로 넘긴다
+        with self._lock:
+            self.records.append((self.record_count, keyword,
+                                 {k: v for k, v in record.items() if not str(k).startswith("_")}))
+            self.record_count += 1
+
+    def records_since(self, since):
+        with self._lock:
+            items = [{"keyword": keyword, "record": record} for n, keyword, record in self.records if n >= since]
+            return items, self.record_count
+
+    def output_files(self):
+        # 내려받을 수 있는 결과 파일 {파일 이름: 경로}
+        files = {}
+        for result in self.results.values():
+            for path in result.get("outputs") or []:
+                files[os.path.basename(path)] = path
+        return files
+
+    def to_dict(self):
+        keywords = []
+        for keyword in self.keywords:
+            entry = {"keyword": keyword, "status": self.keyword_status[keyword]}
+            holder = self.progress.get(keyword)
+            if holder:
+                progress = holder[0]
+                entry.update(pages_done=progress.pages_done, total_pages=progress.total_pages,
+                             exact=progress.exact, rooms=progress.rooms_done,
+                             percent=round(progress.percent, 1), eta_seconds=progress.eta_seconds)
+            result = self.results.get(keyword)
+            if result:
+                entry.update({k: v for k, v in result.items() if k not in ("keyword", "status", "outputs")})
+            keywords.append(entry)
+        return {"id": self.id, "status": self.status, "submitted": self.submitted, "started": self.started,
+                "finished": self.finished, "options": self.options, "keywords": keywords,
+                "records": self.record_count, "files": sorted(self.output_files())}
+
+
+class CrawlService:
+    def __init__(self, output_dir="output", browsers=1, headless=False, login_wait=60, cookies_path=None,
+                 json_log_path=None, requests_per_second=None, snapshot_db_path=None, html_archive=False,
+                 prefetch_tabs=0, batch_fetch=0, adaptive_fetch=False, max_batch_fetch=16, parse_workers=0,
+                 recycle_rooms=None, recycle_rss_mb=None):
+        self.output_dir = output_dir
+        self.browsers = max(1, browsers)
+        self.headless = headless
+        self.login_wait = login_wait
+        self.cookies_path = cookies_path
+        self.json_log_path = json_log_path
+        self.requests_per_second = requests_per_second
+        self.snapshot_db_path = snapshot_db_path
+        self.html_archive = html_archive
+        self.prefetch_tabs = prefetch_tabs
+        self.batch_fetch = batch_fetch
+        self.adaptive_fetch = adaptive_fetch
+        self.max_batch_fetch = max_batch_fetch
+        self.parse_workers = parse_workers
+        self.recycle_rooms = recycle_rooms
+        self.recycle_rss_mb = recycle_rss_mb
+
+        self.log = LogBuffer()
+        self.jobs = collections.OrderedDict()
+        self.tasks = queue.Queue()  # (작업, 키워드)
+        self.driver_pool = queue.Queue()
+        self.started = None
+        self._drivers = []
+        self._threads = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._snapshot_store = None
+        self._parse_pool = None
+        self._fetch_controller = None
+
+    def start(self):
+        # 설정 적용 → 브라우저 로그인 → 키워드 작업 스레드 시작 (브라우저 수만큼)
+        import crawler  # 무거운 의존성 지연 로딩
+
+        logging.getLogger().addHandler(self.log)  # setup_logger 가 리스너 뒤로 옮긴다
+        crawler.setup_logger(self.json_log_path)
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._snapshot_store = crawler.open_snapshot_store(self.output_dir, self.snapshot_db_path)
+        crawler.configure_archive(os.path.join(self.output_dir, "html_archive.jsonl.gz")
+                                  if self.html_archive else None)
+        crawler.configure_recycling(self.recycle_rooms, self.recycle_rss_mb)
+        crawler.configure_rate_limit(self.requests_per_second)
+        # 파싱 프로세스 풀과 일괄 수집 동시 수 조절은 모든 작업이 공유하고, 수집 방식은 작업마다 따로 넘긴다
+        self._parse_pool = crawler.ParsePool(self.parse_workers) if self.parse_workers else None
+        self._fetch_controller = crawler.fetch_controller(self.batch_fetch, self.adaptive_fetch,
+                                                          self.max_batch_fetch)
+
+        self._drivers = crawler.start_drivers(self.browsers, self.browsers, self.headless, self.login_wait,
+                                              self.cookies_path)
+        for driver in self._drivers:
+            self.driver_pool.put(driver)
+        for _ in self._drivers:
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.started = _now()
+        logging.info(f"크롤링 서비스 준비 완료: 브라우저 {len(self._drivers)}개")
+
+    def stop(self):
+        import crawler
+
+        for _ in self._threads:
+            self.tasks.put(None)
+        for thread in self._threads:
+            thread.join()
+        crawler.quit_drivers(self._drivers)
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+
+    def submit(self, keywords, options=None):
+        # 작업 등록 → Job. 키워드마다 대기열에 넣는다
+        keywords = [str(k).strip() for k in keywords if str(k).strip()]
+        if not keywords:
+            raise ValueError("키워드가 없습니다.")
+        unknown = set(options or {}) - set(JOB_OPTIONS)
+        if unknown:
+            raise ValueError(f"알 수 없는 설정: {', '.join(sorted(unknown))}")
+        options = {**JOB_OPTIONS, **(options or {})}
+        with self._lock:
+            job_id = f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{next(self._ids)}"
+            job = Job(job_id, keywords, options, os.path.join(self.output_dir, job_id))
+            self.jobs[job_id] = job
+        os.makedirs(job.output_dir, exist_ok=True)
+        for keyword in keywords:
+            self.tasks.put((job, keyword))
+        logging.info(f"작업 {job_id} 등록: {', '.join(keywords)} (대기 키워드 {self.tasks.qsize()}개)")
+        return job
+
+    def status(self):
+        return {"started": self.started, "browsers": len(self._drivers), "idle_browsers": self.driver_pool.qsize(),
+                "queued_keywords": self.tasks.qsize(),
+                "jobs": collections.Counter(job.status for job in list(self.jobs.values()))}
+
+    def _work(self):
+        import crawler
+
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+            job, keyword = task
+            if job.keyword_status[keyword] != "queued":  # 취소됨
+                continue
+            driver = self.driver_pool.get()
+            try:
+                self._ensure_alive(driver)
+                progress_holder = job.keyword_started(keyword)
+                options = job.options
+                fetch = crawler.FetchOptions(self.prefetch_tabs, self.batch_fetch, self._fetch_controller,
+                                             self._parse_pool, options["quick_scan"])
+                result = crawler.crawl_keyword(
+                    driver, keyword, os.path.join(job.output_dir, "images"), job.output_dir,
+                    options["max_sections"], options["pages_per_section"], self._snapshot_store,
+                    options["calendar_months"], self.driver_pool, tuple(options["output_formats"]),
+                    job.add_record, shard_rows=options["shard_rows"], progress_holder=progress_holder,
+                    fetch=fetch)
+            except Exception as e:
+                logging.error(f"작업 {job.id} 키워드 '{keyword}' 처리 오류: {e}", exc_info=True)
+                result = {"keyword": keyword, "status": "error", "error": str(e)}
+            finally:
+                self.driver_pool.put(driver)
+            job.keyword_done(keyword, result)
+            if job.status in FINISHED:
+                logging.info(f"작업 {job.id} 종료: {job.status}")
+
+    @staticmethod
+    def _ensure_alive(driver):
+        # 쉬는 동안 브라우저가 죽었으면 저장된 쿠키로 새로 띄운다
+        try:
+            driver.current_url
+        except Exception as e:
+            logging.warning(f"브라우저 응답 없음 → 재시작: {e}")
+            driver.recycle()
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    routes = [
+        ("GET", re.compile(r"/status"), "get_status"),
+        ("GET", re.compile(r"/log"), "get_log"),
+        ("GET", re.compile(r"/jobs"), "list_jobs"),
+        ("POST", re.compile(r"/jobs"), "create_job"),
+        ("GET", re.compile(r"/jobs/([\w-]+)"), "get_job"),
+        ("GET", re.compile(r"/jobs/([\w-]+)/records"), "get_records"),
+        ("GET", re.compile(r"/jobs/([\w-]+)/files/(.+)"), "get_file"),
+        ("POST", re.compile(r"/jobs/([\w-]+)/cancel"), "cancel_job"),
+    ]
+
+    @property
+    def service(self):
+        return self.server.service
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        logging.debug(f"HTTP {self.address_string()} {format % args}")
+
+    def _dispatch(self, method):
+        url = urllib.parse.urlsplit(self.path)
+        self.query = urllib.parse.parse_qs(url.query)
+        path = urllib.parse.unquote(url.path).rstrip("/") or "/"
+        for route_method, pattern, name in self.routes:
+            match = pattern.fullmatch(path)
+            if match and route_method == method:
+                try:
+                    getattr(self, name)(*match.groups())
+                except ValueError as e:
+                    self._send_json({"error": str(e)}, 400)
+                except Exception as e:
+                    logging.error(f"서비스 요청 처리 오류 ({method} {path}): {e}", exc_info=True)
+                    self._send_json({"error": str(e)}, 500)
+                return
+        self._send_json({"error": "not found"}, 404)
+
+    def _send_json(self, data, status=200):
+        body = json.dumps(data, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON 형식 오류: {e}")
+
+    def _int_query(self, name, default=0):
+        try:
+            return int(self.query.get(name, [default])[0])
+        except ValueError:
+            raise ValueError(f"{name} 는 정수여야 합니다.")
+
+    def _job(self, job_id):
+        job = self.service.jobs.get(job_id)
+        if job is None:
+            self._send_json({"error": f"작업 없음: {job_id}"}, 404)
+        return job
+
+    def get_status(self):
+        self._send_json(self.service.status())
+
+    def get_log(self):
+        lines, next_seq = self.service.log.since(self._int_query("since"))
+        self._send_json({"lines": lines, "next": next_seq})
+
+    def list_jobs(self):
+        self._send_json([job.to_dict() for job in list(self.service.jobs.values())])
+
+    def create_job(self):
+        body = self._read_json()
+        keywords = body.pop("keywords", None)
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        job = self.service.submit(keywords or [], body)
+        # log_next: 이 작업부터의 로그만 받으려면 /log?since=<log_next>
+        self._send_json({**job.to_dict(), "log_next": self.service.log.next_seq}, 202)
+
+    def get_job(self, job_id):
+        job = self._job(job_id)
+        if job is not None:
+            self._send_json(job.to_dict())
+
+    def get_records(self, job_id):
+        job = self._job(job_id)
+        if job is not None:
+            records, next_seq = job.records_since(self._int_query("since"))
+            self._send_json({"records": records, "next": next_seq})
+
+    def get_file(self, job_id, name):
+        job = self._job(job_id)
+        if job is None:
+            return
+        # 작업이 만든 결과 파일만 내려준다 (경로를 직접 받지 않음)
+        path = job.output_files().get(name)
+        if path is None or not os.path.isfile(path):
+            self._send_json({"error": f"파일 없음: {name}"}, 404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.send_header("Content-Disposition", f"attachment; filename*=UTF-8''{urllib.parse.quote(name)}")
+        self.end_headers()
+        with open(path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+
+    def cancel_job(self, job_id):
+        job = self._job(job_id)
+        if job is not None:
+            job.cancel()
+            logging.info(f"작업 {job_id} 취소 요청")
+            self._send_json(job.to_dict())
+
+
+class ServiceClient:
+    # 크롤링 서비스 HTTP 클라이언트 (GUI/스크립트용)
+    def __init__(self, url=DEFAULT_URL, timeout=10):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _request(self, method, path, body=None):
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else None
+        request = urllib.request.Request(self.url + path, data=data, method=method,
+                                         headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get("error")
+            except Exception:
+                message = e.reason
+            raise RuntimeError(f"서비스 오류 ({e.code}): {message}") from None
+
+    def _job_path(self, job_id, suffix=""):
+        return f"/jobs/{urllib.parse.quote(job_id)}{suffix}"
+
+    def status(self):
+        return self._request("GET", "/status")
+
+    def submit(self, keywords, **options):
+        return self._request("POST", "/jobs", {"keywords": list(keywords), **options})
+
+    def jobs(self):
+        return self._request("GET", "/jobs")
+
+    def job(self, job_id):
+        return self._request("GET", self._job_path(job_id))
+
+    def records(self, job_id, since=0):
+        return self._request("GET", self._job_path(job_id, f"/records?since={since}"))
+
+    def log(self, since=0):
+        return self._request("GET", f"/log?since={since}")
+
+    def cancel(self, job_id):
+        return self._request("POST", self._job_path(job_id, "/cancel"))
+
+    def download(self, job_id, name, path):
+        url = self.url + self._job_path(job_id, f"/files/{urllib.parse.quote(name)}")
+        with urllib.request.urlopen(url, timeout=self.timeout) as response, open(path, "wb") as out:
+            shutil.copyfileobj(response, out)
+        return path
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT):
+    # 서비스 시작(브라우저 로그인) 후 HTTP 요청 처리. Ctrl+C 로 종료
+    service.start()
+    server = ThreadingHTTPServer((host, port), ServiceHandler)
+    server.daemon_threads = True
+    server.service = service
+    logging.info(f"크롤링 서비스 대기 중: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logging.info("크롤링 서비스 종료 중…")
+    finally:
+        server.server_close()
+        service.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="크롤링 서비스 (HTTP/JSON 작업 API + 로그인된 브라우저 풀)")
+    parser.add_argument("--host", default="127.0.0.1", help="다른 PC 에서 접속하려면 0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--output-dir", default="output", help="작업별 결과 폴더의 상위 폴더")
+    parser.add_argument("--browsers", type=int, default=1, help="띄워 둘 브라우저 수")
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--login-wait", type=int, default=60)
+    parser.add_argument("--cookies", help="로그인 쿠키 파일 (있으면 로그인 대기 생략)")
+    parser.add_argument("--json-log")
+    parser.add_argument("--rps", type=float, help="전체 초당 요청 수 제한")
+    parser.add_argument("--snapshot-db")
+    parser.add_argument("--html-archive", action="store_true")
+    parser.add_argument("--prefetch-tabs", type=int, default=0)
+    parser.add_argument("--batch-fetch", type=int, default=0)
+    parser.add_argument("--adaptive-fetch", action="store_true")
+    parser.add_argument("--max-batch-fetch", type=int, default=16)
+    parser.add_argument("--parse-workers", type=int, default=0)
+    parser.add_argument("--recycle-rooms", type=int)
+    parser.add_argument("--recycle-rss-mb", type=int)
+    args = parser.parse_args(argv)
+
+    service = CrawlService(args.output_dir, args.browsers, args.headless, args.login_wait, args.cookies,
+                           args.json_log, args.rps, args.snapshot_db, args.html_archive, args.prefetch_tabs,
+                           args.batch_fetch, args.adaptive_fetch, args.max_batch_fetch, args.parse_workers,
+                           args.recycle_rooms, args.recycle_rss_mb)
+    serve(service, args.host, args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    # PyInstaller 단일 실행 파일에서 spawn 프로세스 풀(파싱/내보내기)이 프로그램 전체를 다시 실행하지 않게
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,333 @@
+# sinks.py
+#
+# 수집 결과 레코드를 받는 출력 대상(sink).
+# 크롤러는 방 하나를 수집할 때마다 레코드를 바로 sink 들에 넘기고 보관하지 않으므로,
+# 메모리 사용량이 키워드 전체 크기가 아니라 처리 중인 몇 개의 레코드로 제한된다.
+#
+# 모든 sink 는 write(record) 와 close() 를 가진다. close() 는 만든 파일 경로 목록을 반환한다.
+
+import abc
+import csv
+import json
+import logging
+import os
+import shutil
+
+import requests
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.drawing.image import Image as ExcelImage
+from openpyxl.styles import Alignment, Font
+from openpyxl.utils import get_column_letter
+
+CENTER = Alignment(horizontal='center', vertical='center')
+
+
+def public_fields(record):
+    # "_" 로 시작하는 내부용 필드(날짜 비트맵 등)는 파일에 쓰지 않는다
+    return {k: v for k, v in record.items() if not str(k).startswith("_")}
+
+
+def parse_rate(value):
+    # "53.33%" → 0.5333 (형식이 다르면 None)
+    try:
+        return float(str(value).strip().strip('%')) / 100
+    except (TypeError, ValueError):
+        return None
+
+
+class Sink(abc.ABC):
+    @abc.abstractmethod
+    def write(self, record):
+        ...
+
+    def close(self):
+        return []
+
+
+class ExcelSink(Sink):
+    # 행 단위로 바로 기록하는 write-only 엑셀 (기존 엑셀과 같은 열/서식/이미지/평균 행)
+    COLUMN_WIDTHS = {
+        'A': 10,  # 순번
+        'B': 20,  # 대표이미지
+        'C': 30,  # 매물명
+        'D': 50,  # 주소
+        'E': 15,  # 건물유형
+        'F': 15,  # 전용면적
+        'G': 15,  # 임대료(1주)
+        'H': 15,  # 관리비용
+        'I': 15,  # 청소비용
+        'J': 50,  # URL
+    }
+
+    def __init__(self, path, image_dir, columns, embed_images=True, first_number=1):
+        self.path = path
+        self.image_dir = image_dir
+        self.columns = ["순번"] + list(columns)
+        self.embed_images = embed_images
+        self.first_number = first_number  # 순번 시작 값 (분할 파일에서 이어지도록)
+        self.rows = 0
+        self.rate_total = 0.0
+        self.rate_count = 0
+        self._wb = None
+        self._ws = None
+
+    def _open(self):
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet()
+        # write-only 시트는 열 너비를 첫 행 전에 지정해야 한다
+        widths = dict(self.COLUMN_WIDTHS)
+        for col in range(11, len(self.columns) + 1):  # K열부터: 월별 예약 + 예약률
+            widths[get_column_letter(col)] = 15
+        for col, width in widths.items():
+            self._ws.column_dimensions[col].width = width
+        self._ws.append([self._cell(name, bold=True) for name in self.columns])
+
+    def _cell(self, value, bold=False):
+        cell = WriteOnlyCell(self._ws, value=value)
+        cell.alignment = CENTER
+        if bold:
+            cell.font = Font(bold=True)
+        return cell
+
+    def _embed_image(self, img_url, row, number):
+        # 대표이미지를 내려받아 B열에 삽입. 성공하면 True
+        try:
+            img_response = requests.get(img_url, stream=True)
+            img_path = os.path.join(self.image_dir, f"img_{number}.jpg")
+            with open(img_path, 'wb') as out_file:
+                shutil.copyfileobj(img_response.raw, out_file)
+            img = ExcelImage(img_path)
+            img.width = 155  # 필요에 따라 조정
+            img.height = 100  # 필요에 따라 조정
+            img.anchor = f'B{row}'
+            self._ws.add_image(img)
+            return True
+        except Exception as e:
+            logging.warning(f"이미지 삽입 오류 (행 {row}): {e}")
+            return False
+
+    def write(self, record):
+        if self._wb is None:
+            self._open()
+        self.rows += 1
+        row = self.rows + 1  # 헤더 다음 행
+        number = self.first_number + self.rows - 1
+        values = [number] + [record.get(name) for name in self.columns[1:]]
+
+        # 이미지 삽입 후 URL 제거
+        img_url = record.get("대표이미지")
+        if img_url and self.embed_images and self._embed_image(img_url, row, number):
+            values[1] = None
+
+        rate = parse_rate(record.get("예약률"))
+        if rate is not None:
+            self.rate_total += rate
+            self.rate_count += 1
+
+        self._ws.row_dimensions[row].height = 80  # 필요에 따라 조정
+        self._ws.append([self._cell(value) for value in values])
+
+    def close(self):
+        if self._wb is None:
+            return []
+        # 평균 예약률 행 ("예약률" 열 앞 열에 라벨). 예약률이 하나도 없으면(빠른 훑어보기) 생략
+        if "예약률" in self.columns and self.rate_count:
+            rate_col = self.columns.index("예약률")
+            average_rate = self.rate_total / self.rate_count
+            average = [None] * len(self.columns)
+            average[rate_col - 1] = self._cell("예약률 전체 평균", bold=True)
+            average[rate_col] = self._cell(f"{average_rate:.2%}")
+            self._ws.append(average)
+            logging.info(f"전체 평균 예약률 추가됨: {average_rate:.1%}")
+
+        self._wb.save(self.path)
+        self._wb = None
+        logging.info(f"엑셀 저장 완료 → {self.path}")
+        return [self.path]
+
+
+class ShardedExcelSink(Sink):
+    # shard_rows 행마다 새 엑셀 파일(<이름>_001.xlsx, _002.xlsx …)로 나눠 쓰고,
+    # 닫을 때 원래 경로에 분할 파일 목록(목차) 엑셀을 만든다. 파일마다 저장/열기가 빠르다
+    def __init__(self, path, image_dir, columns, shard_rows, embed_images=True):
+        self.path = path
+        self.image_dir = image_dir
+        self.columns = list(columns)
+        self.shard_rows = shard_rows
+        self.embed_images = embed_images
+        self.rows = 0
+        self._shard = None
+        self._shards = []  # 닫은 분할 파일의 ExcelSink
+
+    def _close_shard(self):
+        if self._shard is None:
+            return
+        shard, self._shard = self._shard, None
+        shard.close()
+        self._shards.append(shard)
+
+    def write(self, record):
+        if self._shard is not None and self._shard.rows >= self.shard_rows:
+            self._close_shard()
+        if self._shard is None:
+            base, ext = os.path.splitext(self.path)
+            shard_path = f"{base}_{len(self._shards) + 1:03d}{ext}"
+            self._shard = ExcelSink(shard_path, self.image_dir, self.columns, self.embed_images,
+                                    first_number=self.rows + 1)
+        self._shard.write(record)
+        self.rows += 1
+
+    def close(self):
+        self._close_shard()
+        if not self._shards:
+            return []
+        self._write_index()
+        return [self.path] + [shard.path for shard in self._shards]
+
+    def _write_index(self):
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "목차"
+        ws.append(["파일", "순번", "방 수", "평균 예약률"])
+        for cell in ws[1]:
+            cell.font = Font(bold=True)
+            cell.alignment = CENTER
+        for shard in self._shards:
+            name = os.path.basename(shard.path)
+            ws.append([name, f"{shard.first_number}~{shard.first_number + shard.rows - 1}", shard.rows,
+                       _rate_text(shard.rate_total, shard.rate_count)])
+            link = ws.cell(row=ws.max_row, column=1)
+            link.hyperlink = name  # 같은 폴더의 분할 파일 열기
+            link.style = "Hyperlink"
+        ws.append(["합계", "", self.rows, _rate_text(sum(shard.rate_total for shard in self._shards),
+                                                   sum(shard.rate_count for shard in self._shards))])
+        for col, width in zip("ABCD", (40, 15, 10, 15)):
+            ws.column_dimensions[col].width = width
+        wb.save(self.path)
+        logging.info(f"분할 엑셀 {len(self._shards)}개 목차 저장 → {self.path}")
+
+
+def _rate_text(rate_total, rate_count):
+    return f"{rate_total / rate_count:.2%}" if rate_count else ""
+
+
+class CsvSink(Sink):
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = list(columns)
+        self._file = None
+        self._writer = None
+
+    def write(self, record):
+        if self._file is None:
+            # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+            self._file = open(self.path, "w", newline="", encoding="utf-8-sig")
+            self._writer = csv.DictWriter(self._file, fieldnames=self.columns, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow(public_fields(record))
+
+    def close(self):
+        if self._file is None:
+            return []
+        self._file.close()
+        self._file = None
+        logging.info(f"csv 저장 완료 → {self.path}")
+        return [self.path]
+
+
+class JsonlSink(Sink):
+    # 레코드마다 바로 flush 하는 저널: 중간에 중단돼도 그때까지의 결과가 남는다
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def write(self, record):
+        if self._file is None:
+            self._file = open(self.path, "w", encoding="utf-8")
+        self._file.write(json.dumps(public_fields(record), ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is None:
+            return []
+        self._file.close()
+        self._file = None
+        logging.info(f"jsonl 저장 완료 → {self.path}")
+        return [self.path]
+
+
+class SnapshotSink(Sink):
+    # 예약 스냅샷 DB 에 batch_size 개씩 모아서 저장
+    def __init__(self, store, keyword, batch_size=200):
+        self.store = store
+        self.keyword = keyword
+        self.batch_size = batch_size
+        self.count = 0
+        self._batch = []
+
+    def _flush(self):
+        if self._batch:
+            try:
+                self.count += self.store.record(self.keyword, self._batch)
+            except Exception as e:
+                logging.error(f"예약 스냅샷 저장 오류: {e}", exc_info=True)
+            self._batch = []
+
+    def write(self, record):
+        self._batch.append(record)
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def close(self):
+        self._flush()
+        if self.count:
+            logging.info(f"예약 스냅샷 {self.count}건 저장 → {self.store.path}")
+        return []
+
+
+class StatsSink(Sink):
+    # 레코드를 보관하지 않고 누적 통계만 계산 (방 수, 평균 예약률)
+    def __init__(self):
+        self.rooms = 0
+        self.rate_total = 0.0
+        self.rate_count = 0
+
+    def write(self, record):
+        self.rooms += 1
+        rate = parse_rate(record.get("예약률"))
+        if rate is not None:
+            self.rate_total += rate
+            self.rate_count += 1
+
+    @property
+    def average_rate(self):
+        return self.rate_total / self.rate_count if self.rate_count else None
+
+
+class CallbackSink(Sink):
+    # 레코드마다 callback(record) 호출 (GUI 미리보기 등)
+    def __init__(self, callback):
+        self.callback = callback
+
+    def write(self, record):
+        try:
+            self.callback(record)
+        except Exception as e:
+            logging.warning(f"레코드 콜백 오류: {e}")
+
+
+def drain(records, sinks):
+    # 레코드 스트림을 모든 sink 에 흘려보내고, 끝나면 sink 를 닫아 만든 파일 목록을 반환
+    outputs = []
+    try:
+        for record in records:
+            for sink in sinks:
+                sink.write(record)
+    finally:
+        for sink in sinks:
+            try:
+                outputs.extend(sink.close())
+            except Exception as e:
+                logging.error(f"출력 저장 오류 ({type(sink).__name__}): {e}", exc_info=True)
+    return outputs
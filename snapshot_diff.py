@@ -0,0 +1,293 @@
+# snapshot_diff.py
+#
+# 두 번의 크롤링 결과 비교: 새로 생긴 방, 사라진 방, 가격/예약률 등 필드가 바뀐 방.
+# 결과 파일(xlsx / csv / jsonl)을 방 번호로 색인해 한 번씩만 훑으므로(선형 시간) 수십만 개도 처리된다.
+# xlsx 는 openpyxl 로 통째로 열지 않고 zip 안의 시트 XML 을 스트리밍으로 읽는다.
+# 이전 결과만 메모리에 색인하고 새 결과는 읽으면서 바로 비교한다.
+#
+#   python snapshot_diff.py output_old/rooms_data_사당.xlsx output/rooms_data_사당.xlsx \
+#       --report output/diff_사당.xlsx --delta output/diff_사당.jsonl
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import zipfile
+import xml.etree.ElementTree as ET
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from sinks import CENTER, CsvSink, JsonlSink, parse_rate
+from utils import room_id_from_url
+
+# lxml 이 있으면 행(row) 요소에서만 이벤트를 받아 훨씬 빠르다
+try:
+    from lxml import etree as LET
+except ImportError:
+    LET = None
+
+_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_CELL_REF = re.compile(r"([A-Z]+)")
+# 비교하지 않는 열 (순번은 실행마다 다르고, 이미지는 삽입되면 값이 비어 있음)
+IGNORED_FIELDS = {"순번", "대표이미지", "URL"}
+REPORT_COLUMNS = ["상태", "방 번호", "매물명", "주소", "필드", "이전 값", "새 값", "변화", "URL"]
+STATUS_LABELS = {"new": "신규", "removed": "삭제", "changed": "변경"}
+
+
+# ---------------------------- 결과 파일 읽기 ----------------------------
+def _column_index(ref, cache={}):
+    # "AB12" → 27 (0부터). 열 문자 변환 결과는 캐시
+    letters = _CELL_REF.match(ref).group(1)
+    index = cache.get(letters)
+    if index is None:
+        index = 0
+        for char in letters:
+            index = index * 26 + ord(char) - 64
+        index = cache[letters] = index - 1
+    return index
+
+
+def _first_sheet_path(archive):
+    # workbook.xml 의 첫 시트 → zip 안의 시트 XML 경로
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    rel_id = workbook.find(f"{_NS}sheets/{_NS}sheet").get(f"{_REL_NS}id")
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels:
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target").lstrip("/")
+            return target if target.startswith("xl/") else "xl/" + target
+    return "xl/worksheets/sheet1.xml"
+
+
+def _shared_strings(archive):
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, element in ET.iterparse(f):
+            if element.tag == f"{_NS}si":
+                strings.append("".join(text.text or "" for text in element.iter(f"{_NS}t")))
+                element.clear()
+    return strings
+
+
+def _iter_row_elements(f):
+    row_tag = f"{_NS}row"
+    if LET is not None:
+        for _, element in LET.iterparse(f, tag=row_tag):
+            yield element
+            # 처리한 행은 부모에서도 떼어내 메모리가 늘지 않게
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+        return
+    for _, element in ET.iterparse(f):
+        if element.tag == row_tag:
+            yield element
+            element.clear()
+
+
+def read_xlsx_rows(path):
+    # 첫 시트의 행을 [값, ...] 목록으로 하나씩 (빈 칸은 None). 스타일/이미지는 읽지 않는다
+    with zipfile.ZipFile(path) as archive:
+        strings = _shared_strings(archive)
+        with archive.open(_first_sheet_path(archive)) as f:
+            for element in _iter_row_elements(f):
+                values = []
+                for cell in element.iter(f"{_NS}c"):
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        value = "".join(text.text or "" for text in cell.iter(f"{_NS}t"))
+                    else:
+                        raw = cell.find(f"{_NS}v")
+                        value = raw.text if raw is not None else None
+                        if kind == "s" and value is not None:
+                            value = strings[int(value)]
+                    column = _column_index(cell.get("r")) if cell.get("r") else len(values)
+                    values.extend([None] * (column - len(values)))
+                    values.append(value)
+                yield values
+
+
+def _xlsx_records(path):
+    rows = read_xlsx_rows(path)
+    header = next(rows, None) or []
+    if "URL" not in header:
+        # 분할 저장(목차 파일)이면 같은 폴더의 <이름>_001.xlsx, _002.xlsx ... 를 차례로 읽는다
+        base = os.path.splitext(path)[0]
+        shards = sorted(glob.glob(glob.escape(base) + "_[0-9][0-9][0-9].xlsx"))
+        if not shards:
+            raise ValueError(f"URL 열이 없는 결과 파일입니다: {path}")
+        for shard in shards:
+            yield from _xlsx_records(shard)
+        return
+    for values in rows:
+        yield dict(zip(header, values))
+
+
+def read_records(path):
+    # 결과 파일 → 레코드 딕셔너리 (파일 형식은 확장자로 판단)
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".xlsx":
+        yield from _xlsx_records(path)
+    elif ext == ".csv":
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            yield from csv.DictReader(f)
+    elif ext == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        raise ValueError(f"지원하지 않는 파일 형식: {path}")
+
+
+def _text(value):
+    if value is None:
+        return ""
+    return str(value).strip()
+
+
+def index_records(records):
+    # {방 번호: 레코드}. URL 이 없는 행(평균 행 등)은 건너뛴다
+    index = {}
+    for record in records:
+        room_id = room_id_from_url(_text(record.get("URL")))
+        if room_id:
+            index[room_id] = {field: _text(value) for field, value in record.items() if field is not None}
+    return index
+
+
+# ---------------------------- 비교 ----------------------------
+def _rate_change(old, new):
+    old_rate, new_rate = parse_rate(old), parse_rate(new)
+    if old_rate is None or new_rate is None:
+        return None
+    return round((new_rate - old_rate) * 100, 2)  # %p
+
+
+def diff_records(old_index, new_records, min_rate_change=0.0):
+    # 이전 색인과 새 레코드 스트림 비교 → 변경 항목 딕셔너리를 하나씩. old_index 에서 비교한 방은 빠진다
+    # 예약률은 min_rate_change(%p) 이상 바뀌었을 때만 변경으로 본다
+    for record in new_records:
+        room_id = room_id_from_url(_text(record.get("URL")))
+        if not room_id:
+            continue
+        new = {field: _text(value) for field, value in record.items() if field is not None}
+        old = old_index.pop(room_id, None)
+        if old is None:
+            yield {"room_id": room_id, "status": "new", "record": new, "changes": {}}
+            continue
+        changes = {}
+        # 월별 예약 열은 수집 월에 따라 달라지므로 양쪽에 있는 열만 비교
+        for field in new.keys() & old.keys():
+            if field in IGNORED_FIELDS or old[field] == new[field]:
+                continue
+            change = {"old": old[field], "new": new[field]}
+            if field == "예약률":
+                delta = _rate_change(old[field], new[field])
+                if delta is not None and abs(delta) < min_rate_change:
+                    continue
+                change["delta"] = delta
+            changes[field] = change
+        if changes:
+            yield {"room_id": room_id, "status": "changed", "record": new, "changes": changes}
+    for room_id, old in old_index.items():
+        yield {"room_id": room_id, "status": "removed", "record": old, "changes": {}}
+
+
+def diff_files(old_path, new_path, min_rate_change=0.0):
+    return diff_records(index_records(read_records(old_path)), read_records(new_path), min_rate_change)
+
+
+# ---------------------------- 출력 ----------------------------
+def report_rows(change):
+    # 변경 항목 하나 → 보고서 행 (변경된 필드마다 한 행)
+    record = change["record"]
+    base = {"상태": STATUS_LABELS[change["status"]], "방 번호": change["room_id"],
+            "매물명": record.get("매물명"), "주소": record.get("주소"), "URL": record.get("URL")}
+    if not change["changes"]:
+        return [base]
+    return [{**base, "필드": field, "이전 값": value["old"], "새 값": value["new"],
+             "변화": f"{value['delta']:+.2f}%p" if value.get("delta") is not None else None}
+            for field, value in sorted(change["changes"].items())]
+
+
+class ReportWorkbook:
+    # 변경 보고서 시트 (write-only 라 행 수와 관계없이 메모리 사용이 일정)
+    WIDTHS = [8, 12, 30, 40, 15, 20, 20, 10, 45]
+
+    def __init__(self, path):
+        self.path = path
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet("변경 내역")
+        for index, width in enumerate(self.WIDTHS):
+            self._ws.column_dimensions[chr(65 + index)].width = width
+        self._ws.freeze_panes = "A2"
+        header = []
+        for name in REPORT_COLUMNS:
+            cell = WriteOnlyCell(self._ws, value=name)
+            cell.font = Font(bold=True)
+            cell.alignment = CENTER
+            header.append(cell)
+        self._ws.append(header)
+
+    def write(self, row):
+        self._ws.append([row.get(name) for name in REPORT_COLUMNS])
+
+    def close(self):
+        self._wb.save(self.path)
+        logging.info(f"변경 보고서 저장 완료 → {self.path}")
+        return [self.path]
+
+
+def write_diff(changes, report_path=None, delta_path=None):
+    # 변경 항목을 보고서(xlsx/csv)와 기계가 읽는 delta(jsonl)에 기록. 상태별 개수 반환
+    report = None
+    if report_path:
+        report = CsvSink(report_path, REPORT_COLUMNS) if report_path.lower().endswith(".csv") \
+            else ReportWorkbook(report_path)
+    delta = JsonlSink(delta_path) if delta_path else None
+    counts = {"new": 0, "changed": 0, "removed": 0}
+    try:
+        for change in changes:
+            counts[change["status"]] += 1
+            if report is not None:
+                for row in report_rows(change):
+                    report.write(row)
+            if delta is not None:
+                delta.write(change)
+    finally:
+        for output in (report, delta):
+            if output is not None:
+                output.close()
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="두 크롤링 결과 파일 비교 (신규/삭제/변경)")
+    parser.add_argument("old", help="이전 결과 파일 (.xlsx / .csv / .jsonl)")
+    parser.add_argument("new", help="새 결과 파일 (.xlsx / .csv / .jsonl)")
+    parser.add_argument("--report", help="변경 보고서 (.xlsx 또는 .csv)")
+    parser.add_argument("--delta", help="변경 내역 jsonl (한 줄에 방 하나)")
+    parser.add_argument("--rate-threshold", type=float, default=0.0,
+                        help="예약률이 이 값(%%p) 이상 바뀐 경우만 변경으로 표시")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if not args.report and not args.delta:
+        parser.error("--report 또는 --delta 중 하나는 지정해야 합니다.")
+    counts = write_diff(diff_files(args.old, args.new, args.rate_threshold), args.report, args.delta)
+    print(f"신규 {counts['new']}개, 변경 {counts['changed']}개, 삭제 {counts['removed']}개")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
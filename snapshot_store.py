@@ -0,0 +1,207 @@
+# snapshot_store.py
+#
+# 예약 현황 시계열 저장소 (SQLite).
+# 크롤링/갱신할 때마다 방별·월별 예약(disabled/total) 스냅샷을 누적 저장하고,
+# 방 또는 키워드 단위의 예약률 추이를 인덱스로 빠르게 조회한다.
+
+import datetime
+import re
+import sqlite3
+import threading
+
+from utils import room_id_from_url
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reservation_snapshots (
+    room_id       TEXT    NOT NULL,
+    keyword       TEXT    NOT NULL,
+    snapshot_date TEXT    NOT NULL,  -- YYYY-MM-DD (수집일)
+    month         TEXT    NOT NULL,  -- YYYY-MM (예약 대상 월)
+    disabled      INTEGER NOT NULL,
+    total         INTEGER NOT NULL,
+    booked_bits   INTEGER,           -- i번째 비트 = (i+1)일 예약 불가
+    known_bits    INTEGER,           -- i번째 비트 = (i+1)일 달력에 표시됨
+    PRIMARY KEY (room_id, keyword, snapshot_date, month)
+);
+CREATE INDEX IF NOT EXISTS idx_snapshots_room ON reservation_snapshots (room_id, snapshot_date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_keyword ON reservation_snapshots (keyword, snapshot_date);
+CREATE INDEX IF NOT EXISTS idx_snapshots_date ON reservation_snapshots (snapshot_date);
+
+-- 키워드·수집일·월별 합계 (keyword_trend 조회용, record() 때 갱신)
+CREATE TABLE IF NOT EXISTS keyword_daily (
+    keyword       TEXT    NOT NULL,
+    snapshot_date TEXT    NOT NULL,
+    month         TEXT    NOT NULL,
+    rooms         INTEGER NOT NULL,
+    disabled      INTEGER NOT NULL,
+    total         INTEGER NOT NULL,
+    PRIMARY KEY (keyword, snapshot_date, month)
+);
+
+CREATE TABLE IF NOT EXISTS rooms (
+    room_id    TEXT PRIMARY KEY,
+    title      TEXT,
+    address    TEXT,
+    url        TEXT,
+    updated_at TEXT
+);
+"""
+
+# crawl_room() 결과에서 월별 날짜 비트맵({"YYYY-MM": (booked_bits, known_bits)})을 담는 키
+CALENDAR_KEY = "_calendar"
+
+_MONTH_LABEL = re.compile(r"(\d+)월 예약")
+_COUNTS = re.compile(r"(\d+)\s*/\s*(\d+)")
+
+
+def month_of_label(label, snapshot_date):
+    # "1월 예약" → "2026-01". 달력은 수집 월부터 시작하므로 수집 월보다 작은 월은 다음 해
+    match = _MONTH_LABEL.fullmatch(label)
+    if not match:
+        return None
+    month = int(match.group(1))
+    year = snapshot_date.year + (1 if month < snapshot_date.month else 0)
+    return f"{year:04d}-{month:02d}"
+
+
+def snapshot_rows(record, keyword, snapshot_date):
+    # 결과 레코드(엑셀 한 행) → (room_id, keyword, 날짜, 월, disabled, total) 목록
+    room_id = room_id_from_url(record.get("URL"))
+    if not room_id:
+        return []
+    if record.get(CALENDAR_KEY):
+        # 날짜 비트맵이 있으면 정확한 연-월과 날짜별 정보를 그대로 저장
+        return [(room_id, keyword, snapshot_date.isoformat(), month,
+                 bin(booked).count("1"), bin(known).count("1"), booked, known)
+                for month, (booked, known) in record[CALENDAR_KEY].items()]
+    rows = []
+    for label, value in record.items():
+        month = month_of_label(label, snapshot_date) if isinstance(label, str) else None
+        counts = _COUNTS.fullmatch(str(value).strip()) if month and value else None
+        if counts:
+            rows.append((room_id, keyword, snapshot_date.isoformat(), month,
+                         int(counts.group(1)), int(counts.group(2)), None, None))
+    return rows
+
+
+class SnapshotStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            # 비트맵 열이 없던 이전 DB 는 열을 추가
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(reservation_snapshots)")}
+            for column in ("booked_bits", "known_bits"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE reservation_snapshots ADD COLUMN {column} INTEGER")
+
+    def _connect(self):
+        # 스레드마다 짧게 연결해서 쓰고 닫는다 (키워드 병렬 크롤링에서도 안전)
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return _closing(conn)
+
+    def record(self, keyword, records, snapshot_date=None):
+        # records: crawl_room() 결과 딕셔너리 목록. 같은 날 다시 수집하면 값을 덮어쓴다
+        snapshot_date = snapshot_date or datetime.date.today()
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        snapshots, rooms = [], []
+        for record in records:
+            snapshots.extend(snapshot_rows(record, keyword, snapshot_date))
+            room_id = room_id_from_url(record.get("URL"))
+            if room_id and record.get("매물명"):
+                rooms.append((room_id, record.get("매물명"), record.get("주소"), record.get("URL"), now))
+
+        with self._lock, self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO reservation_snapshots "
+                "(room_id, keyword, snapshot_date, month, disabled, total, booked_bits, known_bits) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", snapshots)
+            conn.executemany(
+                "INSERT OR REPLACE INTO rooms VALUES (?, ?, ?, ?, ?)", rooms)
+            conn.execute(
+                "INSERT OR REPLACE INTO keyword_daily "
+                "SELECT keyword, snapshot_date, month, COUNT(*), SUM(disabled), SUM(total) "
+                "FROM reservation_snapshots WHERE keyword = ? AND snapshot_date = ? "
+                "GROUP BY month", (keyword, snapshot_date.isoformat()))
+        return len(snapshots)
+
+    def room_trend(self, room_id, start=None, end=None):
+        # 한 방의 수집일·월별 예약 추이 (여러 키워드에서 수집된 같은 방은 하나로 합친다)
+        sql = ("SELECT snapshot_date, month, MAX(disabled) AS disabled, MAX(total) AS total "
+               "FROM reservation_snapshots WHERE room_id = ?" + _date_filter(start, end) +
+               " GROUP BY snapshot_date, month ORDER BY snapshot_date, month")
+        with self._connect() as conn:
+            rows = conn.execute(sql, [str(room_id)] + _date_args(start, end)).fetchall()
+        return [_with_rate(row) for row in rows]
+
+    def keyword_trend(self, keyword, start=None, end=None, by_month=False):
+        # 키워드 전체의 수집일별(또는 수집일·월별) 예약률 추이
+        group = "snapshot_date, month" if by_month else "snapshot_date"
+        sql = (f"SELECT {group}, MAX(rooms) AS rooms, "
+               "SUM(disabled) AS disabled, SUM(total) AS total FROM keyword_daily "
+               "WHERE keyword = ?" + _date_filter(start, end) +
+               f" GROUP BY {group} ORDER BY {group}")
+        with self._connect() as conn:
+            rows = conn.execute(sql, [keyword] + _date_args(start, end)).fetchall()
+        return [_with_rate(row) for row in rows]
+
+    def calendar_bitmaps(self, keyword=None, room_id=None, snapshot_date=None):
+        # (month, booked_bits, known_bits) 목록. snapshot_date 를 생략하면 가장 최근 수집일 기준
+        # availability.weekday_occupancy / range_occupancy 에 그대로 넘길 수 있다
+        where, args = ["booked_bits IS NOT NULL"], []
+        if keyword is not None:
+            where.append("keyword = ?")
+            args.append(keyword)
+        if room_id is not None:
+            where.append("room_id = ?")
+            args.append(str(room_id))
+        with self._connect() as conn:
+            if snapshot_date is None:
+                snapshot_date = conn.execute(
+                    "SELECT MAX(snapshot_date) FROM reservation_snapshots WHERE " + " AND ".join(where),
+                    args).fetchone()[0]
+            where.append("snapshot_date = ?")
+            args.append(str(snapshot_date))
+            return [tuple(row) for row in conn.execute(
+                "SELECT month, MAX(booked_bits), MAX(known_bits) FROM reservation_snapshots WHERE "
+                + " AND ".join(where) + " GROUP BY room_id, month", args)]
+
+    def keywords(self):
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute(
+                "SELECT DISTINCT keyword FROM reservation_snapshots ORDER BY keyword")]
+
+
+class _closing:
+    # with 블록이 끝나면 커밋(오류 시 롤백) 후 연결을 닫는다
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.conn.commit()
+            else:
+                self.conn.rollback()
+        finally:
+            self.conn.close()
+
+
+def _date_filter(start, end):
+    return (" AND snapshot_date >= ?" if start else "") + (" AND snapshot_date <= ?" if end else "")
+
+
+def _date_args(start, end):
+    return [str(d) for d in (start, end) if d]
+
+
+def _with_rate(row):
+    entry = dict(row)
+    entry["rate"] = entry["disabled"] / entry["total"] if entry["total"] else 0.0
+    return entry
@@ -1,9 +1,9 @@
-import requests
 import datetime
 from zoneinfo import ZoneInfo  # Python 3.9 이상 필요
 
 def get_online_time():
     try:
+        import requests  # GUI 시작 속도를 위해 실제 호출 시점에 로딩
         response = requests.get('http://worldtimeapi.org/api/timezone/Asia/Seoul', timeout=5)
         if response.status_code == 200:
             data = response.json()
@@ -13,4 +13,10 @@ def get_online_time():
             raise Exception("시간 서버 응답 오류")
     except Exception as e:
         print(f"온라인 시간 가져오기 실패: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def room_id_from_url(url):
+    # https://33m2.co.kr/room/detail/12334 → "12334"
+    if not url:
+        return None
+    return url.rstrip('/').rsplit('/', 1)[-1].split('?', 1)[0]
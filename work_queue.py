@@ -0,0 +1,196 @@
+# work_queue.py
+#
+# 여러 작업자(브라우저를 띄운 프로세스/PC)가 나눠 가져가는 영속 작업 큐 (SQLite).
+# 작업을 꺼낼 때 일정 시간의 임대(lease)를 걸고, 끝나면 결과와 함께 완료(ack)한다.
+# 작업자가 죽어서 임대 시간이 지나면 그 작업은 다른 작업자가 다시 가져간다.
+#
+# 다른 PC 의 작업자는 공유 폴더에 있는 같은 DB 파일을 열어 쓴다
+# (네트워크 드라이브의 파일 잠금이 제대로 동작해야 하므로 WAL 대신 기본 저널 모드를 사용).
+
+import datetime
+import json
+import sqlite3
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job        TEXT PRIMARY KEY,
+    settings   TEXT NOT NULL,             -- 작업자가 따라야 할 설정 (달력 개월 수 등, JSON)
+    enumerated INTEGER NOT NULL DEFAULT 0, -- 1 이면 모든 작업을 넣었음
+    closed     INTEGER NOT NULL DEFAULT 0, -- 1 이면 작업자 종료
+    created_at TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id            INTEGER PRIMARY KEY,
+    job           TEXT    NOT NULL,
+    keyword       TEXT    NOT NULL,
+    url           TEXT    NOT NULL,
+    payload       TEXT    NOT NULL,           -- JSON
+    status        TEXT    NOT NULL DEFAULT 'pending',  -- pending / leased / done / failed
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    lease_owner   TEXT,
+    lease_expires REAL,
+    error         TEXT,
+    UNIQUE (job, keyword, url)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (job, status, lease_expires);
+
+CREATE TABLE IF NOT EXISTS results (
+    id      INTEGER PRIMARY KEY,
+    task_id INTEGER NOT NULL UNIQUE,
+    job     TEXT    NOT NULL,
+    keyword TEXT    NOT NULL,
+    record  TEXT    NOT NULL              -- JSON
+);
+CREATE INDEX IF NOT EXISTS idx_results_job ON results (job, id);
+"""
+
+
+class WorkQueue:
+    def __init__(self, path, lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        # autocommit 연결: 여러 문장을 묶을 때는 BEGIN IMMEDIATE 로 쓰기 잠금을 먼저 잡는다
+        conn = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return _Transaction(conn)
+
+    # ---------------------------- 조정자(coordinator) 쪽 ----------------------------
+    def open_job(self, job, settings):
+        # 같은 job 으로 다시 열면 기존 작업/결과를 이어서 사용
+        with self._connect() as conn:
+            conn.execute("INSERT OR IGNORE INTO jobs (job, settings, created_at) VALUES (?, ?, ?)",
+                         (job, json.dumps(settings, ensure_ascii=False),
+                          datetime.datetime.now().isoformat(timespec="seconds")))
+            conn.execute("UPDATE jobs SET settings = ?, enumerated = 0, closed = 0 WHERE job = ?",
+                         (json.dumps(settings, ensure_ascii=False), job))
+
+    def enqueue(self, job, keyword, items):
+        # items: {"url": ..., ...} 목록. 이미 있는 (job, keyword, url) 은 무시. 새로 넣은 개수 반환
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO tasks (job, keyword, url, payload) VALUES (?, ?, ?, ?)",
+                [(job, keyword, item["url"], json.dumps(item, ensure_ascii=False)) for item in items])
+            return conn.total_changes - before
+
+    def mark_enumerated(self, job):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET enumerated = 1 WHERE job = ?", (job,))
+
+    def close_job(self, job):
+        with self._connect() as conn:
+            conn.execute("UPDATE jobs SET closed = 1 WHERE job = ?", (job,))
+
+    def results(self, job, after_id=0):
+        # after_id 이후에 들어온 결과 [(id, keyword, record)]
+        with self._connect() as conn:
+            rows = conn.execute("SELECT id, keyword, record FROM results WHERE job = ? AND id > ? ORDER BY id",
+                                (job, after_id)).fetchall()
+        return [(row["id"], row["keyword"], json.loads(row["record"])) for row in rows]
+
+    def counts(self, job, keyword=None):
+        # {"pending": n, "leased": n, "done": n, "failed": n}
+        sql = "SELECT status, COUNT(*) FROM tasks WHERE job = ?"
+        args = [job]
+        if keyword is not None:
+            sql += " AND keyword = ?"
+            args.append(keyword)
+        with self._connect() as conn:
+            counts = dict(conn.execute(sql + " GROUP BY status", args).fetchall())
+        return {status: counts.get(status, 0) for status in ("pending", "leased", "done", "failed")}
+
+    def failed_tasks(self, job, keyword):
+        with self._connect() as conn:
+            return [(row["url"], row["error"]) for row in conn.execute(
+                "SELECT url, error FROM tasks WHERE job = ? AND keyword = ? AND status = 'failed'",
+                (job, keyword))]
+
+    # ---------------------------- 작업자(worker) 쪽 ----------------------------
+    def latest_open_job(self):
+        with self._connect() as conn:
+            row = conn.execute("SELECT job FROM jobs WHERE closed = 0 ORDER BY created_at DESC, rowid DESC "
+                               "LIMIT 1").fetchone()
+        return row["job"] if row else None
+
+    def job_state(self, job):
+        # (settings, enumerated, closed). job 이 없으면 None
+        with self._connect() as conn:
+            row = conn.execute("SELECT settings, enumerated, closed FROM jobs WHERE job = ?", (job,)).fetchone()
+        if row is None:
+            return None
+        return json.loads(row["settings"]), bool(row["enumerated"]), bool(row["closed"])
+
+    def claim(self, job, worker):
+        # 대기 중이거나 임대가 만료된 작업 하나를 임대. 없으면 None
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # 임대가 여러 번 만료된 작업(작업자를 계속 죽이는 방 등)은 실패 처리
+            conn.execute("UPDATE tasks SET status = 'failed', lease_owner = NULL, "
+                         "error = COALESCE(error, '임대 만료 반복') WHERE job = ? AND status = 'leased' "
+                         "AND lease_expires < ? AND attempts >= ?", (job, now, self.max_attempts))
+            row = conn.execute(
+                "SELECT id, keyword, payload FROM tasks WHERE job = ? "
+                "AND (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) "
+                "ORDER BY id LIMIT 1", (job, now)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE tasks SET status = 'leased', attempts = attempts + 1, "
+                         "lease_owner = ?, lease_expires = ? WHERE id = ?",
+                         (worker, now + self.lease_seconds, row["id"]))
+        return {"id": row["id"], "keyword": row["keyword"], **json.loads(row["payload"])}
+
+    def extend(self, task_id, worker):
+        # 오래 걸리는 작업의 임대 연장. 이미 다른 작업자에게 넘어갔으면 False
+        with self._connect() as conn:
+            cursor = conn.execute("UPDATE tasks SET lease_expires = ? WHERE id = ? AND lease_owner = ? "
+                                  "AND status = 'leased'", (time.time() + self.lease_seconds, task_id, worker))
+            return cursor.rowcount == 1
+
+    def ack(self, task_id, worker, record):
+        # 결과 저장 + 완료. 임대가 이미 다른 작업자에게 넘어갔으면 저장하지 않고 False
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            cursor = conn.execute("UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL "
+                                  "WHERE id = ? AND lease_owner = ? AND status = 'leased'", (task_id, worker))
+            if cursor.rowcount != 1:
+                return False
+            conn.execute("INSERT OR REPLACE INTO results (task_id, job, keyword, record) "
+                         "SELECT id, job, keyword, ? FROM tasks WHERE id = ?",
+                         (json.dumps(record, ensure_ascii=False), task_id))
+        return True
+
+    def fail(self, task_id, worker, error):
+        # 실패 보고. 시도 횟수가 남았으면 다시 대기열로, 아니면 failed
+        with self._connect() as conn:
+            conn.execute("UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                         "lease_owner = NULL, lease_expires = NULL, error = ? "
+                         "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                         (self.max_attempts, str(error), task_id, worker))
+
+
+class _Transaction:
+    # with 블록: 열린 트랜잭션이 있으면 커밋(오류 시 롤백)하고 연결을 닫는다
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if self.conn.in_transaction:
+                if exc_type is None:
+                    self.conn.commit()
+                else:
+                    self.conn.rollback()
+        finally:
+            self.conn.close()
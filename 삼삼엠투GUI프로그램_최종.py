@@ -1,21 +1,35 @@
+import time
+_STARTUP_BEGIN = time.perf_counter()  # 시작 시간 측정 기준점 (가장 먼저 기록)
+
 import sys
 import threading
 import os
 import logging
+import multiprocessing
 import datetime
 from zoneinfo import ZoneInfo
 
-from PySide6.QtWidgets import QApplication, QWidget, QMessageBox
-from PySide6.QtCore import QFile
+from PySide6.QtWidgets import QApplication, QWidget, QMessageBox, QCheckBox
+from PySide6.QtCore import QFile, QTimer, Signal
 from PySide6.QtUiTools import QUiLoader
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QVBoxLayout
 
 from utils import get_online_time
-from crawler import crawl
+# crawler 모듈은 selenium / numpy / openpyxl 등 무거운 의존성을 불러오므로
+# 크롤링을 실제로 시작할 때 run_crawling() 안에서 import 한다.
 from logging_handler import LogEmitter, QTextBrowserHandler
+from results_view import ResultsPanel
+from service import DEFAULT_URL, FINISHED, ServiceClient
+
+EXPIRATION_DATE = datetime.datetime(2045, 1, 1, tzinfo=ZoneInfo("Asia/Seoul"))
+# 실행마다 시작 시간을 한 줄씩 남기는 파일 (시각, 초, 실행 형태). 화면 로그는 크롤링 시작 때 지워지므로 따로 보관
+STARTUP_LOG = "startup_times.log"
 
 class MainWindow(QWidget):
+    # 백그라운드 시간 확인 결과 (온라인 시간 또는 None)
+    online_time_checked = Signal(object)
+
     def __init__(self):
         super().__init__()
 
@@ -34,15 +48,38 @@ class MainWindow(QWidget):
         # QMainWindow 중앙 위젯으로 배치
         layout = QVBoxLayout(self)
         layout.addWidget(self.ui)
+
+        # 프로파일링 모드 (체크하면 output 폴더에 profile_*.prof / profile_*.txt 저장)
+        self.profile_check = QCheckBox("프로파일링 (느린 구간 분석용)")
+        layout.addWidget(self.profile_check)
+
+        # 빠른 훑어보기 (상세 페이지를 열지 않고 검색 결과 카드만 수집, 달력 열은 빈 칸)
+        self.quick_scan_check = QCheckBox("빠른 훑어보기 (카드 정보만, 예약 현황 제외)")
+        layout.addWidget(self.quick_scan_check)
+
+        # 크롤링 서비스(service.py)가 실행 중이면 작업만 넘기고 진행 상황/결과를 받아 표시
+        self.service_url = os.environ.get("CRAWL_SERVICE_URL", DEFAULT_URL)
+        self.service_check = QCheckBox(f"크롤링 서비스 사용 ({self.service_url})")
+        layout.addWidget(self.service_check)
+        # 프로파일링은 이 프로그램 안에서 수집할 때만 가능 (서비스 작업은 서비스 프로세스에서 실행)
+        self.service_check.toggled.connect(self.on_service_toggled)
+
+        # 결과 미리보기 (크롤링 중 수집된 방이 실시간으로 추가됨)
+        self.results = ResultsPanel()
+        layout.addWidget(self.results, 1)
         self.setWindowTitle("삼삼엠투 크롤링 자동화 프로그램")
 
-        # 디자이너에서 설정한 기본 크기로 창 크기 조정
-        self.resize(self.ui.size())
+        # 디자이너에서 설정한 기본 크기 + 결과 표 높이로 창 크기 조정
+        self.resize(max(self.ui.width(), 900), self.ui.height() + 400)
 
 
         # 창 설정
         self.setWindowIcon(QIcon("budongsan_icon.png"))
-        self.set_expiration_date()
+
+        # 사용 기한: 로컬 시간으로 먼저 표시하고, 온라인 시간 확인은 백그라운드에서 수행
+        self.online_time_checked.connect(self.set_expiration_date)
+        self.set_expiration_date(None)
+        threading.Thread(target=self.check_online_time, daemon=True).start()
 
         # 버튼 시그널 연결
         self.ui.keyword_btn.clicked.connect(self.keyword_page_open)
@@ -54,9 +91,12 @@ class MainWindow(QWidget):
         self.keywords = []
         self.setup_logging()
 
-    def set_expiration_date(self):
-        expiration_date = datetime.datetime(2045, 1, 1, tzinfo=ZoneInfo("Asia/Seoul"))
-        online_time = get_online_time()
+    def check_online_time(self):
+        # 네트워크 대기(최대 5초)가 창 표시를 막지 않도록 별도 스레드에서 실행
+        self.online_time_checked.emit(get_online_time())
+
+    def set_expiration_date(self, online_time=None):
+        expiration_date = EXPIRATION_DATE
         today = online_time or datetime.datetime.now(ZoneInfo("Asia/Seoul"))
 
         if today > expiration_date:
@@ -98,12 +138,19 @@ class MainWindow(QWidget):
 
         self.ui.start_btn.setEnabled(False)
         self.ui.keyword_btn.setEnabled(False)
+        self.profile_check.setEnabled(False)
+        self.quick_scan_check.setEnabled(False)
+        self.service_check.setEnabled(False)
         self.ui.textBrowser.clear()
+        self.results.clear()
 
-        threading.Thread(target=self.run_crawling, daemon=True).start()
+        target = self.run_remote_crawling if self.service_check.isChecked() else self.run_crawling
+        threading.Thread(target=target, daemon=True).start()
 
     def run_crawling(self):
         try:
+            from crawler import crawl  # 무거운 의존성 지연 로딩
+
             logging.info(f"Starting crawl for keywords: {', '.join(self.keywords)}")
 
             # 이미지 기본 폴더
@@ -114,7 +161,8 @@ class MainWindow(QWidget):
             os.makedirs("output", exist_ok=True)
 
             # 🚀 keyword 리스트 전체를 통째로 crawl()에 전달
-            crawl(self.keywords, base_image_dir, "output")
+            crawl(self.keywords, base_image_dir, "output", record_callback=self.results.add_record,
+                  profile=self.profile_check.isChecked(), quick_scan=self.quick_scan_check.isChecked())
 
             logging.info("모든 키워드 크롤링 완료")
             self.update_status("모든 키워드 크롤링 완료")
@@ -125,6 +173,36 @@ class MainWindow(QWidget):
 
         self.enable_buttons()
 
+    def run_remote_crawling(self):
+        # 서비스에 작업을 등록하고 끝날 때까지 로그/수집 결과를 받아 온다 (브라우저는 서비스 쪽에서 실행)
+        try:
+            client = ServiceClient(self.service_url)
+            job = client.submit(self.keywords, quick_scan=self.quick_scan_check.isChecked())
+            logging.info(f"서비스 작업 등록: {job['id']} ({', '.join(self.keywords)})")
+            log_next, record_next = job["log_next"], 0
+            while True:
+                job = client.job(job["id"])
+                log = client.log(log_next)
+                log_next = log["next"]
+                for line in log["lines"]:
+                    self.log_emitter.log_signal.emit(line)
+                records = client.records(job["id"], record_next)
+                record_next = records["next"]
+                for item in records["records"]:
+                    self.results.add_record(item["keyword"], item["record"])
+                if job["status"] in FINISHED:
+                    break
+                time.sleep(1)
+
+            logging.info(f"서비스 작업 종료: {job['status']}, 결과 파일: {', '.join(job['files']) or '없음'}")
+            self.update_status("모든 키워드 크롤링 완료")
+
+        except Exception as e:
+            logging.error(f"서비스 작업 오류: {e}", exc_info=True)
+            self.update_status("Error crawling")
+
+        self.enable_buttons()
+
 
     def update_status(self, message):
         self.ui.textBrowser.append(message)
@@ -132,18 +210,44 @@ class MainWindow(QWidget):
     def enable_buttons(self):
         self.ui.start_btn.setEnabled(True)
         self.ui.keyword_btn.setEnabled(True)
+        self.profile_check.setEnabled(not self.service_check.isChecked())
+        self.quick_scan_check.setEnabled(True)
+        self.service_check.setEnabled(True)
+
+    def on_service_toggled(self, checked):
+        if checked:
+            self.profile_check.setChecked(False)
+        self.profile_check.setEnabled(not checked)
 
     def reset_fields(self):
         self.ui.keyword.setText('')
         self.ui.textBrowser.clear()
+        self.results.clear()
         self.keywords = []
 
     def quit_application(self):
         sys.exit()
 
+def record_startup_time():
+    # 시작 시간을 화면 로그와 STARTUP_LOG 에 기록 (실행 파일/스크립트 구분해 개선 여부를 비교할 수 있게)
+    elapsed = time.perf_counter() - _STARTUP_BEGIN
+    logging.info(f"프로그램 시작 시간: {elapsed:.3f}초")
+    kind = "exe" if getattr(sys, "frozen", False) else "script"
+    try:
+        with open(STARTUP_LOG, "a", encoding="utf-8") as f:
+            f.write(f"{datetime.datetime.now().isoformat(timespec='seconds')}\t{elapsed:.3f}\t{kind}\n")
+    except OSError as e:
+        logging.warning(f"시작 시간 기록 실패: {e}")
+
+
 if __name__ == "__main__":
+    # PyInstaller 단일 실행 파일에서 spawn 프로세스 풀(파싱/내보내기)이 프로그램 전체를 다시 실행하지 않게
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     app.setWindowIcon(QIcon("budongsan_icon.png"))
     window = MainWindow()
     window.show()
+
+    # 이벤트 루프가 첫 화면을 그린 직후 시작 시간 기록
+    QTimer.singleShot(0, record_startup_time)
     sys.exit(app.exec())